@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Backend client helpers for Kartoshka Youtuber
+Shared helpers for locating and calling the console backend
+Created by NaderB - https://www.naderb.org
+"""
+
+import subprocess
+import json
+import threading
+import os
+import sys
+import time
+from pathlib import Path
+
+from events import decode_event, protocol_args
+
+
+class BackendError(Exception):
+    """Raised when the backend reports an error or exits with a failure"""
+
+
+# Whether each backend path understands the event protocol flags, probed once
+_event_support = {}
+_event_support_lock = threading.Lock()
+
+
+def get_app_dir():
+    """Get the directory the application runs from"""
+    if getattr(sys, 'frozen', False):
+        # Running as compiled exe
+        return Path(sys.executable).parent
+    # Running as script
+    return Path(__file__).parent
+
+
+def get_backend_path(app_dir=None):
+    """Get the path of the backend executable next to the app"""
+    if app_dir is None:
+        app_dir = get_app_dir()
+    backend_name = "kartoshka-backend.exe" if os.name == 'nt' else "./kartoshka-backend"
+    return str(Path(app_dir) / backend_name)
+
+
+def creation_flags():
+    """Get subprocess flags that keep the backend console hidden on Windows"""
+    return subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+
+
+def run_backend(backend_path, args, timeout=30, running=None):
+    """Run a backend command and return its parsed JSON response
+
+    If a set is passed as running, the process is kept in it while it runs
+    so another thread can kill it to cancel the call.
+    """
+    cmd = [backend_path] + list(args)
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, creationflags=creation_flags())
+    if running is not None:
+        running.add(process)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise
+    finally:
+        if running is not None:
+            running.discard(process)
+
+    if process.returncode != 0:
+        raise BackendError(stderr.strip() or "Unknown error occurred")
+
+    response = json.loads(stdout)
+    if 'error' in response:
+        raise BackendError(response['error'])
+    return response
+
+
+def _probe_help(backend_path, timeout):
+    """Run the backend's --help and remember whether it lists the event protocol flags"""
+    try:
+        result = subprocess.run([backend_path, "--help"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                text=True, errors='replace', timeout=timeout, creationflags=creation_flags())
+        supported = "--events" in result.stdout
+    except (OSError, subprocess.TimeoutExpired):
+        supported = False
+    with _event_support_lock:
+        _event_support[backend_path] = supported
+    return supported
+
+
+def supports_events(backend_path, timeout=30):
+    """Check whether the backend accepts the event protocol flags
+
+    Older backends reject unknown flags, so downloads only pass the
+    events.protocol_args flags when the backend's --help lists them. The
+    answer is cached per backend path; prewarm_backend fills it as well.
+    """
+    with _event_support_lock:
+        if backend_path in _event_support:
+            return _event_support[backend_path]
+    return _probe_help(backend_path, timeout)
+
+
+def event_args(backend_path, job_id=None):
+    """Get the event protocol arguments for a backend, or none for a version 0 backend"""
+    return protocol_args(job_id) if supports_events(backend_path) else []
+
+
+def prewarm_backend(backend_path, timeout=60):
+    """Start the backend once and wait for it to exit, returning the seconds taken
+
+    Runs --help, which does no network work. This pulls the executable and
+    its libraries into the OS file cache (and past any virus scan) so the
+    first real command starts faster, and records whether the backend
+    supports the event protocol.
+    """
+    started = time.perf_counter()
+    _probe_help(backend_path, timeout)
+    return time.perf_counter() - started
+
+
+def get_info(backend_path, url, items=None, timeout=30, running=None):
+    """Get video or playlist information from the backend
+
+    items limits a playlist or channel to a 1-based range such as "1-50".
+    """
+    args = ["--command", "info", "--url", url]
+    if items:
+        args += ["--items", items]
+    return run_backend(backend_path, args, timeout=timeout, running=running)
+
+
+def get_info_bulk(backend_path, urls, concurrency=4, running=None):
+    """Resolve many URLs in one backend call
+
+    The URLs are written to the backend's stdin, one per line, and it
+    resolves up to concurrency of them at a time. Yields (index, info,
+    error) tuples in the order the backend finishes them, where index is the
+    URL's position in urls and exactly one of info and error is set. A
+    failed URL does not stop the rest. Raises BackendError only if the
+    backend fails without resolving anything.
+    """
+    urls = list(urls)
+    cmd = [backend_path, "--command", "info", "--bulk", "--concurrency", str(concurrency)]
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, bufsize=1, creationflags=creation_flags())
+    if running is not None:
+        running.add(process)
+
+    def feed():
+        try:
+            for url in urls:
+                process.stdin.write(url.strip() + "\n")
+            process.stdin.close()
+        except OSError:
+            # Backend exited early; its exit code tells the rest
+            pass
+
+    # Feed stdin and drain stderr on their own threads so no pipe can fill up
+    errors = []
+    threading.Thread(target=feed, daemon=True).start()
+    stderr_thread = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+    stderr_thread.start()
+
+    answered = set()
+    try:
+        for line in process.stdout:
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            index = data.get('index')
+            if not isinstance(index, int) or index in answered or not 0 <= index < len(urls):
+                continue
+            answered.add(index)
+            if data.get('error') or data.get('info') is None:
+                yield index, None, data.get('error') or "Unknown error occurred"
+            else:
+                yield index, data['info'], None
+        return_code = process.wait()
+        stderr_thread.join()
+    finally:
+        if process.poll() is None:
+            # The caller stopped reading early
+            process.kill()
+        if running is not None:
+            running.discard(process)
+
+    if return_code != 0 and not answered:
+        raise BackendError(''.join(errors).strip() or "Unknown error occurred")
+    for index in range(len(urls)):
+        if index not in answered:
+            yield index, None, "No result from backend"
+
+
+def get_info_each(backend_path, urls, concurrency=4, running=None):
+    """Resolve many URLs like get_info_bulk, falling back to one call per URL
+
+    Backends without bulk info fail the bulk call before answering; each
+    URL is then resolved with get_info, so callers still get every result.
+    """
+    urls = list(urls)
+    try:
+        yield from get_info_bulk(backend_path, urls, concurrency, running)
+    except BackendError:
+        for index, url in enumerate(urls):
+            try:
+                yield index, get_info(backend_path, url, running=running), None
+            except (BackendError, subprocess.TimeoutExpired, ValueError, OSError) as e:
+                yield index, None, str(e) or "Unknown error occurred"
+
+
+def download_video(backend_path, url, quality, file_format, path, on_output=None, extra_args=None, running=None,
+                   timer=None, job_id=None):
+    """Run a backend download and wait for it to finish
+
+    A backend that supports it is asked for protocol events tagged with
+    job_id (older ones get the version 0 arguments), and each output line is decoded once with events.decode_event and passed to
+    on_output as an event dict. If a set is passed as running, the process
+    is kept in it while it runs so it can be killed to cancel the download.
+    A metrics.JobTimer passed as timer is fed the events to time the
+    download phases. Returns a (success, error_output) tuple.
+    """
+    cmd = [
+        backend_path,
+        "--command", "download",
+        "--url", url,
+        "--quality", quality,
+        "--format", file_format,
+        "--path", path
+    ] + event_args(backend_path, job_id)
+    if extra_args:
+        cmd += list(extra_args)
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, bufsize=1, creationflags=creation_flags())
+    if timer is not None:
+        timer.mark('spawn')
+    if running is not None:
+        running.add(process)
+
+    # Drain stderr on its own thread so a chatty backend cannot block
+    errors = []
+    stderr_thread = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+    stderr_thread.start()
+
+    try:
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            event = decode_event(line)
+            if timer is not None:
+                timer.observe_event(event)
+            if on_output:
+                on_output(event)
+        return_code = process.wait()
+        stderr_thread.join()
+    finally:
+        if running is not None:
+            running.discard(process)
+    return return_code == 0, ''.join(errors)
@@ -9,8 +9,40 @@ import os
 import sys
 import subprocess
 import shutil
+import argparse
+import time
 from pathlib import Path
 
+# Backend distribution profiles:
+#   onefile - a single exe that unpacks itself to a temp folder on every run
+#   onedir  - an unpacked folder with optimized bytecode and unused modules
+#             left out, so each run starts without unpacking anything
+BACKEND_PROFILES = {
+    "onefile": [
+        "--onefile",
+        "--hidden-import", "ffmpeg",
+        "--hidden-import", "yt_dlp",
+        # Imported only when profiling is requested
+        "--hidden-import", "profiling",
+    ],
+    "onedir": [
+        "--onedir",
+        "--optimize", "1",
+        "--hidden-import", "ffmpeg",
+        "--hidden-import", "yt_dlp",
+        "--hidden-import", "profiling",
+        # The backend never uses these
+        "--exclude-module", "tkinter",
+        "--exclude-module", "PIL",
+        "--exclude-module", "unittest",
+        "--exclude-module", "pydoc",
+        "--exclude-module", "test",
+    ],
+}
+
+# Runs per profile in the spawn benchmark
+BENCHMARK_RUNS = 5
+
 def print_header():
     """Print build header"""
     print("=" * 50)
@@ -44,20 +76,19 @@ def check_dependencies():
     
     print()
 
-def build_backend():
-    """Build the backend executable"""
-    print("Building backend executable...")
+def build_backend(profile="onefile", distpath="dist"):
+    """Build the backend executable with one of the BACKEND_PROFILES"""
+    print(f"Building backend executable ({profile})...")
     
     cmd = [
         "pyinstaller",
-        "--onefile",
         "--console",
+        "--noconfirm",
         "--name", "kartoshka-backend",
-        "--distpath", "dist",
+        "--distpath", distpath,
         "--workpath", "build",
         "--specpath", "build",
-        "--hidden-import", "ffmpeg",
-        "--hidden-import", "yt_dlp",
+    ] + BACKEND_PROFILES[profile] + [
         "backend.py"
     ]
     
@@ -70,6 +101,30 @@ def build_backend():
     
     return True
 
+def build_cli():
+    """Build the headless CLI executable"""
+    print("Building CLI executable...")
+    
+    cmd = [
+        "pyinstaller",
+        "--onefile",
+        "--console",
+        "--name", "kartoshka-cli",
+        "--distpath", "dist",
+        "--workpath", "build",
+        "--specpath", "build",
+        "cli.py"
+    ]
+    
+    try:
+        subprocess.run(cmd, check=True)
+        print("CLI built successfully")
+    except subprocess.CalledProcessError as e:
+        print(f"CLI build failed: {e}")
+        return False
+    
+    return True
+
 def build_gui():
     """Build the GUI executable"""
     print("Building GUI executable...")
@@ -107,7 +162,53 @@ def build_gui():
     
     return True
 
-def create_release_package():
+def backend_executable(distpath, profile):
+    """Path of the backend executable built with a profile"""
+    name = "kartoshka-backend.exe" if os.name == 'nt' else "kartoshka-backend"
+    if profile == "onedir":
+        return os.path.join(distpath, "kartoshka-backend", name)
+    return os.path.join(distpath, name)
+
+def time_first_response(cmd, timeout=60):
+    """Seconds from spawning a command to its first byte of output"""
+    started = time.perf_counter()
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
+    try:
+        process.stdout.read(1)
+        elapsed = time.perf_counter() - started
+        process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise
+    return elapsed
+
+def benchmark_backend_profiles(profiles=None, runs=BENCHMARK_RUNS):
+    """Build the backend with each profile and time spawn to first response
+    
+    Uses --help, which does no network work, so the time is the launcher's
+    unpacking, interpreter start and imports. The first run is reported
+    separately as the cold start.
+    """
+    results = {}
+    for profile in profiles or BACKEND_PROFILES:
+        distpath = os.path.join("dist", f"bench-{profile}")
+        if not build_backend(profile, distpath):
+            continue
+        cmd = [backend_executable(distpath, profile), "--help"]
+        cold = time_first_response(cmd)
+        warm = sorted(time_first_response(cmd) for _ in range(runs))
+        results[profile] = (cold, warm)
+    
+    print()
+    print(f"Backend spawn to first response (cold, then {runs} warm runs):")
+    for profile, (cold, warm) in results.items():
+        print(f"   {profile:<8} cold {cold * 1000:7.0f} ms   warm median {warm[len(warm) // 2] * 1000:7.0f} ms   "
+              f"warm max {warm[-1] * 1000:7.0f} ms")
+    return results
+
+def create_release_package(backend_profile="onefile"):
     """Create the final release package"""
     print("Creating release package...")
     
@@ -117,7 +218,12 @@ def create_release_package():
     
     # Copy executables
     shutil.copy2("dist/kartoshka-youtuber.exe", "release/")
-    shutil.copy2("dist/kartoshka-backend.exe", "release/")
+    shutil.copy2("dist/kartoshka-cli.exe", "release/")
+    if backend_profile == "onedir":
+        # The backend exe needs its _internal folder next to it
+        shutil.copytree("dist/kartoshka-backend", "release", dirs_exist_ok=True)
+    else:
+        shutil.copy2("dist/kartoshka-backend.exe", "release/")
     
     # Copy icon if exists
     if os.path.exists("icon.ico"):
@@ -143,6 +249,8 @@ A professional YouTube downloader with modern GUI interface.
 
 - `kartoshka-youtuber.exe` - Main GUI application
 - `kartoshka-backend.exe` - Backend downloader (required)
+- `kartoshka-cli.exe` - Headless command line for scripts and scheduled jobs
+- `_internal` - Backend runtime files (only in builds made with `--backend-profile onedir`)
 - `icon.ico` - Application icon
 
 ## Requirements
@@ -194,6 +302,7 @@ Visit https://www.naderb.org for more projects.
     print("Release package created in 'release' folder")
     print(f"   - kartoshka-youtuber.exe")
     print(f"   - kartoshka-backend.exe")
+    print(f"   - kartoshka-cli.exe")
     print(f"   - README.txt")
     if os.path.exists("icon.ico"):
         print(f"   - icon.ico")
@@ -209,13 +318,20 @@ def cleanup():
             print(f"Removed {dir_name} directory")
     
     # Remove spec files
-    for spec_file in ["backend.spec", "gui.spec"]:
+    for spec_file in ["backend.spec", "gui.spec", "cli.spec"]:
         if os.path.exists(spec_file):
             os.remove(spec_file)
             print(f"Removed {spec_file}")
 
 def main():
     """Main build function"""
+    parser = argparse.ArgumentParser(description="Build Kartoshka Youtuber")
+    parser.add_argument("--backend-profile", choices=sorted(BACKEND_PROFILES), default="onefile",
+                        help="How the backend is packaged")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Build every backend profile and compare their spawn times, then exit")
+    args = parser.parse_args()
+    
     print_header()
     
     # Check if we're on Windows
@@ -227,8 +343,12 @@ def main():
     # Check dependencies
     check_dependencies()
     
+    if args.benchmark:
+        benchmark_backend_profiles()
+        return
+    
     # Build applications
-    if not build_backend():
+    if not build_backend(args.backend_profile):
         print("Build failed at backend stage")
         return
     
@@ -236,8 +356,12 @@ def main():
         print("Build failed at GUI stage")
         return
     
+    if not build_cli():
+        print("Build failed at CLI stage")
+        return
+    
     # Create release package
-    create_release_package()
+    create_release_package(args.backend_profile)
     
     print()
     print("Build completed successfully!")
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Kartoshka Youtuber headless CLI
+Runs downloads without the GUI, for scripts and scheduled jobs
+Created by NaderB - https://www.naderb.org
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from backend_client import BackendError, get_app_dir, get_backend_path, get_info, get_info_each, download_video
+from quality import estimate_download_size
+from sync import SyncState, sync_source
+from streaming import open_sink, stream_download
+from writer import StagedFile
+from integrity import HashingWriter, append_manifest, manifest_record, verify_manifest, write_sidecar
+from profiling import PROFILE_ENV, profile_session, profiling_enabled
+from scheduler import AUDIO_OUTPUTS, DownloadScheduler, Job, format_bytes
+from tagging import build_tags, tag_audio_file
+from time_windows import DownloadSchedule
+from job_api import DEFAULT_MAX_QUEUE, DEFAULT_PORT, serve_jobs
+from job_queue import DEFAULT_LEASE_SECONDS, JobQueue, default_worker_name, run_worker
+
+
+def schedule_arg(text):
+    """Parse a --schedule value for argparse"""
+    try:
+        return DownloadSchedule.parse(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+SCHEDULE_HELP = "When downloads run and how fast, e.g. '01:00-06:00; mon-fri 09:00-17:00@2M'"
+
+
+def build_parser():
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(prog="kartoshka-cli",
+                                     description="Kartoshka Youtuber headless downloader")
+    parser.add_argument("--backend", default=None, help="Path to the backend executable")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write cProfile and tracemalloc profiles for this run and its backend calls")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = subparsers.add_parser("sync", help="Download only new uploads from channels or playlists")
+    sync_parser.add_argument("urls", nargs="+", help="Channel or playlist URLs")
+    sync_parser.add_argument("--path", default=str(get_app_dir() / "download"), help="Download folder")
+    sync_parser.add_argument("--quality", default="best", help="Video quality")
+    sync_parser.add_argument("--format", default="mp4", help="Output format")
+    sync_parser.add_argument("--state", default=str(get_app_dir() / "sync_state.json"),
+                             help="File that stores what was already synced")
+    sync_parser.add_argument("--max-size", type=float, default=None, help="Size budget per video in MB")
+    sync_parser.add_argument("--max-bitrate", type=float, default=None, help="Bitrate cap in Mbps")
+    sync_parser.add_argument("--page-size", type=int, default=50, help="Entries fetched per page")
+    sync_parser.add_argument("--mark-only", action="store_true",
+                             help="Record current uploads as synced without downloading them")
+    sync_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    sync_parser.add_argument("--schedule", type=schedule_arg, default=None, help=SCHEDULE_HELP)
+
+    stream_parser = subparsers.add_parser("stream", help="Stream media to stdout, a pipe or a socket without saving it")
+    stream_parser.add_argument("url", help="Video URL")
+    stream_parser.add_argument("--to", default="-",
+                               help="Target: - (stdout), pipe:PATH, tcp:HOST:PORT, unix:PATH or file:PATH")
+    stream_parser.add_argument("--events", default=None,
+                               help="File that receives JSON progress events (default: stderr)")
+    stream_parser.add_argument("--quality", default="best", help="Video quality")
+    stream_parser.add_argument("--format", default="mp4", help="Output format")
+    stream_parser.add_argument("--max-size", type=float, default=None, help="Size budget in MB")
+    stream_parser.add_argument("--max-bitrate", type=float, default=None, help="Bitrate cap in Mbps")
+    stream_parser.add_argument("--hash", action="store_true",
+                               help="Hash the stream as it passes and report the digest when done")
+    stream_parser.add_argument("--buffer-size", type=int, default=None,
+                               help="Write buffer in bytes for a file: target")
+
+    info_parser = subparsers.add_parser("info", help="Resolve many URLs in one backend call, printing JSON lines")
+    info_parser.add_argument("urls", nargs="*", help="Video URLs")
+    info_parser.add_argument("--from-file", default=None,
+                             help="File with one URL per line, or - to read them from stdin")
+    info_parser.add_argument("--concurrency", type=int, default=4, help="URLs the backend resolves at a time")
+
+    serve_parser = subparsers.add_parser("serve", help="Run downloads submitted over a localhost HTTP API")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    serve_parser.add_argument("--workers", type=int, default=2, help="Downloads run at the same time")
+    serve_parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                              help="Waiting jobs at which new submissions get 429 responses")
+    serve_parser.add_argument("--path", default=str(get_app_dir() / "download"),
+                              help="Download folder for jobs that do not give one")
+    serve_parser.add_argument("--schedule", type=schedule_arg, default=None,
+                              help=SCHEDULE_HELP + "; jobs may send their own")
+
+    default_queue = str(get_app_dir() / "queue.db")
+    enqueue_parser = subparsers.add_parser("enqueue", help="Add downloads to a shared queue for workers")
+    enqueue_parser.add_argument("urls", nargs="+", help="Video URLs")
+    enqueue_parser.add_argument("--queue", default=default_queue, help="Queue file, may be on shared storage")
+    enqueue_parser.add_argument("--path", default=str(get_app_dir() / "download"), help="Download folder")
+    enqueue_parser.add_argument("--quality", default="best", help="Video quality")
+    enqueue_parser.add_argument("--format", default="mp4", help="Output format")
+    enqueue_parser.add_argument("--max-size", type=float, default=None, help="Size budget per video in MB")
+    enqueue_parser.add_argument("--max-bitrate", type=float, default=None, help="Bitrate cap in Mbps")
+
+    worker_parser = subparsers.add_parser("worker", help="Download jobs from a shared queue")
+    worker_parser.add_argument("--queue", default=default_queue, help="Queue file, may be on shared storage")
+    worker_parser.add_argument("--name", default=None, help="Worker name (default: host-pid)")
+    worker_parser.add_argument("--concurrency", type=int, default=1, help="Jobs this worker downloads at a time")
+    worker_parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                               help="Seconds before a silent worker's job is given to another worker")
+    worker_parser.add_argument("--path", default=None,
+                               help="Save here instead of the folder each job was queued with")
+    worker_parser.add_argument("--exit-when-empty", action="store_true", help="Stop once the queue is empty")
+
+    status_parser = subparsers.add_parser("queue-status", help="Show a shared queue's jobs and per-worker throughput")
+    status_parser.add_argument("--queue", default=default_queue, help="Queue file")
+    status_parser.add_argument("--json", action="store_true", help="Print the status as JSON")
+
+    verify_parser = subparsers.add_parser("verify", help="Check downloaded files against a manifest")
+    verify_parser.add_argument("manifest", help="Path to a manifest.jsonl file")
+    verify_parser.add_argument("--workers", type=int, default=4, help="Files read in parallel")
+    verify_parser.add_argument("--full", action="store_true",
+                               help="Also check sha256 when a fast digest is recorded")
+
+    return parser
+
+
+def budget_args(args):
+    """Get backend arguments for the size and bitrate budget options"""
+    extra_args = []
+    if args.max_size:
+        extra_args += ["--max-size", str(int(args.max_size * 1024 * 1024))]
+    if args.max_bitrate:
+        extra_args += ["--max-bitrate", str(int(args.max_bitrate * 1000))]
+    return extra_args
+
+
+def run_sync(args, backend_path):
+    """Run the sync command"""
+    state = SyncState(args.state)
+    extra_args = budget_args(args)
+    # Scheduled syncs go through the scheduler, which applies the windows
+    scheduler = DownloadScheduler(backend_path, max_workers=1, schedule=args.schedule) if args.schedule else None
+
+    def download(entry):
+        print(f"Downloading: {entry.get('title') or entry.get('url')}")
+        tags = build_tags(entry)
+        if scheduler is not None:
+            job = scheduler.submit(Job(entry['url'], args.quality, args.format, args.path, extra_args,
+                                       title=entry.get('title'), tags=tags))
+            scheduler.wait(job)
+            success, error_output = job.status == 'done', job.error or ""
+        else:
+            files = []
+
+            def on_output(event):
+                if event['type'] == 'done':
+                    files.extend(event.get('files') or [])
+
+            success, error_output = download_video(backend_path, entry['url'], args.quality,
+                                                   args.format, args.path, on_output=on_output,
+                                                   extra_args=extra_args)
+            if success and args.format in AUDIO_OUTPUTS:
+                for name in files:
+                    tag_audio_file(os.path.join(args.path, name), tags)
+        if not success:
+            print(f"Download failed: {error_output.strip()}", file=sys.stderr)
+        return success
+
+    reports = []
+    for url in args.urls:
+        try:
+            reports.append(sync_source(backend_path, url, state, download,
+                                       page_size=args.page_size, mark_only=args.mark_only))
+        except Exception as e:
+            print(f"Error syncing {url}: {e}", file=sys.stderr)
+            reports.append({'url': url, 'error': str(e)})
+    if scheduler is not None:
+        scheduler.shutdown()
+
+    if args.json:
+        print(json.dumps(reports))
+    else:
+        for report in reports:
+            if 'error' in report:
+                print(f"{report['url']}: error - {report['error']}")
+            else:
+                print(f"{report['url']}: scanned {report['scanned']}, "
+                      f"downloaded {report['downloaded']}, failed {report['failed']}")
+
+    return 0 if all('error' not in r and r['failed'] == 0 for r in reports) else 1
+
+
+def stream_size(args, backend_path):
+    """Estimate a file: stream's size so its space can be preallocated, or None"""
+    if not args.to.startswith('file:'):
+        return None
+    try:
+        info = get_info(backend_path, args.url)
+    except (BackendError, subprocess.TimeoutExpired, ValueError, OSError):
+        return None
+    max_size = int(args.max_size * 1024 * 1024) if args.max_size else None
+    max_bitrate = int(args.max_bitrate * 1000) if args.max_bitrate else None
+    return estimate_download_size(info, args.quality, args.format, max_size, max_bitrate) or None
+
+
+def run_stream(args, backend_path):
+    """Run the stream command"""
+    # Progress must never be mixed into the media stream
+    events = open(args.events, "a", encoding="utf-8") if args.events else sys.stderr
+
+    def on_event(event):
+        events.write(json.dumps(event) + "\n")
+        events.flush()
+
+    sink = staged = open_sink(args.to, args.buffer_size, stream_size(args, backend_path))
+    if args.hash:
+        sink = HashingWriter(sink, fast=True)
+    try:
+        success, total = stream_download(backend_path, args.url, args.quality, args.format, sink,
+                                         on_event=on_event, extra_args=budget_args(args))
+        if success and isinstance(staged, StagedFile):
+            # Only a complete stream is renamed into place
+            staged.publish()
+            if args.hash:
+                # Record the file so `verify` can check it later
+                folder = os.path.dirname(staged.dest_path)
+                append_manifest(folder, manifest_record(staged.dest_path, sink.size, sink.digests(), folder))
+                write_sidecar(staged.dest_path, sink.digests())
+    finally:
+        sink.close()
+
+    done = {'type': 'stream_done', 'success': success, 'bytes': total}
+    if args.hash:
+        done.update(sink.digests())
+    on_event(done)
+    if events is not sys.stderr:
+        events.close()
+    return 0 if success else 1
+
+
+def run_info(args, backend_path):
+    """Run the info command
+
+    Prints one JSON line per URL as soon as it is resolved, so the output is
+    in completion order; the index field gives each URL's input position.
+    """
+    urls = list(args.urls)
+    if args.from_file:
+        source = sys.stdin if args.from_file == '-' else open(args.from_file, "r", encoding="utf-8")
+        with source:
+            urls += [line.strip() for line in source if line.strip()]
+    if not urls:
+        print("No URLs given", file=sys.stderr)
+        return 2
+
+    failed = 0
+    try:
+        for index, info, error in get_info_each(backend_path, urls, concurrency=args.concurrency):
+            result = {'index': index, 'url': urls[index]}
+            if error:
+                failed += 1
+                result['error'] = error
+            else:
+                result['info'] = info
+            print(json.dumps(result), flush=True)
+    except BackendError as e:
+        print(f"Backend error: {e}", file=sys.stderr)
+        return 1
+    return 0 if not failed else 1
+
+
+def run_serve(args, backend_path):
+    """Run the serve command until interrupted"""
+    scheduler = DownloadScheduler(backend_path, max_workers=max(1, args.workers), schedule=args.schedule)
+    server = serve_jobs(scheduler, args.port, max_queue=args.max_queue, default_path=args.path)
+    print(f"Serving the job API on http://127.0.0.1:{args.port}/jobs", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        scheduler.shutdown()
+    return 0
+
+
+def run_enqueue(args):
+    """Run the enqueue command"""
+    queue = JobQueue(args.queue)
+    for url in args.urls:
+        job_id = queue.enqueue(url, args.quality, args.format, args.path, budget_args(args))
+        print(f"Queued job {job_id}: {url}")
+    return 0
+
+
+def run_worker_command(args, backend_path):
+    """Run the worker command until the queue is empty or it is interrupted"""
+    queue = JobQueue(args.queue)
+    name = args.name or default_worker_name()
+
+    def on_job(job, success, error):
+        if success:
+            print(f"Done: job {job['id']} {job['url']}", flush=True)
+        elif error == "Cancelled":
+            print(f"Cancelled: job {job['id']} {job['url']}", flush=True)
+        else:
+            print(f"Failed: job {job['id']} {job['url']}: {error}", flush=True)
+
+    def work(index):
+        worker_name = name if args.concurrency == 1 else f"{name}-{index + 1}"
+        run_worker(queue, backend_path, worker_name, lease_seconds=args.lease, path=args.path,
+                   stop=stop, exit_when_empty=args.exit_when_empty, on_job=on_job)
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=work, args=(index,), daemon=True) for index in range(max(1, args.concurrency))]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(1)
+    except KeyboardInterrupt:
+        # Workers kill their downloads and release the jobs before exiting,
+        # so no other worker picks them up while files are still being written
+        print("Stopping workers...", file=sys.stderr, flush=True)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return 0
+
+
+def run_queue_status(args):
+    """Run the queue-status command"""
+    queue = JobQueue(args.queue)
+    counts = queue.counts()
+    workers = queue.worker_stats()
+    if args.json:
+        print(json.dumps({'jobs': counts, 'workers': workers}))
+        return 0
+
+    print("Jobs: " + (", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "none"))
+    now = time.time()
+    for worker in workers:
+        current = f"job {worker['current_job']}" if worker['current_job'] else "idle"
+        print(f"{worker['name']}: {worker['done']} done, {worker['failed']} failed, "
+              f"{format_bytes(worker['bytes'])} at {format_bytes(int(worker['bytes_per_second']))}/s, "
+              f"{current}, seen {now - worker['last_seen']:.0f}s ago")
+    return 0
+
+
+def run_verify(args):
+    """Run the verify command"""
+    results = verify_manifest(args.manifest, workers=args.workers, full=args.full)
+    bad = [(path, status) for path, status in results if status != 'ok']
+    for path, status in bad:
+        print(f"{status}: {path}")
+    print(f"Verified {len(results)} files, {len(bad)} problems")
+    return 0 if not bad else 1
+
+
+def main(argv=None):
+    """Main function"""
+    args = build_parser().parse_args(argv)
+    backend_path = args.backend or get_backend_path()
+
+    profile = profiling_enabled(args.profile)
+    if profile:
+        # Backend processes inherit the environment and profile their commands too
+        os.environ[PROFILE_ENV] = '1'
+    url = getattr(args, 'url', None) or (getattr(args, 'urls', None) or [None])[0]
+    with profile_session(args.command, url, enabled=profile):
+        return run_command(args, backend_path)
+
+
+def run_command(args, backend_path):
+    """Run the chosen subcommand"""
+    if args.command == "sync":
+        return run_sync(args, backend_path)
+    if args.command == "stream":
+        return run_stream(args, backend_path)
+    if args.command == "info":
+        return run_info(args, backend_path)
+    if args.command == "serve":
+        return run_serve(args, backend_path)
+    if args.command == "enqueue":
+        return run_enqueue(args)
+    if args.command == "worker":
+        return run_worker_command(args, backend_path)
+    if args.command == "queue-status":
+        return run_queue_status(args)
+    if args.command == "verify":
+        return run_verify(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
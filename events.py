@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Backend event protocol for Kartoshka Youtuber
+Encodes and decodes the versioned event lines the backend prints while it works
+Created by NaderB - https://www.naderb.org
+"""
+
+import json
+import time
+
+PROTOCOL_VERSION = 1
+
+# Event kinds of protocol version 1. Every JSON event is one line holding
+# an object with "v" (protocol version), "type" (one of these) and "job"
+# (the --job-id it was started with, or null):
+#   hello     first line: {"compact": bool, "interval_ms": n}
+#   progress  {"percent", "downloaded_bytes", "total_bytes", "speed", "eta"}
+#   phase     {"phase": name} for the download metrics
+#   retry     a request was retried
+#   log       {"message": text}
+#   error     {"message": text}
+#   done      {"success": bool, "files": [...]} with paths absolute or
+#             relative to --path, plus "sha256" with --hash
+EVENT_KINDS = ('hello', 'progress', 'phase', 'retry', 'log', 'error', 'done')
+
+# Compact progress line, used with --compact-progress:
+#   @p JOB PERCENT DOWNLOADED_BYTES TOTAL_BYTES SPEED ETA
+# with "-" for unknown values and for a missing job ID
+COMPACT_PREFIX = "@p "
+COMPACT_FIELDS = ('percent', 'downloaded_bytes', 'total_bytes', 'speed', 'eta')
+
+# Minimum time between progress events the backend prints for one job
+DEFAULT_PROGRESS_INTERVAL_MS = 250
+
+
+def protocol_args(job_id=None, compact=True, interval_ms=DEFAULT_PROGRESS_INTERVAL_MS):
+    """Get the backend arguments that select this protocol version"""
+    args = ["--events", str(PROTOCOL_VERSION), "--progress-interval", str(interval_ms)]
+    if job_id is not None:
+        args += ["--job-id", str(job_id)]
+    if compact:
+        args.append("--compact-progress")
+    return args
+
+
+def _number(text, kind):
+    return None if text == '-' else kind(text)
+
+
+def _text(value):
+    return '-' if value is None else f"{value:g}" if isinstance(value, float) else str(value)
+
+
+def encode_event(kind, job_id=None, **fields):
+    """Encode one event as a JSON line (without the newline)"""
+    event = {'v': PROTOCOL_VERSION, 'type': kind, 'job': job_id}
+    event.update(fields)
+    return json.dumps(event, separators=(',', ':'))
+
+
+def encode_progress(job_id, percent, downloaded_bytes=None, total_bytes=None, speed=None, eta=None,
+                    compact=False):
+    """Encode a progress event, as a compact line if asked"""
+    if not compact:
+        return encode_event('progress', job_id, percent=percent, downloaded_bytes=downloaded_bytes,
+                            total_bytes=total_bytes, speed=speed, eta=eta)
+    values = (job_id, percent, downloaded_bytes, total_bytes, speed, eta)
+    return COMPACT_PREFIX + " ".join(_text(value) for value in values)
+
+
+def decode_event(line):
+    """Decode one backend output line into an event dict
+
+    Compact progress is split rather than parsed as JSON, which keeps the
+    cost of high-rate progress small. JSON lines without a version are from
+    older backends and decode as version 0. Anything else becomes a log
+    event, so every line decodes to something with a "type".
+    """
+    if line.startswith(COMPACT_PREFIX):
+        parts = line.split()
+        if len(parts) == 7:
+            try:
+                return {
+                    'v': PROTOCOL_VERSION,
+                    'type': 'progress',
+                    'job': _number(parts[1], int),
+                    'percent': _number(parts[2], float) or 0.0,
+                    'downloaded_bytes': _number(parts[3], int),
+                    'total_bytes': _number(parts[4], int),
+                    'speed': _number(parts[5], float),
+                    'eta': _number(parts[6], float)
+                }
+            except ValueError:
+                pass
+        return {'v': PROTOCOL_VERSION, 'type': 'log', 'job': None, 'message': line}
+
+    if line.startswith('{'):
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            event = None
+        if isinstance(event, dict):
+            event.setdefault('v', 0)
+            event.setdefault('type', 'log' if 'message' in event else 'unknown')
+            event.setdefault('job', None)
+            return event
+    return {'v': 0, 'type': 'log', 'job': None, 'message': line}
+
+
+class ProgressThrottle:
+    """Let progress events through at most once per interval
+
+    The first event, the final one (100%) and any event after a gap of at
+    least the interval pass; the rest are dropped.
+    """
+
+    def __init__(self, interval_ms=DEFAULT_PROGRESS_INTERVAL_MS, clock=time.monotonic):
+        self.interval = interval_ms / 1000
+        self.clock = clock
+        self._last = None
+
+    def ready(self, percent=0):
+        """Check whether a progress event at percent should be sent now"""
+        now = self.clock()
+        if self._last is None or percent >= 100 or now - self._last >= self.interval:
+            self._last = now
+            return True
+        return False
@@ -5,6 +5,11 @@ Modern GUI frontend for YouTube downloading
 Created by NaderB - https://www.naderb.org
 """
 
+import time
+
+# Startup is timed from here, before the heavier imports
+STARTUP_STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import subprocess
@@ -13,7 +18,51 @@ import threading
 import os
 import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import webbrowser
+import base64
+
+from backend_client import BackendError, download_video, get_info, get_info_each, prewarm_backend
+from metadata_cache import MetadataCache, cache_key, first_page_items, info_cache_url, is_complete_url
+from playlist import Bitset, PlaylistEntries, PlaylistIndex, PlaylistPager, downloaded_keys
+from sections import format_time, parse_sections, sections_arg, sections_duration
+from quality import (STREAM_COPY_AUDIO, estimate_download_size, pick_audio_format, pick_for_budget,
+                     quality_height_cap, split_budget)
+from scheduler import DownloadScheduler, Job, format_bytes, next_job_id
+from tagging import build_tags, tag_audio_file
+from events import ProgressThrottle
+from time_windows import DownloadSchedule
+from throughput import GRAPH_INTERVAL_MS, Sparkline, ThroughputHistory
+from lag_monitor import LagMonitor
+from profiling import PROFILE_ENV, profile_session, profiling_enabled
+from job_api import DEFAULT_MAX_QUEUE, serve_jobs
+from metrics import PERCENTILES, PHASES, JobTimer, MetricsRecorder, serve_prometheus
+from thumbnails import THUMBNAIL_SIZE, ImageLRU, ThumbnailCache, thumbnail_url, thumbnails_available
+from startup import StartupTimeline
+
+# Output formats offered in the format pickers. m4a and opus keep the
+# downloaded audio stream as-is; mp3 is converted from the smallest
+# suitable audio-only stream.
+OUTPUT_FORMATS = ["mp4", "mp3", "m4a", "opus"]
+AUDIO_FORMATS = ["mp3"] + list(STREAM_COPY_AUDIO)
+
+# Pause after typing in the URL field before info is fetched speculatively
+PREFETCH_DELAY_MS = 600
+
+# Shortest gap between progress bar redraws for a single download
+GUI_PROGRESS_INTERVAL_MS = 100
+
+# Playlist rows shown or hidden per callback when the filter changes, so
+# filtering thousands of rows never holds the window for more than a frame
+FILTER_ROWS_PER_FRAME = 300
+
+# Pause before re-filtering after loaded details change entries
+FILTER_REFRESH_MS = 250
+
+ALL_UPLOADERS = "All uploaders"
+
+startup_timeline = StartupTimeline(STARTUP_STARTED)
+startup_timeline.mark("imports")
 
 class KartoshkaYoutuberGUI:
     def __init__(self, root):
@@ -29,28 +78,16 @@ class KartoshkaYoutuberGUI:
         accent_color = '#007bff'  # Blue accent
         border_color = '#dee2e6'  # Light border
         
-        self.root.option_add('*background', bg_color)
-        self.root.option_add('*TFrame*background', bg_color)
-        self.root.option_add('*TLabelFrame*background', bg_color)
-        self.root.option_add('*TLabel*background', bg_color)
-        self.root.option_add('*TButton*background', bg_color)
-        self.root.option_add('*TEntry*background', bg_color)
-        self.root.option_add('*TCombobox*background', bg_color)
-        self.root.option_add('*TScrollbar*background', bg_color)
-        self.root.option_add('*Frame*background', bg_color)
-        self.root.option_add('*Label*background', bg_color)
-        self.root.option_add('*Button*background', bg_color)
-        self.root.option_add('*Entry*background', bg_color)
-        self.root.option_add('*Canvas*background', bg_color)
-        self.root.option_add('*Scrollbar*background', bg_color)
-        
-        # Set professional colors for all widget types
-        self.root.option_add('*activeBackground', '#e9ecef')
-        self.root.option_add('*selectBackground', accent_color)
-        self.root.option_add('*highlightBackground', accent_color)
-        self.root.option_add('*troughColor', border_color)
-        self.root.option_add('*fieldBackground', '#ffffff')
-        self.root.option_add('*foreground', fg_color)
+        # Set professional colors for all widget types. '*background' covers
+        # every widget class, so per-class entries are not needed
+        for pattern, value in (('*background', bg_color),
+                               ('*activeBackground', '#e9ecef'),
+                               ('*selectBackground', accent_color),
+                               ('*highlightBackground', accent_color),
+                               ('*troughColor', border_color),
+                               ('*fieldBackground', '#ffffff'),
+                               ('*foreground', fg_color)):
+            self.root.option_add(pattern, value)
         
         # Set window icon if available
         try:
@@ -63,6 +100,17 @@ class KartoshkaYoutuberGUI:
         self.quality_var = tk.StringVar(value="best")
         self.selected_quality = "best"  # Store the actually selected quality
         self.format_var = tk.StringVar(value="mp4")
+        # Optional size (MB) and bitrate (Mbps) budget for quality selection
+        self.max_size_var = tk.StringVar()
+        self.max_bitrate_var = tk.StringVar()
+        self.budget_scope_var = tk.StringVar(value="per video")
+        # Optional time ranges such as "1:00-3:30, 1:02:00-1:05:00"
+        self.sections_var = tk.StringVar()
+        self.precise_cuts_var = tk.BooleanVar(value=False)
+        # Hash files while they are written and keep a manifest.jsonl
+        self.record_hashes_var = tk.BooleanVar(value=False)
+        # Write buffer size in KB, 0 for the backend default
+        self.write_buffer_kb_var = tk.IntVar(value=0)
         # Set default download path to 'download' folder in the same directory as the app
         if getattr(sys, 'frozen', False):
             # Running as compiled exe
@@ -75,8 +123,86 @@ class KartoshkaYoutuberGUI:
         self.is_downloading = False
         self.video_info = None
         self.playlist_info = None
-        self.playlist_videos = []
-        self.playlist_checkboxes = []
+        self.playlist_videos = PlaylistEntries()
+        self.playlist_selection = Bitset()
+        self.playlist_rows = []
+        
+        # Playlist metadata enrichment
+        self.metadata_cache = MetadataCache()
+        self.enrich_metadata_var = tk.BooleanVar(value=False)
+        self.enrich_workers = 4
+        self.enrich_executor = None
+        self.enrich_cancel = threading.Event()
+        self.enrich_processes = set()
+        self.enrich_queued = set()
+        
+        # Info for a pasted or typed URL is fetched before Get Info is clicked
+        self.prefetch_info_var = tk.BooleanVar(value=True)
+        self.prefetch = None
+        self.prefetch_after_id = None
+        
+        # Queued downloads run on a scheduler that checks free disk space
+        self.parallel_downloads_var = tk.IntVar(value=2)
+        # Optional time windows and rate limits for queued downloads
+        self.download_schedule_var = tk.StringVar(value="")
+        self.download_schedule = None
+        self.scheduler = None
+        self.playlist_jobs = []
+        self.logged_job_ids = set()
+        # Single downloads waiting for the download window, by job ID, with
+        # the last status logged for each
+        self.scheduled_jobs = {}
+        self.job_refresh_pending = False
+        
+        # Recent total and per-job speeds for the progress graph
+        self.throughput = ThroughputHistory()
+        self.sparkline = None
+        self.graph_after_id = None
+        self.current_speed = 0
+        
+        # Phase timings of finished downloads, optionally served to Prometheus
+        self.metrics = MetricsRecorder(app_dir / "metrics.jsonl")
+        self.metrics_port_var = tk.IntVar(value=0)
+        self.metrics_server = None
+        
+        # Optional localhost API that queues jobs on the same scheduler
+        self.api_port_var = tk.IntVar(value=0)
+        self.api_max_queue_var = tk.IntVar(value=DEFAULT_MAX_QUEUE)
+        self.api_server = None
+        self.api_server_settings = None
+        
+        # Opt-in event loop lag monitor, also enabled with KARTOSHKA_LAG_MONITOR=1
+        self.app_dir = app_dir
+        self.lag_monitor = LagMonitor(self.root)
+        self.lag_monitor_var = tk.BooleanVar(value=os.environ.get('KARTOSHKA_LAG_MONITOR') == '1')
+        
+        # Thumbnails are cached on disk and decoded only for visible rows
+        self.show_thumbnails_var = tk.BooleanVar(value=thumbnails_available())
+        self.thumbnail_cache = ThumbnailCache(app_dir / "thumbnails")
+        self.thumbnail_images = ImageLRU()
+        self.thumbnail_placeholder = None
+        self.thumbnail_labels = {}
+        self.thumbnail_shown = set()
+        self.thumbnail_refresh_pending = False
+        self.thumbnail_hits = 0
+        self.thumbnail_requests = 0
+        self.playlist_row_frames = []
+        
+        # Large playlists and channels are fetched one page at a time
+        self.playlist_page_size_var = tk.IntVar(value=100)
+        self.playlist_pager = None
+        self.playlist_page_loading = False
+        
+        # Playlist search: matching indexes (None when nothing is filtered)
+        # and the rows currently hidden by the filter
+        self.playlist_index = None
+        self.playlist_matches = None
+        self.playlist_hidden = set()
+        self.playlist_filter_options = None
+        self.playlist_filter_pending = False
+        self.playlist_filter_generation = 0
+        # Set by Search All Pages to keep fetching pages until the end
+        self.playlist_search_all = False
         
         # Backend path - look for backend exe in the same directory as the app
         if getattr(sys, 'frozen', False):
@@ -94,6 +220,29 @@ class KartoshkaYoutuberGUI:
         # Bind window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
+        if self.lag_monitor_var.get():
+            self.lag_monitor.start()
+        
+        # Start the backend once while the window is idle so the first real
+        # command does not pay for a cold start; KARTOSHKA_PREWARM=0 turns it off
+        if os.environ.get('KARTOSHKA_PREWARM') != '0':
+            self.root.after(1000, self.start_backend_prewarm)
+        
+    def start_backend_prewarm(self):
+        """Run the backend once in the background to warm it up"""
+        if not os.path.exists(self.backend_path):
+            return
+        
+        def prewarm_thread():
+            try:
+                elapsed = prewarm_backend(self.backend_path)
+            except (OSError, subprocess.SubprocessError):
+                return
+            self.root.after(0, lambda: startup_timeline.mark("backend_warm"))
+            self.root.after(0, lambda: self.log_message(f"Backend ready ({elapsed * 1000:.0f} ms)"))
+        
+        threading.Thread(target=prewarm_thread, daemon=True).start()
+        
     def setup_styles(self):
         """Setup professional styling"""
         style = ttk.Style()
@@ -140,42 +289,6 @@ class KartoshkaYoutuberGUI:
         style.map('TScrollbar', background=[('active', bg_color), ('!active', bg_color)], 
                  troughcolor=[('active', border_color), ('!active', border_color)])
     
-    def apply_background_color(self, widget):
-        """Recursively apply background color to all widgets"""
-        try:
-            # Try to configure background for ttk widgets
-            if hasattr(widget, 'configure'):
-                try:
-                    widget.configure(background='#f0f0f0')
-                except:
-                    pass
-                try:
-                    widget.configure(style='TFrame')
-                except:
-                    pass
-        except:
-            pass
-        
-        # Apply to all children
-        for child in widget.winfo_children():
-            self.apply_background_color(child)
-    
-    def force_background_update(self):
-        """Force background color update on all widgets"""
-        try:
-            # Update all ttk styles
-            style = ttk.Style()
-            for widget_class in ['TFrame', 'TLabelFrame', 'TLabel', 'TButton', 'TEntry', 'TCombobox', 'TScrollbar']:
-                try:
-                    style.configure(widget_class, background='#f0f0f0')
-                except:
-                    pass
-            
-            # Force update of all widgets
-            self.root.update_idletasks()
-        except:
-            pass
-        
     def setup_ui(self):
         """Setup the user interface"""
         # Create main canvas and scrollbar for scrolling
@@ -191,12 +304,11 @@ class KartoshkaYoutuberGUI:
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set, scrollregion=canvas.bbox("all"))
         
-        # Main container
-        main_frame = tk.Frame(scrollable_frame, bg='#f8f9fa', padx=20, pady=20)
+        # Main container, created with its final background so no restyling
+        # pass over the widget tree is needed
+        main_frame = tk.Frame(scrollable_frame, bg='#f0f0f0', padx=20, pady=20)
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        # Apply background color to all widgets recursively
-        self.apply_background_color(main_frame)
+        self.main_frame = main_frame
         
         # Configure grid weights
         self.root.columnconfigure(0, weight=1)
@@ -215,9 +327,6 @@ class KartoshkaYoutuberGUI:
         # Store canvas reference for cleanup
         self.canvas = canvas
         
-        # Force background update after UI is created
-        self.root.after(100, self.force_background_update)
-        
         # Title
         title_label = ttk.Label(main_frame, text="Kartoshka Youtuber v6.9", style='Title.TLabel')
         title_label.grid(row=0, column=0, columnspan=3, pady=(0, 10))
@@ -242,6 +351,7 @@ class KartoshkaYoutuberGUI:
         
         ttk.Button(url_frame, text="Paste", command=self.paste_url).grid(row=0, column=2, padx=(0, 5))
         ttk.Button(url_frame, text="Get Info", command=self.get_video_info).grid(row=0, column=3)
+        self.url_var.trace_add('write', lambda *args: self.schedule_prefetch())
         
         # Quality and Format Selection
         options_frame = ttk.LabelFrame(main_frame, text="Download Options", padding="10")
@@ -258,7 +368,7 @@ class KartoshkaYoutuberGUI:
         # Format selection
         ttk.Label(options_frame, text="Format:").grid(row=0, column=2, sticky=tk.W, padx=(0, 10))
         format_combo = ttk.Combobox(options_frame, textvariable=self.format_var,
-                                  values=["mp4", "mp3"], 
+                                  values=OUTPUT_FORMATS, 
                                   state="readonly", width=15)
         format_combo.grid(row=0, column=3, sticky=tk.W)
         
@@ -272,21 +382,40 @@ class KartoshkaYoutuberGUI:
         path_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
         ttk.Button(path_frame, text="Browse", command=self.browse_folder).grid(row=0, column=2)
         
-        # Video Information Display
-        self.info_frame = ttk.LabelFrame(main_frame, text="Video Information", padding="10")
-        self.info_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
-        self.info_frame.columnconfigure(1, weight=1)
-        
-        # Initially hide info frame
-        self.info_frame.grid_remove()
-        
-        # Available Qualities Display
-        self.qualities_frame = ttk.LabelFrame(main_frame, text="Available Qualities", padding="10")
-        self.qualities_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
-        self.qualities_frame.columnconfigure(0, weight=1)
-        
-        # Initially hide qualities frame
-        self.qualities_frame.grid_remove()
+        # Size and bitrate budget
+        budget_frame = ttk.Frame(options_frame)
+        budget_frame.grid(row=2, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        ttk.Label(budget_frame, text="Max size (MB):").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Entry(budget_frame, textvariable=self.max_size_var, width=8).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(budget_frame, text="Max bitrate (Mbps):").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Entry(budget_frame, textvariable=self.max_bitrate_var, width=8).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(budget_frame, text="Playlist budget:").pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Combobox(budget_frame, textvariable=self.budget_scope_var, values=["per video", "total"],
+                     state="readonly", width=10).pack(side=tk.LEFT)
+        
+        # Time-range sections
+        sections_frame = ttk.Frame(options_frame)
+        sections_frame.grid(row=3, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(10, 0))
+        sections_frame.columnconfigure(1, weight=1)
+        
+        ttk.Label(sections_frame, text="Sections:").grid(row=0, column=0, sticky=tk.W, padx=(0, 10))
+        ttk.Entry(sections_frame, textvariable=self.sections_var).grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
+        ttk.Checkbutton(sections_frame, text="Precise cuts (re-encode edges)",
+                        variable=self.precise_cuts_var).grid(row=0, column=2, sticky=tk.W)
+        ttk.Label(sections_frame, text="Optional, e.g. 1:00-3:30, 1:02:00-1:05:00 (single videos only)",
+                  foreground='gray', font=('Arial', 9)).grid(row=1, column=1, columnspan=2, sticky=tk.W)
+        
+        self.max_size_var.trace_add('write', lambda *args: self.update_quality_projection())
+        self.max_bitrate_var.trace_add('write', lambda *args: self.update_quality_projection())
+        self.format_var.trace_add('write', lambda *args: self.update_quality_projection())
+        
+        # Video information, qualities and progress (rows 5, 6 and 8) stay
+        # hidden until used, so they are only built on first use
+        self.info_frame = None
+        self.qualities_frame = None
+        self.progress_frame = None
+        self.progress_var = tk.DoubleVar()
         
         # Control Buttons
         button_frame = ttk.Frame(main_frame)
@@ -296,29 +425,12 @@ class KartoshkaYoutuberGUI:
                                      command=self.start_download, style='Accent.TButton')
         self.download_btn.pack(side=tk.LEFT, padx=(0, 10))
         
-        ttk.Button(button_frame, text="Refresh", command=self.get_video_info).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="Refresh",
+                   command=lambda: self.get_video_info(use_cache=False)).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Settings", command=self.show_settings).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(button_frame, text="Diagnostics", command=self.show_diagnostics).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text="Clear", command=self.clear_all).pack(side=tk.LEFT)
         
-        # Progress Section
-        self.progress_frame = ttk.LabelFrame(main_frame, text="Download Progress", padding="10")
-        self.progress_frame.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
-        self.progress_frame.columnconfigure(0, weight=1)
-        
-        # Initially hide progress frame
-        self.progress_frame.grid_remove()
-        
-        self.progress_var = tk.DoubleVar()
-        self.progress_bar = ttk.Progressbar(self.progress_frame, variable=self.progress_var, 
-                                          maximum=100, length=400)
-        self.progress_bar.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
-        
-        self.status_label = ttk.Label(self.progress_frame, text="Ready to download")
-        self.status_label.grid(row=1, column=0, sticky=tk.W)
-        
-        self.speed_label = ttk.Label(self.progress_frame, text="")
-        self.speed_label.grid(row=2, column=0, sticky=tk.W)
-        
         # Status Section
         self.status_frame = ttk.LabelFrame(main_frame, text="Status", padding="10")
         self.status_frame.grid(row=9, column=0, columnspan=3, sticky=(tk.W, tk.E))
@@ -335,6 +447,79 @@ class KartoshkaYoutuberGUI:
         # Bind Enter key to URL entry
         url_entry.bind('<Return>', lambda e: self.get_video_info())
         
+    def show_info_frame(self):
+        """Show the video information section, building it on first use"""
+        if self.info_frame is None:
+            self.info_frame = ttk.LabelFrame(self.main_frame, text="Video Information", padding="10")
+            self.info_frame.columnconfigure(1, weight=1)
+        self.info_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        return self.info_frame
+        
+    def show_qualities_frame(self):
+        """Show the available qualities section, building it on first use"""
+        if self.qualities_frame is None:
+            self.qualities_frame = ttk.LabelFrame(self.main_frame, text="Available Qualities", padding="10")
+            self.qualities_frame.columnconfigure(0, weight=1)
+        self.qualities_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        return self.qualities_frame
+        
+    def show_progress_frame(self):
+        """Show the download progress section, building it on first use"""
+        if self.progress_frame is None:
+            self.progress_frame = ttk.LabelFrame(self.main_frame, text="Download Progress", padding="10")
+            self.progress_frame.columnconfigure(0, weight=1)
+            
+            self.progress_bar = ttk.Progressbar(self.progress_frame, variable=self.progress_var, 
+                                              maximum=100, length=400)
+            self.progress_bar.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+            
+            self.status_label = ttk.Label(self.progress_frame, text="Ready to download")
+            self.status_label.grid(row=1, column=0, sticky=tk.W)
+            
+            self.speed_label = ttk.Label(self.progress_frame, text="")
+            self.speed_label.grid(row=2, column=0, sticky=tk.W)
+            
+            graph = tk.Canvas(self.progress_frame, width=400, height=60, bg='white', highlightthickness=1,
+                              highlightbackground='#dee2e6')
+            graph.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+            self.sparkline = Sparkline(graph, self.throughput)
+            
+            self.reservation_label = ttk.Label(self.progress_frame, text="")
+            self.reservation_label.grid(row=4, column=0, sticky=tk.W)
+        self.progress_frame.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
+        return self.progress_frame
+        
+    def show_throughput_graph(self):
+        """Show the progress section and graph a job the GUI did not start, such as an API job"""
+        self.show_progress_frame()
+        self.start_throughput_graph()
+        
+    def start_throughput_graph(self):
+        """Start sampling speeds into the progress graph"""
+        if self.graph_after_id is None:
+            self.throughput.clear()
+            self.graph_after_id = self.root.after(GRAPH_INTERVAL_MS, self.sample_throughput)
+        
+    def sample_throughput(self):
+        """Record the current speed of every download and redraw the graph"""
+        speeds = {}
+        running = False
+        if self.scheduler is not None:
+            for job in self.scheduler.list_jobs():
+                if job.status == 'running':
+                    running = True
+                    speeds[job.id] = job.progress.get('speed') or 0
+        if self.current_speed:
+            speeds['single'] = self.current_speed
+        self.throughput.record(speeds)
+        self.sparkline.redraw()
+        
+        # Sampling stops with the last download, leaving the graph as it was
+        if self.is_downloading or running:
+            self.graph_after_id = self.root.after(GRAPH_INTERVAL_MS, self.sample_throughput)
+        else:
+            self.graph_after_id = None
+        
     def log_message(self, message):
         """Add message to status log"""
         self.status_text.insert(tk.END, f"{message}\n")
@@ -348,6 +533,8 @@ class KartoshkaYoutuberGUI:
             if clipboard_content and ('youtube.com' in clipboard_content or 'youtu.be' in clipboard_content):
                 self.url_var.set(clipboard_content.strip())
                 self.log_message("URL pasted from clipboard")
+                # No need to wait for more typing after a paste
+                self.start_prefetch()
             else:
                 self.log_message("Clipboard doesn't contain a valid YouTube URL")
         except tk.TclError:
@@ -359,54 +546,128 @@ class KartoshkaYoutuberGUI:
         if folder:
             self.download_path_var.set(folder)
             
-    def get_video_info(self):
-        """Get video information from backend"""
+    def schedule_prefetch(self):
+        """Fetch info for the URL field once typing pauses"""
+        if self.prefetch_after_id is not None:
+            self.root.after_cancel(self.prefetch_after_id)
+            self.prefetch_after_id = None
+        
+        url = self.url_var.get().strip()
+        if self.prefetch is not None and self.prefetch['url'] != url:
+            self.cancel_prefetch()
+        if self.prefetch_info_var.get() and is_complete_url(url):
+            self.prefetch_after_id = self.root.after(PREFETCH_DELAY_MS, self.start_prefetch)
+        
+    def start_prefetch(self):
+        """Start fetching info for the URL field into the metadata cache"""
+        if self.prefetch_after_id is not None:
+            self.root.after_cancel(self.prefetch_after_id)
+            self.prefetch_after_id = None
+        
+        url = self.url_var.get().strip()
+        if not self.prefetch_info_var.get() or not is_complete_url(url):
+            return
+        page_size = self.get_playlist_page_size()
+        cache_url = info_cache_url(url, page_size)
+        if cache_url in self.metadata_cache:
+            return
+        if self.prefetch is not None:
+            if self.prefetch['cache_url'] == cache_url:
+                return
+            self.cancel_prefetch()
+        
+        prefetch = {'url': url, 'cache_url': cache_url, 'done': threading.Event(),
+                    'running': set(), 'cancelled': False}
+        self.prefetch = prefetch
+        
+        def prefetch_thread():
+            try:
+                info = get_info(self.backend_path, url, items=first_page_items(url, page_size),
+                                running=prefetch['running'])
+                if not prefetch['cancelled']:
+                    self.metadata_cache.put(cache_url, info)
+            except Exception:
+                # Get Info reports errors when the user asks for it
+                pass
+            finally:
+                prefetch['done'].set()
+        
+        threading.Thread(target=prefetch_thread, daemon=True).start()
+        
+    def cancel_prefetch(self):
+        """Stop a speculative info fetch for a URL that is no longer wanted"""
+        prefetch, self.prefetch = self.prefetch, None
+        if prefetch is None or prefetch['done'].is_set():
+            return
+        prefetch['cancelled'] = True
+        for process in list(prefetch['running']):
+            try:
+                process.kill()
+            except OSError:
+                pass
+        
+    def get_video_info(self, use_cache=True):
+        """Get video information from backend
+        
+        Uses info already fetched speculatively for the URL unless use_cache
+        is false, as for Refresh.
+        """
         url = self.url_var.get().strip()
         if not url:
             messagebox.showerror("Error", "Please enter a YouTube URL")
             return
             
+        page_size = self.get_playlist_page_size()
+        cache_url = info_cache_url(url, page_size)
+        cached = self.metadata_cache.get(cache_url) if use_cache else None
+        if cached is not None:
+            self.log_message(f"Video information ready for: {url}")
+            # Displaying a playlist moves its entries out of the dict, so keep the cached one intact
+            self.display_video_info(dict(cached))
+            return
+        
+        prefetch = self.prefetch if use_cache else None
+        if prefetch is not None and prefetch['cache_url'] != cache_url:
+            prefetch = None
+        
         self.log_message(f"Getting video information for: {url}")
         
         def get_info_thread():
+            # Wait for a speculative fetch of the same URL rather than starting another
+            if prefetch is not None and prefetch['done'].wait(30):
+                info = self.metadata_cache.get(cache_url)
+                if info is not None:
+                    self.root.after(0, lambda: self.display_video_info(dict(info)))
+                    return
             try:
-                # Call backend to get video info
-                cmd = [
-                    self.backend_path,
-                    "--command", "info",
-                    "--url", url
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, 
-                                      creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
-                
-                if result.returncode == 0:
-                    info = json.loads(result.stdout)
-                    if 'error' in info:
-                        self.root.after(0, lambda: self.log_message(f"Error: {info['error']}"))
-                    else:
-                        self.root.after(0, lambda: self.display_video_info(info))
-                else:
-                    error_msg = result.stderr or "Unknown error occurred"
-                    self.root.after(0, lambda: self.log_message(f"Backend error: {error_msg}"))
-                    
+                # Only the first page of a playlist or channel is resolved
+                info = get_info(self.backend_path, url, items=first_page_items(url, page_size))
+            except BackendError as e:
+                self.root.after(0, self.log_message, f"Backend error: {e}")
             except subprocess.TimeoutExpired:
-                self.root.after(0, lambda: self.log_message("Timeout: Backend took too long to respond"))
+                self.root.after(0, self.log_message, "Timeout: Backend took too long to respond")
             except Exception as e:
-                self.root.after(0, lambda: self.log_message(f"Error calling backend: {str(e)}"))
+                self.root.after(0, self.log_message, f"Error calling backend: {e}")
+            else:
+                self.metadata_cache.put(cache_url, info)
+                self.root.after(0, self.display_video_info, dict(info))
         
         threading.Thread(target=get_info_thread, daemon=True).start()
         
+    def get_playlist_page_size(self):
+        """Get the playlist page size, or 0 to fetch whole playlists"""
+        try:
+            return max(0, int(self.playlist_page_size_var.get()))
+        except (tk.TclError, ValueError):
+            return 0
+        
     def display_video_info(self, info):
         """Display video information in the UI"""
         self.video_info = info
         
-        # Clear existing info
-        for widget in self.info_frame.winfo_children():
+        # Show info frame and clear existing info
+        for widget in self.show_info_frame().winfo_children():
             widget.destroy()
-            
-        # Show info frame
-        self.info_frame.grid()
         
         # Check if it's a playlist
         if info.get('type') == 'playlist':
@@ -434,33 +695,37 @@ class KartoshkaYoutuberGUI:
         ttk.Label(self.info_frame, text="Views:", style='Heading.TLabel').grid(row=3, column=0, sticky=tk.W, padx=(0, 10))
         ttk.Label(self.info_frame, text=views_str).grid(row=3, column=1, sticky=tk.W)
         
+        # Thumbnail
+        thumbnail_src = thumbnail_url(info.get('id'), info)
+        if self.show_thumbnails_var.get() and thumbnail_src:
+            thumbnail_label = ttk.Label(self.info_frame, image=self.get_thumbnail_placeholder())
+            thumbnail_label.grid(row=0, column=2, rowspan=4, sticky=tk.NE)
+            self.request_thumbnail(info.get('id') or cache_key(self.url_var.get()), thumbnail_src,
+                                   lambda image: thumbnail_label.winfo_exists() and thumbnail_label.config(image=image))
+        
         # Display available qualities
         self.display_available_qualities(info.get('formats', []))
+        self.update_quality_projection()
         
         self.log_message("Video information retrieved successfully")
         
     def display_available_qualities(self, formats):
         """Display available video qualities"""
         # Clear existing qualities
-        for widget in self.qualities_frame.winfo_children():
-            widget.destroy()
+        if self.qualities_frame is not None:
+            for widget in self.qualities_frame.winfo_children():
+                widget.destroy()
             
         if not formats:
-            ttk.Label(self.qualities_frame, text="No quality information available").pack(anchor=tk.W)
+            if self.qualities_frame is not None:
+                ttk.Label(self.qualities_frame, text="No quality information available").pack(anchor=tk.W)
             return
             
         # Show qualities frame
-        self.qualities_frame.grid()
+        self.show_qualities_frame()
         
-        # Extract unique resolutions
-        resolutions = set()
-        for fmt in formats:
-            resolution = fmt.get('resolution', '')
-            if resolution and resolution != 'audio only':
-                resolutions.add(resolution)
-        
-        # Sort resolutions by quality (highest first)
-        sorted_resolutions = sorted(resolutions, key=lambda x: int(x.split('x')[1]) if 'x' in x else 0, reverse=True)
+        # Extract unique resolutions, highest first
+        sorted_resolutions = self.sort_resolutions(formats)
         
         # Create quality buttons
         quality_frame = ttk.Frame(self.qualities_frame)
@@ -482,6 +747,15 @@ class KartoshkaYoutuberGUI:
         else:
             self.quality_label.config(text="No quality information available")
         
+    def sort_resolutions(self, formats):
+        """Get the unique video resolutions in formats, highest first"""
+        resolutions = set()
+        for fmt in formats:
+            resolution = fmt.get('resolution', '')
+            if resolution and resolution != 'audio only':
+                resolutions.add(resolution)
+        return sorted(resolutions, key=lambda x: int(x.split('x')[1]) if 'x' in x and x.split('x')[1].isdigit() else 0, reverse=True)
+        
     def show_quality_selector(self):
         """Show quality selection popup"""
         if not self.video_info or 'formats' not in self.video_info:
@@ -549,6 +823,85 @@ class KartoshkaYoutuberGUI:
         self.selected_quality = quality
         self.quality_label.config(text=f"Selected: {quality}")
         self.log_message(f"Quality set to: {quality}")
+        self.update_quality_projection()
+        
+    def show_audio_projection(self):
+        """Show which audio-only stream an audio output will use"""
+        output_format = self.format_var.get()
+        info = self.video_info
+        if not info or info.get('type') == 'playlist' or not info.get('formats'):
+            self.quality_label.config(text=f"Audio only ({output_format})")
+            return
+        
+        fmt = pick_audio_format(info['formats'], output_format, info.get('duration'))
+        if fmt is None:
+            self.quality_label.config(text=f"No audio-only stream for {output_format}")
+            return
+        
+        mode = "converted" if output_format == "mp3" else "no re-encode"
+        bitrate = fmt.get('abr') or fmt.get('tbr')
+        details = f"{bitrate:.0f} kbps, " if bitrate else ""
+        size = fmt.get('filesize') or fmt.get('filesize_approx')
+        details += f"~{size / 1024 / 1024:.1f} MB" if size else "size unknown"
+        self.quality_label.config(text=f"Audio only ({output_format}, {mode}): {details}")
+        
+    def get_budget(self):
+        """Get the (max_size in bytes, max_bitrate in kbit/s) budget, None where unset"""
+        def parse(var, scale):
+            try:
+                value = float(var.get().strip())
+            except ValueError:
+                return None
+            return int(value * scale) if value > 0 else None
+        return parse(self.max_size_var, 1024 * 1024), parse(self.max_bitrate_var, 1000)
+        
+    def budget_args(self, include_size=True):
+        """Get backend arguments for the current budget"""
+        max_size, max_bitrate = self.get_budget()
+        args = []
+        if max_size and include_size:
+            args += ["--max-size", str(max_size)]
+        if max_bitrate:
+            args += ["--max-bitrate", str(max_bitrate)]
+        return args
+        
+    def download_args(self, include_size=True):
+        """Get optional backend arguments shared by all download commands"""
+        args = self.budget_args(include_size)
+        if self.record_hashes_var.get():
+            args.append("--hash")
+        try:
+            buffer_kb = int(self.write_buffer_kb_var.get())
+        except (tk.TclError, ValueError):
+            buffer_kb = 0
+        if buffer_kb > 0:
+            args += ["--buffer-size", str(buffer_kb * 1024)]
+        return args
+        
+    def update_quality_projection(self):
+        """Show which formats will be downloaded and their projected size"""
+        if self.format_var.get() in AUDIO_FORMATS:
+            self.show_audio_projection()
+            return
+        
+        max_size, max_bitrate = self.get_budget()
+        if not max_size and not max_bitrate:
+            self.quality_label.config(text=f"Selected: {self.selected_quality}")
+            return
+        
+        info = self.video_info
+        if not info or info.get('type') == 'playlist' or not info.get('formats'):
+            self.quality_label.config(text=f"Selected: {self.selected_quality} (within budget)")
+            return
+        
+        pick = pick_for_budget(info['formats'], info.get('duration'), max_size, max_bitrate,
+                               quality_height_cap(self.selected_quality))
+        if pick is None:
+            self.quality_label.config(text="No format fits the budget")
+        else:
+            height = f"{pick['height']}p" if pick['height'] else "audio"
+            size = f"~{pick['size'] / 1024 / 1024:.1f} MB" if pick['size'] else "size unknown"
+            self.quality_label.config(text=f"Budget pick: {height}, {size}")
         
     def start_download(self):
         """Start video download"""
@@ -560,71 +913,138 @@ class KartoshkaYoutuberGUI:
         if not url:
             messagebox.showerror("Error", "Please enter a YouTube URL")
             return
+        
+        section_args = self.get_section_args()
+        if section_args is None:
+            return
+        extra_args = self.download_args() + section_args
+        tags = build_tags(self.video_info) if self.video_info else None
+        
+        if self.download_schedule:
+            self.queue_scheduled_download(url, extra_args, tags)
+            return
             
         self.is_downloading = True
         self.download_btn.config(state='disabled', text="Downloading...")
         
         # Show progress frame
-        self.progress_frame.grid()
+        self.show_progress_frame()
         self.progress_var.set(0)
         self.status_label.config(text="Starting download...")
         self.speed_label.config(text="")
+        self.start_throughput_graph()
         
         self.log_message(f"Starting download: {url}")
+        self.run_single_download(url, extra_args, tags)
+        
+    def run_single_download(self, url, extra_args, tags=None):
+        """Download one video on a worker thread, reporting its progress to the GUI
+        
+        Audio files are tagged with tags, from tagging.build_tags, once the
+        download succeeds.
+        """
+        # Settings are read here, on the Tk thread
+        quality, file_format, path = self.selected_quality, self.format_var.get(), self.download_path_var.get()
         
         def download_thread():
+            job_id = next_job_id()
+            timer = JobTimer(url, job_id)
+            throttle = ProgressThrottle(GUI_PROGRESS_INTERVAL_MS)
+            files = []
+            
+            def on_output(event):
+                # Values are passed to after() as arguments, never read late from this scope
+                kind = event['type']
+                if kind == 'progress':
+                    if throttle.ready(event.get('percent') or 0):
+                        self.root.after(0, self.update_progress, event)
+                elif kind == 'log':
+                    self.root.after(0, self.log_message, event['message'])
+                elif kind == 'error':
+                    self.root.after(0, self.log_message, f"Backend error: {event.get('message')}")
+                elif kind == 'done':
+                    files.extend(event.get('files') or [])
+                    if event.get('sha256'):
+                        self.root.after(0, self.log_message, f"SHA-256: {event['sha256']}")
+                elif kind not in ('hello', 'phase', 'retry'):
+                    self.root.after(0, self.log_message, f"Backend: {json.dumps(event)}")
+            
             try:
-                # Call backend to download video
-                cmd = [
-                    self.backend_path,
-                    "--command", "download",
-                    "--url", url,
-                    "--quality", self.selected_quality,
-                    "--format", self.format_var.get(),
-                    "--path", self.download_path_var.get()
-                ]
-                
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-                                         text=True, bufsize=1, universal_newlines=True,
-                                         creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
-                
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    if output:
-                        try:
-                            data = json.loads(output.strip())
-                            if data.get('type') == 'progress':
-                                self.root.after(0, lambda p=data: self.update_progress(p))
-                            else:
-                                self.root.after(0, lambda: self.log_message(f"Backend: {output.strip()}"))
-                        except json.JSONDecodeError:
-                            self.root.after(0, lambda: self.log_message(output.strip()))
-                
-                # Check final result
-                return_code = process.poll()
-                if return_code == 0:
-                    self.root.after(0, lambda: self.download_completed(True, "Download completed successfully!"))
-                else:
-                    error_output = process.stderr.read()
-                    self.root.after(0, lambda: self.download_completed(False, f"Download failed: {error_output}"))
-                    
+                success, error_output = download_video(self.backend_path, url, quality, file_format, path,
+                                                       on_output=on_output, extra_args=extra_args,
+                                                       timer=timer, job_id=job_id)
             except Exception as e:
-                self.root.after(0, lambda: self.download_completed(False, f"Error: {str(e)}"))
+                success, error_output = False, f"Error: {e}"
+            else:
+                error_output = f"Download failed: {error_output}"
+            self.metrics.record(timer.finish(success))
+            if success and tags and file_format in AUDIO_FORMATS:
+                for name in files:
+                    tag_audio_file(os.path.join(path, name), tags)
+            if success:
+                self.root.after(0, self.download_completed, True, "Download completed successfully!")
+            else:
+                self.root.after(0, self.download_completed, False, error_output)
         
         threading.Thread(target=download_thread, daemon=True).start()
         
+    def queue_scheduled_download(self, url, extra_args, tags=None):
+        """Queue a single download to wait for the download window
+        
+        The job waits in the scheduler without locking the GUI, so other
+        downloads can run meanwhile; its start and end are logged.
+        """
+        job = Job(url, self.selected_quality, self.format_var.get(), self.download_path_var.get(), extra_args,
+                  tags=tags)
+        self.scheduled_jobs[job.id] = job.status
+        self.get_scheduler().submit(job)
+        self.log_message(f"Queued {url} for the download window: {self.download_schedule}")
+        
+    def report_scheduled_job(self, job, status):
+        """Log a scheduled single download starting or finishing"""
+        if status == 'running':
+            self.log_message(f"Scheduled download started: {job.title}")
+        elif status == 'done':
+            self.log_message(f"Scheduled download completed: {job.title}")
+        elif status in ('failed', 'cancelled'):
+            self.log_message(f"Scheduled download {status}: {job.title}: {job.error or status}")
+        
+    def get_section_args(self):
+        """Get backend arguments for the requested time ranges
+
+        Returns None, after telling the user, when the ranges are invalid.
+        """
+        text = self.sections_var.get().strip()
+        if not text:
+            return []
+        try:
+            sections = parse_sections(text)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid sections: {e}")
+            return None
+        
+        args = ["--sections", sections_arg(sections)]
+        if self.precise_cuts_var.get():
+            args.append("--precise-cuts")
+        
+        duration = self.video_info.get('duration') if self.video_info else None
+        total = sections_duration(sections, duration)
+        if total is not None:
+            of_total = f" of {format_time(duration)}" if duration else ""
+            self.log_message(f"Downloading {len(sections)} section(s): {format_time(total)}{of_total}")
+        return args
+        
     def update_progress(self, data):
         """Update download progress"""
-        percent = data.get('percent', 0)
-        speed = data.get('speed', 0)
-        eta = data.get('eta', 0)
+        percent = data.get('percent') or 0
+        speed = data.get('speed') or 0
+        eta = data.get('eta') or 0
         
         self.progress_var.set(percent)
+        self.current_speed = speed
         
         speed_str = f"{speed / 1024 / 1024:.1f} MB/s" if speed > 0 else ""
-        eta_str = f"ETA: {eta}s" if eta > 0 else ""
+        eta_str = f"ETA: {eta:.0f}s" if eta > 0 else ""
         
         self.speed_label.config(text=f"{speed_str} {eta_str}")
         self.status_label.config(text=f"Downloading... {percent:.1f}%")
@@ -632,6 +1052,7 @@ class KartoshkaYoutuberGUI:
     def download_completed(self, success, message):
         """Handle download completion"""
         self.is_downloading = False
+        self.current_speed = 0
         self.download_btn.config(state='normal', text="Download")
         
         if success:
@@ -648,7 +1069,7 @@ class KartoshkaYoutuberGUI:
         """Show settings dialog"""
         settings_window = tk.Toplevel(self.root)
         settings_window.title("Settings")
-        settings_window.geometry("500x450")
+        settings_window.geometry("500x850")
         settings_window.resizable(False, False)
         
         # Center the window
@@ -682,21 +1103,216 @@ class KartoshkaYoutuberGUI:
         
         ttk.Label(format_frame, text="Default Format:").pack(anchor=tk.W)
         format_combo = ttk.Combobox(format_frame, textvariable=self.format_var,
-                                  values=["mp4", "mp3"],
+                                  values=OUTPUT_FORMATS,
                                   state="readonly")
         format_combo.pack(fill=tk.X, pady=(5, 0))
         
+        # Playlist and download options
+        playlist_frame = ttk.Frame(settings_window)
+        playlist_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        ttk.Checkbutton(playlist_frame, text="Load full details for playlist entries",
+                        variable=self.enrich_metadata_var).pack(anchor=tk.W)
+        ttk.Checkbutton(playlist_frame, text="Record SHA-256 checksums in manifest.jsonl",
+                        variable=self.record_hashes_var).pack(anchor=tk.W)
+        ttk.Checkbutton(playlist_frame, text="Fetch video info as soon as a URL is pasted or typed",
+                        variable=self.prefetch_info_var).pack(anchor=tk.W)
+        ttk.Checkbutton(playlist_frame, text="Monitor UI responsiveness (shown in Diagnostics)",
+                        variable=self.lag_monitor_var).pack(anchor=tk.W)
+        ttk.Checkbutton(playlist_frame, text="Show thumbnails (needs Pillow)",
+                        variable=self.show_thumbnails_var,
+                        state='normal' if thumbnails_available() else 'disabled').pack(anchor=tk.W)
+        
+        parallel_frame = ttk.Frame(playlist_frame)
+        parallel_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(parallel_frame, text="Parallel playlist downloads:").pack(side=tk.LEFT)
+        ttk.Spinbox(parallel_frame, from_=1, to=8, width=8,
+                    textvariable=self.parallel_downloads_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        buffer_frame = ttk.Frame(playlist_frame)
+        buffer_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(buffer_frame, text="Write buffer in KB (0 = default):").pack(side=tk.LEFT)
+        ttk.Spinbox(buffer_frame, from_=0, to=65536, increment=256, width=8,
+                    textvariable=self.write_buffer_kb_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        page_frame = ttk.Frame(playlist_frame)
+        page_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(page_frame, text="Playlist page size (0 = load all):").pack(side=tk.LEFT)
+        ttk.Spinbox(page_frame, from_=0, to=1000, increment=50, width=8,
+                    textvariable=self.playlist_page_size_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        metrics_frame = ttk.Frame(playlist_frame)
+        metrics_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(metrics_frame, text="Prometheus metrics port (0 = off):").pack(side=tk.LEFT)
+        ttk.Spinbox(metrics_frame, from_=0, to=65535, width=8,
+                    textvariable=self.metrics_port_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        ttk.Label(playlist_frame, text="Download schedule (e.g. 01:00-06:00; mon-fri 09:00-17:00@2M):").pack(anchor=tk.W, pady=(5, 0))
+        ttk.Entry(playlist_frame, textvariable=self.download_schedule_var).pack(fill=tk.X)
+        
+        api_frame = ttk.Frame(playlist_frame)
+        api_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(api_frame, text="Job API port (0 = off):").pack(side=tk.LEFT)
+        ttk.Spinbox(api_frame, from_=0, to=65535, width=8,
+                    textvariable=self.api_port_var).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Label(api_frame, text="Max queue:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Spinbox(api_frame, from_=1, to=10000, width=6,
+                    textvariable=self.api_max_queue_var).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Buttons
         button_frame = ttk.Frame(settings_window)
         button_frame.pack(fill=tk.X, padx=20, pady=20)
         
-        ttk.Button(button_frame, text="Save", command=settings_window.destroy).pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Save", command=lambda: self.save_settings(settings_window)).pack(side=tk.RIGHT, padx=(5, 0))
         ttk.Button(button_frame, text="Cancel", command=settings_window.destroy).pack(side=tk.RIGHT)
         
+    def save_settings(self, settings_window):
+        """Apply settings that need more than a variable change"""
+        try:
+            schedule = DownloadSchedule.parse(self.download_schedule_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid download schedule: {e}", parent=settings_window)
+            return
+        self.download_schedule = schedule or None
+        if self.scheduler is not None:
+            self.scheduler.set_schedule(self.download_schedule)
+        self.apply_metrics_port()
+        self.apply_api_port()
+        if self.lag_monitor_var.get():
+            self.lag_monitor.start()
+        else:
+            self.lag_monitor.stop()
+        settings_window.destroy()
+        
+    def apply_metrics_port(self):
+        """Start, move or stop the localhost Prometheus endpoint"""
+        try:
+            port = self.metrics_port_var.get()
+        except tk.TclError:
+            port = 0
+        if self.metrics_server is not None:
+            if port == self.metrics_server.server_address[1]:
+                return
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+            self.metrics_server = None
+        if port:
+            try:
+                self.metrics_server = serve_prometheus(self.metrics, port)
+                self.log_message(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+            except OSError as e:
+                self.log_message(f"Could not serve metrics on port {port}: {e}")
+        
+    def apply_api_port(self):
+        """Start, restart or stop the localhost job API"""
+        try:
+            port = self.api_port_var.get()
+            max_queue = max(1, self.api_max_queue_var.get())
+        except tk.TclError:
+            port, max_queue = 0, DEFAULT_MAX_QUEUE
+        settings = (port, max_queue, self.download_path_var.get())
+        if self.api_server is not None:
+            # Restarting would cut off clients following events
+            if settings == self.api_server_settings:
+                return
+            self.api_server.shutdown()
+            self.api_server.server_close()
+            self.api_server = None
+        if port:
+            try:
+                self.api_server = serve_jobs(self.get_scheduler(), port, max_queue=max_queue,
+                                             default_path=self.download_path_var.get())
+                self.api_server_settings = settings
+                self.log_message(f"Serving the job API on http://127.0.0.1:{port}/jobs")
+            except OSError as e:
+                self.log_message(f"Could not serve the job API on port {port}: {e}")
+        
+    def save_diagnostics_report(self):
+        """Write phase timings and the lag report to diagnostics.txt"""
+        lines = ["Download phases (seconds):"]
+        for phase, stats in self.metrics.phase_stats().items():
+            values = ", ".join(f"p{percent} {stats[percent]:.2f}" for percent in PERCENTILES if stats[percent] is not None)
+            lines.append(f"  {phase}: {stats['count']} jobs{', ' + values if values else ''}")
+        lines.append("")
+        lines.append(self.lag_monitor.report() if self.lag_monitor.running else "Lag monitor off")
+        lines += ["", "Startup:", startup_timeline.report()]
+        
+        path = self.app_dir / "diagnostics.txt"
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            self.log_message(f"Diagnostics saved to {path}")
+        except OSError as e:
+            self.log_message(f"Could not save diagnostics: {e}")
+        
+    def show_diagnostics(self):
+        """Show per-phase download timings"""
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.geometry("560x600")
+        window.transient(self.root)
+        
+        ttk.Label(window, text="Download Phases", style='Title.TLabel').pack(pady=10)
+        
+        columns = ("phase", "count") + tuple(f"p{percent}" for percent in PERCENTILES)
+        tree = ttk.Treeview(window, columns=columns, show="headings", height=len(PHASES))
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=80, anchor=tk.E if column != "phase" else tk.W)
+        tree.pack(fill=tk.X, padx=20)
+        
+        totals_label = ttk.Label(window, text="")
+        totals_label.pack(anchor=tk.W, padx=20, pady=(10, 0))
+        
+        ttk.Label(window, text="UI Responsiveness", style='Heading.TLabel').pack(anchor=tk.W, padx=20, pady=(15, 5))
+        lag_text = tk.Text(window, height=12, wrap=tk.NONE, font=('Consolas', 8))
+        lag_text.pack(fill=tk.BOTH, expand=True, padx=20)
+        
+        def refresh():
+            tree.delete(*tree.get_children())
+            for phase, stats in self.metrics.phase_stats().items():
+                values = [phase, stats['count']]
+                values += [f"{stats[percent]:.2f}s" if stats[percent] is not None else "-" for percent in PERCENTILES]
+                tree.insert("", tk.END, values=values)
+            jobs = self.metrics.jobs
+            totals_label.config(text=f"Jobs: {jobs['success']} succeeded, {jobs['failed']} failed | "
+                                     f"Downloaded: {format_bytes(self.metrics.total_bytes)} | "
+                                     f"Retries: {self.metrics.total_retries}")
+            
+            lag_text.delete(1.0, tk.END)
+            if self.lag_monitor.running:
+                lag_text.insert(tk.END, self.lag_monitor.report())
+            else:
+                lag_text.insert(tk.END, "Turn on \"Monitor UI responsiveness\" in Settings to measure event loop lag.")
+        
+        button_frame = ttk.Frame(window)
+        button_frame.pack(fill=tk.X, padx=20, pady=10)
+        ttk.Button(button_frame, text="Refresh", command=refresh).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Save Report", command=self.save_diagnostics_report).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(button_frame, text="Close", command=window.destroy).pack(side=tk.RIGHT)
+        refresh()
+        
     def display_playlist_info(self, playlist_info):
         """Display playlist information in main interface"""
         self.playlist_info = playlist_info
-        self.playlist_videos = playlist_info.get('videos', [])
+        self.playlist_videos = PlaylistEntries()
+        
+        # Keep the first page and fetch the rest on demand
+        page_size = self.get_playlist_page_size()
+        url = self.url_var.get().strip()
+        if first_page_items(url, page_size):
+            self.playlist_pager = PlaylistPager(
+                lambda items: get_info(self.backend_path, url, items=items), page_size,
+                entries=self.playlist_videos)
+            self.playlist_pager.add_page(0, playlist_info)
+        else:
+            self.playlist_pager = None
+            self.playlist_videos.extend(playlist_info.get('videos', []))
+        
+        # Entries now live in the compact store, so drop the backend dicts
+        playlist_info.pop('videos', None)
+        self.playlist_selection = Bitset(len(self.playlist_videos), True)
+        self.playlist_index = PlaylistIndex(self.playlist_videos)
         is_from_single_video = playlist_info.get('is_from_single_video', False)
         
         # Playlist title
@@ -710,7 +1326,7 @@ class KartoshkaYoutuberGUI:
         
         # Video count
         ttk.Label(self.info_frame, text="Videos:", style='Heading.TLabel').grid(row=2, column=0, sticky=tk.W, padx=(0, 10))
-        ttk.Label(self.info_frame, text=str(playlist_info.get('playlist_count', 0))).grid(row=2, column=1, sticky=tk.W)
+        ttk.Label(self.info_frame, text=self.format_playlist_count()).grid(row=2, column=1, sticky=tk.W)
         
         # Playlist indicator and options
         playlist_frame = ttk.Frame(self.info_frame)
@@ -744,7 +1360,18 @@ class KartoshkaYoutuberGUI:
             ttk.Button(options_frame, text="Select Videos to Download", 
                       command=self.open_playlist_selection).pack(side=tk.LEFT)
         
-        self.log_message(f"Playlist detected: {playlist_info.get('playlist_count', 0)} videos found")
+        self.log_message(f"Playlist detected: {self.format_playlist_count()} videos found")
+        
+    def format_playlist_count(self):
+        """Format the playlist size, noting when it is not fully known"""
+        pager = self.playlist_pager
+        if pager is None:
+            return str(self.playlist_info.get('playlist_count') or len(self.playlist_videos))
+        if pager.total is not None:
+            return str(pager.total)
+        if pager.has_more():
+            return f"{len(self.playlist_videos)}+"
+        return str(len(self.playlist_videos))
         
     def download_current_video(self):
         """Download just the current video from playlist"""
@@ -753,66 +1380,47 @@ class KartoshkaYoutuberGUI:
             return
             
         # Find the current video
-        current_video_id = self.playlist_info.get('current_video_id')
-        current_video = None
-        
-        for video in self.playlist_videos:
-            if video.get('id') == current_video_id:
-                current_video = video
-                break
+        current_index = self.playlist_videos.index_of(self.playlist_info.get('current_video_id'))
                 
-        if not current_video:
+        if current_index is None:
             messagebox.showerror("Error", "Current video not found in playlist")
             return
             
         # Download the single video
-        self.start_single_video_download(current_video['url'])
+        tags = build_tags(self.playlist_videos.entry(current_index), self.playlist_title(), current_index + 1)
+        self.start_single_video_download(self.playlist_videos.urls[current_index], tags)
+        
+    def playlist_title(self):
+        """Get the loaded playlist's title, used as the album of its audio files"""
+        return (self.playlist_info or {}).get('title')
         
-    def start_single_video_download(self, video_url):
+    def start_single_video_download(self, video_url, tags=None):
         """Start downloading a single video"""
         if self.is_downloading:
             messagebox.showwarning("Warning", "A download is already in progress.")
             return
+        
+        section_args = self.get_section_args()
+        if section_args is None:
+            return
+        extra_args = self.download_args() + section_args
+        
+        if self.download_schedule:
+            self.queue_scheduled_download(video_url, extra_args, tags)
+            return
             
         self.is_downloading = True
         self.download_btn.config(state='disabled', text="Downloading...")
         
         # Show progress frame
-        self.progress_frame.grid()
+        self.show_progress_frame()
         self.progress_var.set(0)
         self.status_label.config(text="Starting download...")
+        self.speed_label.config(text="")
+        self.start_throughput_graph()
         
-        def download_thread():
-            try:
-                # Call backend to download single video
-                cmd = [
-                    self.backend_path,
-                    "--command", "download",
-                    "--url", video_url,
-                    "--quality", self.selected_quality,
-                    "--format", self.format_var.get(),
-                    "--path", self.download_path_var.get()
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=300,
-                                      creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
-                
-                if result.returncode == 0:
-                    response = json.loads(result.stdout)
-                    if response.get('success'):
-                        self.root.after(0, lambda: self.download_completed(True, response.get('message', 'Download completed!')))
-                    else:
-                        self.root.after(0, lambda: self.download_completed(False, response.get('error', 'Unknown error')))
-                else:
-                    error_msg = result.stderr or "Unknown error occurred"
-                    self.root.after(0, lambda: self.download_completed(False, f"Backend error: {error_msg}"))
-                    
-            except subprocess.TimeoutExpired:
-                self.root.after(0, lambda: self.download_completed(False, "Timeout: Download took too long"))
-            except Exception as e:
-                self.root.after(0, lambda: self.download_completed(False, f"Error: {str(e)}"))
-        
-        threading.Thread(target=download_thread, daemon=True).start()
+        self.log_message(f"Starting download: {video_url}")
+        self.run_single_download(video_url, extra_args, tags)
         
     def open_playlist_selection(self):
         """Open the playlist selection window"""
@@ -832,6 +1440,7 @@ class KartoshkaYoutuberGUI:
         # Make it modal
         self.playlist_window.transient(self.root)
         self.playlist_window.grab_set()
+        self.playlist_window.protocol("WM_DELETE_WINDOW", self.close_playlist_selection)
         
         # Main frame
         main_frame = ttk.Frame(self.playlist_window)
@@ -841,6 +1450,37 @@ class KartoshkaYoutuberGUI:
         ttk.Label(main_frame, text=f"Select Videos from: {self.playlist_info.get('title', 'Playlist')}", 
                  style='Title.TLabel').pack(pady=(0, 10))
         
+        # Search and filters; rows that do not match are hidden, not destroyed
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        self.playlist_search_var = tk.StringVar()
+        self.playlist_uploader_var = tk.StringVar(value=ALL_UPLOADERS)
+        self.playlist_min_minutes_var = tk.StringVar()
+        self.playlist_max_minutes_var = tk.StringVar()
+        self.playlist_hide_downloaded_var = tk.BooleanVar(value=False)
+        
+        ttk.Label(filter_frame, text="Search:").pack(side=tk.LEFT)
+        search_entry = ttk.Entry(filter_frame, textvariable=self.playlist_search_var, width=28)
+        search_entry.pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(filter_frame, text="Uploader:").pack(side=tk.LEFT)
+        uploader_combo = ttk.Combobox(filter_frame, textvariable=self.playlist_uploader_var, state="readonly", width=18)
+        # Uploaders change as pages and details load, so the list is built when it opens
+        uploader_combo.configure(postcommand=lambda: uploader_combo.configure(
+            values=[ALL_UPLOADERS] + self.playlist_index.uploader_names()))
+        uploader_combo.pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(filter_frame, text="Minutes:").pack(side=tk.LEFT)
+        ttk.Entry(filter_frame, textvariable=self.playlist_min_minutes_var, width=5).pack(side=tk.LEFT, padx=(5, 2))
+        ttk.Label(filter_frame, text="to").pack(side=tk.LEFT)
+        ttk.Entry(filter_frame, textvariable=self.playlist_max_minutes_var, width=5).pack(side=tk.LEFT, padx=(2, 10))
+        ttk.Checkbutton(filter_frame, text="Hide downloaded",
+                        variable=self.playlist_hide_downloaded_var).pack(side=tk.LEFT)
+        self.search_all_button = ttk.Button(filter_frame, text="Search All Pages", command=self.search_all_playlist_pages)
+        self.search_all_button.pack(side=tk.LEFT, padx=(10, 0))
+        for var in (self.playlist_search_var, self.playlist_uploader_var, self.playlist_min_minutes_var,
+                    self.playlist_max_minutes_var, self.playlist_hide_downloaded_var):
+            var.trace_add('write', lambda *args: self.schedule_playlist_filter())
+        search_entry.focus_set()
+        
         # Create canvas and scrollbar for video list
         canvas = tk.Canvas(main_frame, bg='#f8f9fa')
         scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
@@ -852,25 +1492,54 @@ class KartoshkaYoutuberGUI:
         )
         
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        # Rows are gridded at their index, so a hidden row comes back in place
+        scrollable_frame.columnconfigure(0, weight=1)
+        
+        def _on_scroll(first, last):
+            scrollbar.set(first, last)
+            # Fetch the next page when the list is scrolled near the end
+            if float(last) > 0.9:
+                self.load_next_playlist_page()
+            self.schedule_thumbnail_refresh()
+        canvas.configure(yscrollcommand=_on_scroll)
+        canvas.bind("<Configure>", lambda e: self.schedule_thumbnail_refresh())
         
         # Pack canvas and scrollbar
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         
         # Create video selection checkboxes
-        self.playlist_checkboxes = []
-        for i, video in enumerate(self.playlist_videos):
-            self.create_video_checkbox(scrollable_frame, video, i)
+        self.playlist_list_frame = scrollable_frame
+        self.playlist_rows = []
+        self.playlist_row_frames = []
+        self.thumbnail_labels = {}
+        self.thumbnail_shown = set()
+        self.playlist_matches = None
+        self.playlist_hidden = set()
+        self.playlist_filter_options = None
+        self.playlist_search_all = False
+        self.playlist_index.sync()
+        for i in range(len(self.playlist_videos)):
+            self.create_video_checkbox(scrollable_frame, i)
         
         # Control buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=(10, 0))
         
-        ttk.Button(button_frame, text="Select All", command=self.select_all_videos).pack(side=tk.LEFT, padx=(0, 5))
-        ttk.Button(button_frame, text="Deselect All", command=self.deselect_all_videos).pack(side=tk.LEFT, padx=(0, 5))
-        ttk.Button(button_frame, text="Download Selected", command=self.download_selected_videos).pack(side=tk.RIGHT, padx=(5, 0))
-        ttk.Button(button_frame, text="Cancel", command=self.playlist_window.destroy).pack(side=tk.RIGHT, padx=(0, 5))
+        self.select_all_button = ttk.Button(button_frame, text="Select All", command=self.select_all_videos)
+        self.select_all_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.deselect_all_button = ttk.Button(button_frame, text="Deselect All", command=self.deselect_all_videos)
+        self.deselect_all_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="Load Details", command=self.start_metadata_enrichment).pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.playlist_count_label = ttk.Label(button_frame, text="")
+        self.playlist_count_label.pack(side=tk.LEFT, padx=(10, 0))
+        self.update_playlist_count_label()
+        
+        self.download_selected_button = ttk.Button(button_frame, text="Download Selected",
+                                                   command=self.download_selected_videos)
+        self.download_selected_button.pack(side=tk.RIGHT, padx=(5, 0))
+        ttk.Button(button_frame, text="Cancel", command=self.close_playlist_selection).pack(side=tk.RIGHT, padx=(0, 5))
         
         # Bind mousewheel to canvas
         def _on_mousewheel(event):
@@ -880,15 +1549,228 @@ class KartoshkaYoutuberGUI:
         # Store canvas for cleanup
         self.playlist_canvas = canvas
         
-    def create_video_checkbox(self, parent, video, index):
+        # Load full entry details in the background if enabled
+        if self.enrich_metadata_var.get():
+            self.start_metadata_enrichment()
+        
+        # Look for entries that are already in the download folder
+        index = self.playlist_index
+        folder = self.download_path_var.get()
+        
+        def scan_downloaded_thread():
+            keys = downloaded_keys(folder)
+            self.root.after(0, lambda: self.apply_downloaded_keys(index, keys))
+        
+        threading.Thread(target=scan_downloaded_thread, daemon=True).start()
+        
+    def apply_downloaded_keys(self, index, keys):
+        """Mark playlist entries whose files are already downloaded"""
+        if index is not self.playlist_index:
+            return
+        index.set_downloaded(keys)
+        if self.playlist_window.winfo_exists() and self.playlist_hide_downloaded_var.get():
+            self.schedule_playlist_filter()
+        
+    def read_playlist_filter(self):
+        """Get the filter settings as PlaylistIndex.search arguments, or None if nothing is filtered"""
+        def seconds(var):
+            try:
+                return int(float(var.get().strip()) * 60)
+            except ValueError:
+                return None
+        
+        uploader = self.playlist_uploader_var.get()
+        options = {
+            'query': self.playlist_search_var.get(),
+            'uploader': None if uploader == ALL_UPLOADERS else uploader,
+            'min_duration': seconds(self.playlist_min_minutes_var),
+            'max_duration': seconds(self.playlist_max_minutes_var),
+            'hide_downloaded': self.playlist_hide_downloaded_var.get()
+        }
+        if (not options['query'].strip() and options['uploader'] is None and options['min_duration'] is None
+                and options['max_duration'] is None and not options['hide_downloaded']):
+            return None
+        return options
+        
+    def schedule_playlist_filter(self, delay=None):
+        """Re-filter the playlist once, after pending keystrokes or after a delay"""
+        if self.playlist_filter_pending:
+            return
+        self.playlist_filter_pending = True
+        if delay is None:
+            self.root.after_idle(self.apply_playlist_filter)
+        else:
+            self.root.after(delay, self.apply_playlist_filter)
+        
+    def apply_playlist_filter(self):
+        """Show only the rows that match the search and filters"""
+        self.playlist_filter_pending = False
+        if not self.playlist_window.winfo_exists():
+            return
+        
+        options = self.read_playlist_filter()
+        count = len(self.playlist_row_frames)
+        if options is None:
+            self.playlist_matches = None
+            hidden = set()
+        else:
+            self.playlist_matches = [i for i in self.playlist_index.search(**options) if i < count]
+            hidden = set(range(count)).difference(self.playlist_matches)
+        
+        # Only rows whose state changes are touched, top of the list first
+        changes = sorted(hidden.symmetric_difference(self.playlist_hidden))
+        self.playlist_filter_generation += 1
+        self.apply_playlist_rows(changes, hidden, self.playlist_filter_generation)
+        if options != self.playlist_filter_options:
+            self.playlist_filter_options = options
+            self.playlist_canvas.yview_moveto(0)
+        self.update_selection_buttons()
+        self.update_playlist_count_label()
+        
+    def apply_playlist_rows(self, changes, hidden, generation, start=0):
+        """Show or hide a slice of rows, continuing in later callbacks"""
+        if generation != self.playlist_filter_generation or not self.playlist_window.winfo_exists():
+            # A newer filter took over; it works from the rows changed so far
+            return
+        
+        frames = self.playlist_row_frames
+        end = start + FILTER_ROWS_PER_FRAME
+        for index in changes[start:end]:
+            if index in hidden:
+                frames[index].grid_remove()
+                self.playlist_hidden.add(index)
+            else:
+                frames[index].grid()
+                self.playlist_hidden.discard(index)
+        
+        if end < len(changes):
+            self.root.after(1, self.apply_playlist_rows, changes, hidden, generation, end)
+        else:
+            self.schedule_thumbnail_refresh()
+        
+    def update_selection_buttons(self):
+        """Label the select and download buttons for all entries or only the matching ones"""
+        filtered = self.playlist_matches is not None
+        self.select_all_button.config(text="Select Matching" if filtered else "Select All")
+        self.deselect_all_button.config(text="Deselect Matching" if filtered else "Deselect All")
+        self.download_selected_button.config(text="Download Matching" if filtered else "Download Selected")
+        
+    def search_all_playlist_pages(self):
+        """Fetch every remaining playlist page so the search covers the whole playlist"""
+        self.playlist_search_all = True
+        self.load_next_playlist_page()
+        
+    def update_playlist_count_label(self):
+        """Show how many playlist entries have been loaded"""
+        text = f"Showing {len(self.playlist_videos)} of {self.format_playlist_count()}"
+        more = self.playlist_pager is not None and self.playlist_pager.has_more()
+        if self.playlist_matches is not None:
+            # Only loaded pages are searched unless Search All Pages was used
+            text += f" | {len(self.playlist_matches)} matching" + (" in loaded pages" if more else "")
+        text += f" | {self.playlist_selection.count()} selected"
+        if self.playlist_page_loading:
+            text += " (loading...)"
+        if self.thumbnail_requests:
+            text += f" | Thumbnail cache hits: {self.thumbnail_hits / self.thumbnail_requests:.0%}"
+        self.playlist_count_label.config(text=text)
+        self.search_all_button.config(state='normal' if more else 'disabled')
+        
+    def load_next_playlist_page(self):
+        """Fetch the next page of playlist entries in the background"""
+        pager = self.playlist_pager
+        if pager is None or not pager.has_more() or self.playlist_page_loading:
+            return
+        
+        self.playlist_page_loading = True
+        self.update_playlist_count_label()
+        page = pager.next_page
+        
+        def load_page_thread():
+            try:
+                info = pager.fetch_page(pager.page_items(page))
+                self.root.after(0, lambda: self.append_playlist_page(pager, page, info))
+            except Exception as e:
+                self.root.after(0, lambda: self.playlist_page_failed(str(e)))
+        
+        threading.Thread(target=load_page_thread, daemon=True).start()
+        
+    def append_playlist_page(self, pager, page, info):
+        """Add a fetched page of entries to the selection list"""
+        self.playlist_page_loading = False
+        if pager is not self.playlist_pager:
+            # A different URL was loaded meanwhile
+            return
+        
+        # Entries are added to the store on the Tk thread only
+        indexes = pager.add_page(page, info)
+        self.playlist_selection.resize(len(self.playlist_videos), True)
+        self.playlist_index.sync()
+        if not self.playlist_window.winfo_exists():
+            return
+        
+        for i in indexes:
+            self.create_video_checkbox(self.playlist_list_frame, i)
+        
+        # New rows that do not match the current filter start hidden
+        options = self.read_playlist_filter()
+        if options is not None and self.playlist_matches is not None:
+            matching = self.playlist_index.search(within=indexes, **options)
+            for i in set(indexes).difference(matching):
+                self.playlist_row_frames[i].grid_remove()
+                self.playlist_hidden.add(i)
+            self.playlist_matches += matching
+        
+        self.update_playlist_count_label()
+        self.schedule_thumbnail_refresh()
+        
+        if self.enrich_metadata_var.get():
+            self.start_metadata_enrichment(indexes)
+        if self.playlist_search_all:
+            self.load_next_playlist_page()
+        
+    def playlist_page_failed(self, error):
+        """Handle a failed playlist page fetch"""
+        self.playlist_page_loading = False
+        self.playlist_search_all = False
+        self.log_message(f"Error loading more playlist entries: {error}")
+        if self.playlist_window.winfo_exists():
+            self.update_playlist_count_label()
+        
+    def close_playlist_selection(self):
+        """Close the playlist selection window and stop loading details"""
+        self.cancel_metadata_enrichment()
+        self.playlist_window.destroy()
+        self.playlist_rows = []
+        self.playlist_row_frames = []
+        self.thumbnail_labels = {}
+        self.thumbnail_shown = set()
+        self.playlist_matches = None
+        self.playlist_hidden = set()
+        self.playlist_search_all = False
+        self.playlist_filter_generation += 1
+        # Free the Tcl variables behind the row checkboxes
+        self.root.tk.call('array', 'unset', 'playlist_selected')
+        
+    def create_video_checkbox(self, parent, index):
         """Create a checkbox for a video in the playlist"""
+        video = self.playlist_videos.entry(index)
         video_frame = ttk.Frame(parent)
-        video_frame.pack(fill=tk.X, pady=2)
-        
-        # Checkbox
-        var = tk.BooleanVar(value=video.get('selected', True))
-        checkbox = ttk.Checkbutton(video_frame, variable=var)
+        video_frame.grid(row=index, column=0, sticky=tk.EW, pady=2)
+        
+        # Checkbox state lives in the selection bitset; the Tcl array element
+        # only mirrors it, so no Python variable object is kept per row
+        var_name = f"playlist_selected({index})"
+        self.root.setvar(var_name, int(self.playlist_selection.get(index)))
+        checkbox = ttk.Checkbutton(video_frame, variable=var_name,
+                                   command=lambda: self.toggle_video(index))
         checkbox.pack(side=tk.LEFT, padx=(0, 10))
+        self.playlist_row_frames.append(video_frame)
+        
+        # Thumbnail placeholder, filled in when the row is scrolled into view
+        if self.show_thumbnails_var.get() and self.playlist_videos.ids[index]:
+            thumbnail_label = ttk.Label(video_frame, image=self.get_thumbnail_placeholder())
+            thumbnail_label.pack(side=tk.LEFT, padx=(0, 10))
+            self.thumbnail_labels[index] = thumbnail_label
         
         # Video info
         info_frame = ttk.Frame(video_frame)
@@ -899,50 +1781,244 @@ class KartoshkaYoutuberGUI:
         ttk.Label(info_frame, text=title_text, font=('Segoe UI', 9, 'bold')).pack(anchor=tk.W)
         
         # Duration and uploader
-        duration = video.get('duration', 0)
+        details_label = ttk.Label(info_frame, text=self.format_video_details(video), font=('Segoe UI', 8))
+        details_label.pack(anchor=tk.W)
+        
+        # Store reference
+        self.playlist_rows.append(details_label)
+        
+    def get_thumbnail_placeholder(self):
+        """Get the blank image shown until a thumbnail has loaded"""
+        if self.thumbnail_placeholder is None:
+            width, height = THUMBNAIL_SIZE
+            self.thumbnail_placeholder = tk.PhotoImage(width=width, height=height)
+        return self.thumbnail_placeholder
+        
+    def request_thumbnail(self, key, url, on_ready):
+        """Show a thumbnail from memory, or load it from disk or the network"""
+        self.thumbnail_requests += 1
+        image = self.thumbnail_images.get(key)
+        if image is not None:
+            self.thumbnail_hits += 1
+            on_ready(image)
+            return
+        
+        def loaded(key, data, from_disk):
+            self.root.after(0, lambda: self.thumbnail_loaded(key, data, from_disk, on_ready))
+        self.thumbnail_cache.load(key, url, loaded)
+        
+    def thumbnail_loaded(self, key, data, from_disk, on_ready):
+        """Decode a loaded thumbnail and keep it in the memory cache"""
+        if data is None:
+            return
+        if from_disk:
+            self.thumbnail_hits += 1
+        image = self.thumbnail_images.get(key)
+        if image is None:
+            try:
+                image = tk.PhotoImage(data=base64.b64encode(data))
+            except tk.TclError:
+                return
+            self.thumbnail_images.put(key, image, image.width() * image.height() * 4)
+        on_ready(image)
+        
+    def schedule_thumbnail_refresh(self):
+        """Refresh visible thumbnails once scrolling settles"""
+        if self.thumbnail_labels and not self.thumbnail_refresh_pending:
+            self.thumbnail_refresh_pending = True
+            self.root.after(50, self.refresh_visible_thumbnails)
+        
+    def refresh_visible_thumbnails(self):
+        """Load thumbnails for rows in view and release those scrolled away"""
+        self.thumbnail_refresh_pending = False
+        frames = self.playlist_row_frames
+        if not frames or not self.playlist_window.winfo_exists():
+            return
+        
+        canvas = self.playlist_canvas
+        top = canvas.canvasy(0)
+        bottom = top + canvas.winfo_height()
+        
+        # Shown rows are stacked in index order, so find the first visible one by
+        # bisection; rows hidden by the filter keep stale positions and are skipped
+        hidden = self.playlist_hidden
+        rows = [i for i in range(len(frames)) if i not in hidden] if hidden else range(len(frames))
+        low, high = 0, len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            frame = frames[rows[middle]]
+            if frame.winfo_y() + frame.winfo_height() < top:
+                low = middle + 1
+            else:
+                high = middle
+        visible = set()
+        for position in range(low, len(rows)):
+            index = rows[position]
+            if frames[index].winfo_y() > bottom:
+                break
+            visible.add(index)
+        
+        placeholder = self.get_thumbnail_placeholder()
+        for index in self.thumbnail_shown - visible:
+            if index in self.thumbnail_labels:
+                self.thumbnail_labels[index].config(image=placeholder)
+        for index in visible - self.thumbnail_shown:
+            if index in self.thumbnail_labels:
+                video_id = self.playlist_videos.ids[index]
+                self.request_thumbnail(video_id, thumbnail_url(video_id),
+                                       lambda image, index=index: self.show_row_thumbnail(index, image))
+        self.thumbnail_shown = visible
+        self.update_playlist_count_label()
+        
+    def show_row_thumbnail(self, index, image):
+        """Put a loaded thumbnail on its row if the row is still in view"""
+        label = self.thumbnail_labels.get(index)
+        if label is not None and index in self.thumbnail_shown:
+            label.config(image=image)
+        
+    def toggle_video(self, index):
+        """Sync the selection bitset with a clicked checkbox"""
+        self.playlist_selection.set(index, bool(int(self.root.getvar(f"playlist_selected({index})"))))
+        self.update_playlist_count_label()
+        
+    def format_video_details(self, video):
+        """Format the details line shown under a playlist entry"""
+        duration = int(video.get('duration') or 0)
         duration_str = f"{duration//60}:{duration%60:02d}" if duration > 0 else "Unknown"
-        uploader = video.get('uploader', 'Unknown')
+        uploader = video.get('uploader') or 'Unknown'
         info_text = f"Duration: {duration_str} | Uploader: {uploader}"
-        ttk.Label(info_frame, text=info_text, font=('Segoe UI', 8)).pack(anchor=tk.W)
         
-        # Store reference
-        self.playlist_checkboxes.append({
-            'var': var,
-            'video': video,
-            'index': index
+        if video.get('filesize'):
+            info_text += f" | Size: ~{video['filesize'] / 1024 / 1024:.1f} MB"
+        if video.get('qualities'):
+            info_text += f" | Qualities: {', '.join(video['qualities'][:4])}"
+        return info_text
+        
+    def start_metadata_enrichment(self, indexes=None):
+        """Resolve full metadata for playlist entries with a worker pool"""
+        if indexes is None:
+            indexes = range(len(self.playlist_rows))
+        
+        entries = self.playlist_videos
+        pending = []
+        for index in indexes:
+            url = entries.urls[index]
+            if not url or entries.enriched.get(index) or url in self.enrich_queued:
+                continue
+            cached = self.metadata_cache.get(url)
+            if cached is not None:
+                self.apply_enriched_entry(index, cached)
+            else:
+                pending.append((index, url))
+        
+        if not pending:
+            return
+        
+        self.log_message(f"Loading details for {len(pending)} playlist entries...")
+        if self.enrich_executor is None:
+            self.enrich_cancel = threading.Event()
+            self.enrich_executor = ThreadPoolExecutor(max_workers=self.enrich_workers)
+        cancel_event = self.enrich_cancel
+        for index, url in pending:
+            self.enrich_queued.add(url)
+            self.enrich_executor.submit(self.enrich_entry, index, url, cancel_event)
+        
+    def enrich_entry(self, index, url, cancel_event):
+        """Fetch full metadata for one playlist entry (worker thread)"""
+        if cancel_event.is_set():
+            return
+        try:
+            info = get_info(self.backend_path, url, running=self.enrich_processes)
+        except (BackendError, subprocess.TimeoutExpired, ValueError, OSError):
+            return
+        self.metadata_cache.put(url, info)
+        if not cancel_event.is_set():
+            self.root.after(0, lambda: self.apply_enriched_entry(index, info, cancel_event))
+        
+    def apply_enriched_entry(self, index, info, cancel_event=None):
+        """Merge resolved metadata into a playlist entry and update its row"""
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        if index >= len(self.playlist_rows):
+            return
+        
+        formats = info.get('formats', [])
+        sizes = [fmt.get('filesize') or fmt.get('filesize_approx') or 0 for fmt in formats]
+        self.playlist_videos.update(index, {
+            'title': info.get('title'),
+            'uploader': info.get('uploader'),
+            'duration': info.get('duration'),
+            'filesize': max(sizes) if sizes else 0,
+            'qualities': self.sort_resolutions(formats)
         })
+        self.playlist_index.refresh(index)
+        if self.playlist_matches is not None:
+            # The new title, uploader or duration may change what matches
+            self.schedule_playlist_filter(FILTER_REFRESH_MS)
+        
+        try:
+            self.playlist_rows[index].config(text=self.format_video_details(self.playlist_videos.entry(index)))
+        except tk.TclError:
+            # Row was destroyed with the window
+            pass
+        
+    def cancel_metadata_enrichment(self):
+        """Stop any running metadata enrichment"""
+        self.enrich_cancel.set()
+        self.enrich_queued.clear()
+        if self.enrich_executor is not None:
+            # Queued entries see the cancel flag and return immediately
+            self.enrich_executor.shutdown(wait=False)
+            self.enrich_executor = None
+        for process in list(self.enrich_processes):
+            try:
+                process.kill()
+            except OSError:
+                pass
         
     def select_all_videos(self):
         """Select all videos in the playlist"""
-        for checkbox in self.playlist_checkboxes:
-            checkbox['var'].set(True)
+        self.set_all_videos_selected(True)
             
     def deselect_all_videos(self):
         """Deselect all videos in the playlist"""
-        for checkbox in self.playlist_checkboxes:
-            checkbox['var'].set(False)
+        self.set_all_videos_selected(False)
+        
+    def set_all_videos_selected(self, selected):
+        """Set every playlist entry, or every matching one, and its checkbox to the same state"""
+        if self.playlist_matches is not None:
+            # With a filter on, entries that do not match keep their state
+            for index in self.playlist_matches:
+                self.playlist_selection.set(index, selected)
+                self.root.setvar(f"playlist_selected({index})", int(selected))
+            self.update_playlist_count_label()
+            return
+        self.playlist_selection.set_all(selected)
+        for index in range(len(self.playlist_rows)):
+            self.root.setvar(f"playlist_selected({index})", int(selected))
+        self.update_playlist_count_label()
             
     def download_selected_videos(self):
-        """Download selected videos from playlist"""
-        selected_videos = []
-        for checkbox in self.playlist_checkboxes:
-            if checkbox['var'].get():
-                video = checkbox['video'].copy()
-                video['selected'] = True
-                selected_videos.append(video)
+        """Download selected videos from playlist, only the matching ones while a filter is on"""
+        # Only entries that are shown can be selected
+        selected_videos = [i for i in self.playlist_selection.indexes() if i < len(self.playlist_rows)]
+        if self.playlist_matches is not None:
+            # Hidden entries, such as already downloaded ones, are left out
+            matching = set(self.playlist_matches)
+            selected_videos = [i for i in selected_videos if i in matching]
         
         if not selected_videos:
             messagebox.showwarning("Warning", "Please select at least one video to download.")
             return
             
         # Close playlist window
-        self.playlist_window.destroy()
+        self.close_playlist_selection()
         
         # Start download
         self.start_playlist_download(selected_videos)
         
     def start_playlist_download(self, selected_videos):
-        """Start downloading selected videos from playlist"""
+        """Queue the selected playlist videos, given their indexes"""
         if self.is_downloading:
             messagebox.showwarning("Warning", "A download is already in progress.")
             return
@@ -956,57 +2032,163 @@ class KartoshkaYoutuberGUI:
         self.download_btn.config(state='disabled', text="Downloading...")
         
         # Show progress frame
-        self.progress_frame.grid()
+        self.show_progress_frame()
         self.progress_var.set(0)
         self.status_label.config(text="Starting playlist download...")
+        self.start_throughput_graph()
+        
+        # A total size budget is split between the videos by duration
+        max_size, max_bitrate = self.get_budget()
+        total_budget = bool(max_size) and self.budget_scope_var.get() == "total"
+        if total_budget:
+            durations = [self.playlist_videos.durations[i] for i in selected_videos]
+            budgets = split_budget(durations, max_size)
+            self.log_message(f"Size budget: {max_size / 1024 / 1024:.0f} MB for {len(selected_videos)} videos")
+        else:
+            budgets = [None] * len(selected_videos)
+        extra_args = self.download_args(include_size=not total_budget)
+        
+        # Each video is its own job so the scheduler can hold videos that
+        # would not fit on the disk instead of failing halfway through
+        scheduler = self.get_scheduler()
+        album = self.playlist_title()
+        self.playlist_jobs = []
+        self.logged_job_ids = set()
+        for index, budget in zip(selected_videos, budgets):
+            job_args = extra_args + (["--max-size", str(budget)] if budget else [])
+            job = Job(self.playlist_videos.urls[index], self.selected_quality, self.format_var.get(),
+                      self.download_path_var.get(), job_args, title=self.playlist_videos.titles[index],
+                      tags=build_tags(self.playlist_videos.entry(index), album, index + 1))
+            self.playlist_jobs.append(job)
+        scheduler.submit_many(self.playlist_jobs)
+        self.log_message(f"Queued {len(self.playlist_jobs)} videos")
+        
+    def get_scheduler(self):
+        """Get the download scheduler, creating it on first use"""
+        if self.scheduler is None:
+            self.scheduler = DownloadScheduler(self.backend_path,
+                                               max_workers=max(1, self.parallel_downloads_var.get()),
+                                               resolve_sizes=self.estimate_job_sizes,
+                                               on_update=self.on_job_update,
+                                               metrics=self.metrics,
+                                               schedule=self.download_schedule)
+        else:
+            self.scheduler.max_workers = max(1, self.parallel_downloads_var.get())
+        return self.scheduler
+        
+    def estimate_job_sizes(self, jobs, on_size):
+        """Estimate queued jobs' download sizes from their video info (worker thread)
+        
+        Info that is not cached yet is resolved for all jobs in one bulk
+        backend call, and each size is reported as its info arrives. A
+        backend without bulk info is asked for each job in turn instead.
+        """
+        missing = []
+        for job in jobs:
+            info = self.metadata_cache.get(job.url)
+            if info is None:
+                missing.append(job)
+            else:
+                on_size(job, self.job_size_from_info(job, info))
+        if not missing:
+            return
         
-        def download_thread():
-            try:
-                # Prepare playlist data
-                playlist_data = {
-                    'videos': selected_videos
-                }
-                
-                # Call backend to download playlist
-                cmd = [
-                    self.backend_path,
-                    "--command", "download_playlist",
-                    "--url", url,
-                    "--quality", self.selected_quality,
-                    "--format", self.format_var.get(),
-                    "--path", self.download_path_var.get(),
-                    "--playlist-data", json.dumps(playlist_data)
-                ]
-                
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=300,
-                                      creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0)
-                
-                if result.returncode == 0:
-                    response = json.loads(result.stdout)
-                    if response.get('success'):
-                        self.root.after(0, lambda: self.download_completed(True, response.get('message', 'Playlist download completed!')))
-                    else:
-                        self.root.after(0, lambda: self.download_completed(False, response.get('error', 'Unknown error')))
-                else:
-                    error_msg = result.stderr or "Unknown error occurred"
-                    self.root.after(0, lambda: self.download_completed(False, f"Backend error: {error_msg}"))
-                    
-            except subprocess.TimeoutExpired:
-                self.root.after(0, lambda: self.download_completed(False, "Timeout: Download took too long"))
-            except Exception as e:
-                self.root.after(0, lambda: self.download_completed(False, f"Error: {str(e)}"))
+        for index, info, error in get_info_each(self.backend_path, [job.url for job in missing]):
+            job = missing[index]
+            if info is None:
+                on_size(job, 0)
+            else:
+                self.metadata_cache.put(job.url, info)
+                on_size(job, self.job_size_from_info(job, info))
+        
+    def job_size_from_info(self, job, info):
+        """Estimate a job's download size from its video info"""
+        max_size = max_bitrate = None
+        if "--max-size" in job.extra_args:
+            max_size = int(job.extra_args[job.extra_args.index("--max-size") + 1])
+        if "--max-bitrate" in job.extra_args:
+            max_bitrate = int(job.extra_args[job.extra_args.index("--max-bitrate") + 1])
+        return estimate_download_size(info, job.quality, job.file_format, max_size, max_bitrate)
+        
+    def on_job_update(self, job):
+        """Pass a job change to the Tk thread (worker thread)"""
+        # The status is read now, since the job may have moved on by the time it is handled
+        self.root.after(0, self.handle_job_update, job, job.status)
+        
+    def handle_job_update(self, job, status):
+        """Log scheduled jobs, start the graph and schedule a progress refresh for a job change"""
+        last_status = self.scheduled_jobs.get(job.id)
+        if last_status is not None and status != last_status:
+            if status in ('done', 'failed', 'cancelled'):
+                del self.scheduled_jobs[job.id]
+            else:
+                self.scheduled_jobs[job.id] = status
+            self.report_scheduled_job(job, status)
+        if status == 'running' and self.graph_after_id is None:
+            # Jobs from the API or the schedule start the graph too
+            self.show_throughput_graph()
+        # Coalesce bursts of progress events into one refresh
+        if not self.job_refresh_pending:
+            self.job_refresh_pending = True
+            self.root.after(100, self.refresh_playlist_progress)
+        
+    def refresh_playlist_progress(self):
+        """Show combined progress, speed and disk reservations for queued jobs"""
+        self.job_refresh_pending = False
+        jobs = self.playlist_jobs
+        if not jobs or not self.is_downloading:
+            return
         
-        threading.Thread(target=download_thread, daemon=True).start()
+        done = [job for job in jobs if job.status == 'done']
+        failed = [job for job in jobs if job.status in ('failed', 'cancelled')]
+        running = [job for job in jobs if job.status == 'running']
+        waiting = [job for job in jobs if job.status == 'waiting_space']
+        scheduled = [job for job in jobs if job.status == 'scheduled']
+        
+        for job in failed:
+            if job.id not in self.logged_job_ids:
+                self.logged_job_ids.add(job.id)
+                self.log_message(f"Failed: {job.title}: {job.error or job.status}")
+        
+        finished = len(done) + len(failed)
+        partial = sum(job.progress.get('percent', 0) / 100 for job in running)
+        self.progress_var.set((finished + partial) / len(jobs) * 100)
+        
+        status = f"Downloading: {finished}/{len(jobs)} finished, {len(running)} running"
+        if waiting:
+            status += f", {len(waiting)} waiting for disk space"
+        if scheduled:
+            status += f", {len(scheduled)} waiting for the download window"
+        self.status_label.config(text=status)
+        
+        speed = sum(job.progress.get('speed') or 0 for job in running)
+        self.speed_label.config(text=f"{speed / 1024 / 1024:.1f} MB/s" if speed > 0 else "")
+        
+        try:
+            reserved, free = self.scheduler.reservations.summary(jobs[0].path)
+            self.reservation_label.config(text=f"Disk: {format_bytes(reserved)} reserved, {format_bytes(free)} free")
+        except OSError:
+            self.reservation_label.config(text="")
+        
+        if finished == len(jobs):
+            self.reservation_label.config(text="")
+            if failed:
+                self.download_completed(False, f"Playlist download finished with {len(failed)} failed of {len(jobs)} videos")
+            else:
+                videos = "video" if len(done) == 1 else "videos"
+                self.download_completed(True, f"Playlist download completed! {len(done)} {videos} downloaded")
 
     def clear_all(self):
         """Clear all inputs and status"""
         self.url_var.set("")
         self.video_info = None
         self.playlist_info = None
-        self.playlist_videos = []
-        self.info_frame.grid_remove()
-        self.qualities_frame.grid_remove()
-        self.progress_frame.grid_remove()
+        self.playlist_videos = PlaylistEntries()
+        self.playlist_selection = Bitset()
+        self.playlist_pager = None
+        for frame in (self.info_frame, self.qualities_frame, self.progress_frame):
+            if frame is not None:
+                frame.grid_remove()
         self.progress_var.set(0)
         self.status_text.delete(1.0, tk.END)
         self.quality_label.config(text="Select from available qualities below")
@@ -1014,6 +2196,18 @@ class KartoshkaYoutuberGUI:
         
     def on_closing(self):
         """Handle window closing"""
+        self.lag_monitor.stop()
+        if self.graph_after_id is not None:
+            self.root.after_cancel(self.graph_after_id)
+        self.cancel_prefetch()
+        self.cancel_metadata_enrichment()
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+        self.thumbnail_cache.shutdown()
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+        if self.api_server is not None:
+            self.api_server.shutdown()
         if hasattr(self, 'canvas'):
             self.canvas.unbind_all("<MouseWheel>")
         self.root.destroy()
@@ -1021,26 +2215,35 @@ class KartoshkaYoutuberGUI:
 def main():
     """Main function"""
     root = tk.Tk()
+    startup_timeline.mark("tk_init")
     app = KartoshkaYoutuberGUI(root)
+    startup_timeline.mark("ui_built")
     
-    # Check if backend exists
-    if getattr(sys, 'frozen', False):
-        # Running as compiled exe
-        app_dir = Path(sys.executable).parent
-        backend_name = "kartoshka-backend.exe" if os.name == 'nt' else "./kartoshka-backend"
-        backend_path = str(app_dir / backend_name)
-    else:
-        # Running as script - use the new backend
-        app_dir = Path(__file__).parent
-        backend_name = "kartoshka-backend.exe" if os.name == 'nt' else "./kartoshka-backend"
-        backend_path = str(app_dir / backend_name)
+    # First paint is done once the window is mapped and its idle redraws have run
+    def on_first_map(event):
+        if event.widget is root:
+            root.unbind('<Map>')
+            root.after_idle(first_paint)
     
-    if not os.path.exists(backend_path):
-        messagebox.showerror("Error", f"Backend application not found!\nPlease ensure {backend_path} is in the same directory.")
+    def first_paint():
+        startup_timeline.mark("first_paint")
+        if '--startup-benchmark' in sys.argv[1:]:
+            print(json.dumps(startup_timeline.marks))
+            root.destroy()
+    
+    root.bind('<Map>', on_first_map)
+    
+    # Check if backend exists
+    if '--startup-benchmark' not in sys.argv[1:] and not os.path.exists(app.backend_path):
+        messagebox.showerror("Error", f"Backend application not found!\nPlease ensure {app.backend_path} is in the same directory.")
         return
     
-    # Start the application
-    root.mainloop()
+    # Start the application, profiling the whole session with --profile
+    profile = profiling_enabled('--profile' in sys.argv[1:])
+    if profile:
+        os.environ[PROFILE_ENV] = '1'
+    with profile_session("gui", enabled=profile):
+        root.mainloop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Integrity helpers for Kartoshka Youtuber
+Hashes media while it is written and verifies files against a manifest
+Created by NaderB - https://www.naderb.org
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Name of the index manifest kept in each download folder
+MANIFEST_NAME = "manifest.jsonl"
+
+# Bytes read per call when verifying files
+READ_SIZE = 1024 * 1024
+
+
+def fast_hash_name():
+    """Name of the fast digest: xxh64 when xxhash is installed, else blake2b"""
+    return 'xxh64' if xxhash is not None else 'blake2b'
+
+
+def new_hashers(fast=False):
+    """Create the digest objects for a file, keyed by algorithm name"""
+    hashers = {'sha256': hashlib.sha256()}
+    if fast:
+        hashers[fast_hash_name()] = xxhash.xxh64() if xxhash is not None else hashlib.blake2b()
+    return hashers
+
+
+class HashingWriter:
+    """File-like wrapper that hashes bytes as they are written through it"""
+
+    def __init__(self, target, fast=False):
+        self.target = target
+        self.hashers = new_hashers(fast)
+        self.size = 0
+
+    def write(self, data):
+        """Write data and hash the part the target accepted
+
+        A raw (unbuffered) target may take only part of data, returning how
+        much it took, or None when it would block; the rest is left for
+        the caller to write again, so it is not hashed yet.
+        """
+        written = self.target.write(data)
+        accepted = memoryview(data)[:written or 0]
+        for hasher in self.hashers.values():
+            hasher.update(accepted)
+        self.size += len(accepted)
+        return written
+
+    def flush(self):
+        self.target.flush()
+
+    def close(self):
+        self.target.close()
+
+    def digests(self):
+        """Get the hex digests written so far"""
+        return {name: hasher.hexdigest() for name, hasher in self.hashers.items()}
+
+
+def manifest_record(path, size, digests, base_dir=None):
+    """Build a manifest record for a finished file"""
+    record = {
+        'path': os.path.relpath(path, base_dir) if base_dir else os.path.basename(path),
+        'size': size,
+        'completed': datetime.now().isoformat(timespec='seconds')
+    }
+    record.update(digests)
+    return record
+
+
+def append_manifest(base_dir, record):
+    """Add a record to the folder's manifest"""
+    with open(os.path.join(base_dir, MANIFEST_NAME), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def write_sidecar(path, digests):
+    """Write a sha256sum-compatible sidecar next to a file"""
+    with open(path + ".sha256", "w", encoding="utf-8") as f:
+        f.write(f"{digests['sha256']}  {os.path.basename(path)}\n")
+
+
+def load_manifest(manifest_path):
+    """Load manifest records, keeping only the latest one per path"""
+    records = {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                records[record['path']] = record
+    return list(records.values())
+
+
+def hash_file(path, algorithms):
+    """Hash a file with the given algorithms in one read pass"""
+    hashers = {}
+    for name in algorithms:
+        if name == 'xxh64':
+            if xxhash is None:
+                continue
+            hashers[name] = xxhash.xxh64()
+        else:
+            hashers[name] = hashlib.new(name)
+
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            for hasher in hashers.values():
+                hasher.update(chunk)
+    return size, {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+
+def verify_record(base_dir, record, full=False):
+    """Check one file against its manifest record
+
+    The fast digest is checked when the record has one, unless full is set
+    in which case sha256 is checked too. Returns (path, status) with status
+    ok, missing, size mismatch or hash mismatch.
+    """
+    path = os.path.join(base_dir, record['path'])
+    if not os.path.exists(path):
+        return record['path'], 'missing'
+    if os.path.getsize(path) != record.get('size'):
+        return record['path'], 'size mismatch'
+
+    algorithms = [name for name in ('xxh64', 'blake2b') if name in record and (name != 'xxh64' or xxhash)][:1]
+    if full or not algorithms:
+        algorithms.append('sha256')
+    _, digests = hash_file(path, algorithms)
+    for name, digest in digests.items():
+        if record.get(name) != digest:
+            return record['path'], 'hash mismatch'
+    return record['path'], 'ok'
+
+
+def verify_manifest(manifest_path, workers=4, full=False):
+    """Verify every file in a manifest with a pool of parallel readers"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    records = load_manifest(manifest_path)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda record: verify_record(base_dir, record, full), records))
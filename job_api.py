@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Local job API for Kartoshka Youtuber
+Lets other programs submit, list, cancel and follow downloads over localhost HTTP
+Created by NaderB - https://www.naderb.org
+"""
+
+import json
+import os
+import queue
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from scheduler import AUDIO_OUTPUTS, Job
+from time_windows import DownloadSchedule
+
+DEFAULT_PORT = 8765
+
+# Jobs allowed to wait for a worker before new submissions are refused
+DEFAULT_MAX_QUEUE = 100
+
+# Seconds clients are told to wait when the queue is full
+RETRY_AFTER_SECONDS = 5
+
+# Idle event streams send a keepalive this often, which also notices
+# clients that went away
+KEEPALIVE_SECONDS = 15
+
+# Updates buffered per event stream; a slow client misses progress
+# updates past this, but each job's final state is always sent
+STREAM_BUFFER = 1000
+
+MAX_BODY_BYTES = 64 * 1024
+
+OUTPUT_FORMATS = ('mp4',) + AUDIO_OUTPUTS
+
+
+def job_to_dict(job):
+    """Get the JSON view of a job"""
+    return {
+        'id': job.id,
+        'url': job.url,
+        'title': job.title,
+        'quality': job.quality,
+        'format': job.file_format,
+        'path': job.path,
+        'status': job.status,
+        'percent': job.progress.get('percent', 0),
+        'speed': job.progress.get('speed'),
+        'downloaded_bytes': job.progress.get('downloaded_bytes'),
+        'estimated_size': job.estimated_size,
+        'schedule': str(job.schedule) if job.schedule else None,
+        'rate_limit': job.rate_limit,
+        'error': job.error
+    }
+
+
+def job_from_request(data, default_path):
+    """Build a job from a submitted JSON object, raising ValueError if it is invalid"""
+    if not isinstance(data, dict):
+        raise ValueError("Body must be a JSON object")
+    url = data.get('url')
+    if not isinstance(url, str) or not url.startswith(('http://', 'https://')):
+        raise ValueError("url must be an http(s) URL")
+    file_format = data.get('format', 'mp4')
+    if file_format not in OUTPUT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(OUTPUT_FORMATS)}")
+    quality = data.get('quality', 'best')
+    path = data.get('path') or default_path
+    schedule = data.get('schedule')
+    if not isinstance(quality, str) or not isinstance(path, str) or not isinstance(schedule, (str, type(None))):
+        raise ValueError("quality, path and schedule must be strings")
+    return Job(url, quality, file_format, os.path.expanduser(path), title=data.get('title'),
+               schedule=DownloadSchedule.parse(schedule) if schedule else None)
+
+
+def serve_jobs(scheduler, port=DEFAULT_PORT, max_queue=DEFAULT_MAX_QUEUE, default_path='.'):
+    """Serve the job API for a scheduler on a background thread and return the server
+
+    POST   /jobs             submit {"url", "quality", "format", "path", "schedule"}; 429 when the queue is full
+    GET    /jobs             list jobs, optionally ?status=running
+    GET    /jobs/ID          get one job
+    DELETE /jobs/ID          cancel a job
+    GET    /jobs/ID/events   follow one job until it finishes
+    GET    /events           follow every job
+
+    Event streams are server-sent events, or JSON lines with ?format=jsonl.
+    The API has no authentication and writes wherever a job's path says, so
+    it only ever listens on the loopback address.
+    """
+    # Imported here so the GUI does not pay for http.server at startup
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class JobHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 for chunked event streams
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parts, query = self.route()
+            if parts == ['jobs']:
+                status = query.get('status', [None])[0]
+                self.send_json(200, [job_to_dict(job) for job in scheduler.list_jobs()
+                                     if status in (None, job.status)])
+            elif len(parts) == 2 and parts[0] == 'jobs':
+                job = self.find_job(parts[1])
+                if job is not None:
+                    self.send_json(200, job_to_dict(job))
+            elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+                job = self.find_job(parts[1])
+                if job is not None:
+                    self.stream(job, query)
+            elif parts == ['events']:
+                self.stream(None, query)
+            else:
+                self.send_json(404, {'error': "Not found"})
+
+        def do_POST(self):
+            parts, _ = self.route()
+            if parts != ['jobs']:
+                self.send_json(404, {'error': "Not found"})
+                return
+            # Browsers cannot send JSON cross-origin without a preflight this
+            # server never answers, so web pages cannot submit jobs
+            if self.headers.get('Content-Type', '').split(';')[0].strip() != 'application/json':
+                self.send_json(415, {'error': "Content-Type must be application/json"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                if length < 0:
+                    raise ValueError("Invalid Content-Length")
+                if length > MAX_BODY_BYTES:
+                    self.send_json(413, {'error': "Request body too large"})
+                    return
+                job = job_from_request(json.loads(self.rfile.read(length) or b'null'), default_path)
+            except ValueError as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            if scheduler.queued_count() >= max_queue:
+                self.send_json(429, {'error': f"Queue is full ({max_queue} jobs waiting)"},
+                               {'Retry-After': str(RETRY_AFTER_SECONDS)})
+                return
+            scheduler.submit(job)
+            self.send_json(201, job_to_dict(job), {'Location': f"/jobs/{job.id}"})
+
+        def do_DELETE(self):
+            parts, _ = self.route()
+            if len(parts) != 2 or parts[0] != 'jobs':
+                self.send_json(404, {'error': "Not found"})
+                return
+            job = self.find_job(parts[1])
+            if job is None:
+                return
+            if scheduler.cancel(job.id):
+                self.send_json(200, job_to_dict(job))
+            else:
+                self.send_json(409, {'error': f"Job already {job.status}"})
+
+        def route(self):
+            split = urlsplit(self.path)
+            return [part for part in split.path.split('/') if part], parse_qs(split.query)
+
+        def find_job(self, job_id):
+            """Get a job by its ID, answering 404 if there is none"""
+            job = scheduler.jobs.get(int(job_id)) if job_id.isdigit() else None
+            if job is None:
+                self.send_json(404, {'error': "No such job"})
+            return job
+
+        def send_json(self, code, data, headers=None):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self, job, query):
+            """Stream job updates until the job finishes or the client goes away"""
+            sse = query.get('format', ['sse'])[0] != 'jsonl'
+            updates = queue.Queue(maxsize=STREAM_BUFFER)
+
+            def on_update(changed):
+                if job is None or changed is job:
+                    try:
+                        updates.put_nowait(job_to_dict(changed))
+                    except queue.Full:
+                        pass
+
+            scheduler.add_listener(on_update)
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream' if sse else 'application/x-ndjson')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+                if job is not None:
+                    current = [job]
+                else:
+                    current = [other for other in scheduler.list_jobs() if not other.finished]
+                last_status = None
+                for other in current:
+                    data = job_to_dict(other)
+                    self.send_event(data, sse)
+                    last_status = data['status']
+
+                while job is None or not job.finished:
+                    try:
+                        data = updates.get(timeout=KEEPALIVE_SECONDS)
+                    except queue.Empty:
+                        self.send_chunk(": keepalive\n\n" if sse else "\n")
+                        continue
+                    self.send_event(data, sse)
+                    last_status = data['status']
+                if last_status != job.status:
+                    # The final update was dropped or is not queued yet
+                    self.send_event(job_to_dict(job), sse)
+                self.send_chunk("")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                scheduler.remove_listener(on_update)
+                self.close_connection = True
+
+        def send_event(self, data, sse):
+            text = json.dumps(data)
+            self.send_chunk(f"event: job\ndata: {text}\n\n" if sse else text + "\n")
+
+        def send_chunk(self, text):
+            data = text.encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), JobHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Shared job queue for Kartoshka Youtuber
+A SQLite queue that worker processes on one or more machines pull downloads from
+Created by NaderB - https://www.naderb.org
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from backend_client import download_video
+from metrics import JobTimer
+
+# Seconds a claim lasts without a heartbeat before the job is handed to another worker
+DEFAULT_LEASE_SECONDS = 60
+
+# Seconds an idle worker waits before asking for work again
+DEFAULT_POLL_SECONDS = 2
+
+# Claims a job gets before it is marked failed (covers jobs that crash their worker)
+MAX_ATTEMPTS = 3
+
+# Seconds between checks whether a busy worker was asked to stop
+STOP_POLL_SECONDS = 0.5
+
+# Tries for a queue update that hits a locked or unreachable database, and
+# the pause before the first retry (doubled for each one after it)
+DB_ATTEMPTS = 5
+DB_RETRY_SECONDS = 0.2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    quality TEXT NOT NULL,
+    format TEXT NOT NULL,
+    path TEXT NOT NULL,
+    extra_args TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS workers (
+    name TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    busy_seconds REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+def default_worker_name():
+    """Name a worker after its host and process"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobQueue:
+    """Durable download queue in a SQLite file
+
+    Workers claim jobs with a lease and renew it with heartbeats while they
+    download. A job whose lease runs out, because its worker crashed or lost
+    the shared storage, is claimed again by the next worker. Leases compare
+    wall clock times, so hosts sharing a queue need synchronised clocks.
+
+    The rollback journal is used rather than WAL, which does not work
+    across machines. SQLite relies on file locks, which many network
+    filesystems implement unreliably, so a queue on shared storage is only
+    as safe as that storage's locking. Each call opens its own connection,
+    so one JobQueue can be shared by threads.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return _Transaction(db)
+
+    def enqueue(self, url, quality='best', file_format='mp4', path='.', extra_args=None):
+        """Add a job and return its ID"""
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO jobs (url, quality, format, path, extra_args, status, created) "
+                "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                (url, quality, file_format, path, json.dumps(list(extra_args or [])), time.time()))
+            return cursor.lastrowid
+
+    def claim(self, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Take the oldest queued job for a worker, or return None if there is none"""
+        now = time.time()
+        with self._connect() as db:
+            self._touch(db, worker, now)
+            self._reclaim_expired(db, now)
+            row = db.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                       "WHERE id = ?", (worker, now + lease_seconds, row['id']))
+            job = dict(row)
+            job['extra_args'] = json.loads(job['extra_args'])
+            job['attempts'] += 1
+            return job
+
+    def _reclaim_expired(self, db, now):
+        """Requeue jobs whose worker stopped renewing its lease"""
+        db.execute("UPDATE jobs SET status = 'failed', error = 'Worker lost too many times', finished = ? "
+                   "WHERE status = 'running' AND lease_until < ? AND attempts >= ?", (now, now, MAX_ATTEMPTS))
+        db.execute("UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL "
+                   "WHERE status = 'running' AND lease_until < ?", (now,))
+
+    def heartbeat(self, job_id, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extend a worker's lease on a job
+
+        Returns False if the worker no longer holds the job, because it was
+        cancelled or its lease ran out and it went to another worker, in
+        which case the worker should stop the download.
+        """
+        now = time.time()
+        with self._connect() as db:
+            self._touch(db, worker, now)
+            cursor = db.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                                (now + lease_seconds, job_id, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, success, error=None, downloaded_bytes=0, seconds=0.0):
+        """Record a finished job, returning False if the worker no longer held it"""
+        now = time.time()
+        with self._connect() as db:
+            self._touch(db, worker, now)
+            cursor = db.execute("UPDATE jobs SET status = ?, error = ?, bytes = ?, finished = ?, lease_until = NULL "
+                                "WHERE id = ? AND worker = ? AND status = 'running'",
+                                ('done' if success else 'failed', error, downloaded_bytes, now, job_id, worker))
+            held = cursor.rowcount == 1
+            # Time and bytes count toward the worker's throughput even for a job it lost
+            db.execute("UPDATE workers SET done = done + ?, failed = failed + ?, bytes = bytes + ?, "
+                       "busy_seconds = busy_seconds + ? WHERE name = ?",
+                       (int(held and success), int(held and not success), downloaded_bytes, seconds, worker))
+            return held
+
+    def release(self, job_id, worker):
+        """Give a claimed job back to the queue without counting the attempt, returning False if it was not held"""
+        with self._connect() as db:
+            cursor = db.execute("UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL, "
+                                "attempts = MAX(0, attempts - 1) WHERE id = ? AND worker = ? AND status = 'running'",
+                                (job_id, worker))
+            return cursor.rowcount == 1
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; a running job stops at its worker's next heartbeat"""
+        with self._connect() as db:
+            cursor = db.execute("UPDATE jobs SET status = 'cancelled', finished = ? "
+                                "WHERE id = ? AND status IN ('queued', 'running')", (time.time(), job_id))
+            return cursor.rowcount == 1
+
+    def status(self, job_id):
+        with self._connect() as db:
+            row = db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return row['status'] if row else None
+
+    def counts(self):
+        """Get the number of jobs in each status"""
+        with self._connect() as db:
+            return {row['status']: row['count'] for row in
+                    db.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")}
+
+    def worker_stats(self):
+        """Get each worker's totals, throughput and current job, busiest first"""
+        with self._connect() as db:
+            workers = [dict(row) for row in db.execute("SELECT * FROM workers ORDER BY bytes DESC, name")]
+            running = {row['worker']: row['id'] for row in
+                       db.execute("SELECT id, worker FROM jobs WHERE status = 'running'")}
+        for worker in workers:
+            busy = worker['busy_seconds']
+            worker['bytes_per_second'] = worker['bytes'] / busy if busy else 0.0
+            worker['current_job'] = running.get(worker['name'])
+        return workers
+
+    def _touch(self, db, worker, now):
+        db.execute("INSERT INTO workers (name, last_seen) VALUES (?, ?) "
+                   "ON CONFLICT(name) DO UPDATE SET last_seen = excluded.last_seen", (worker, now))
+
+
+class _Transaction:
+    """Run a connection's statements in one write transaction and close it"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        # Take the write lock up front so claims cannot race each other
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.db.close()
+
+
+def with_retries(call, *args):
+    """Call a queue method, retrying while the database is locked or unreachable
+
+    Raises the last sqlite3.Error if every attempt fails.
+    """
+    for attempt in range(DB_ATTEMPTS):
+        try:
+            return call(*args)
+        except sqlite3.Error:
+            if attempt == DB_ATTEMPTS - 1:
+                raise
+            time.sleep(DB_RETRY_SECONDS * 2 ** attempt)
+
+
+def run_worker(queue, backend_path, name=None, lease_seconds=DEFAULT_LEASE_SECONDS,
+               poll_seconds=DEFAULT_POLL_SECONDS, path=None, stop=None, exit_when_empty=False, on_job=None):
+    """Download jobs from a shared queue until stopped
+
+    path, if given, replaces the download folder stored with each job, for
+    workers that see the shared storage under a different path. stop is a
+    threading.Event; setting it kills a running download and releases its
+    job back to the queue, so no other worker downloads the same files
+    while this one is still writing them. on_job(job, success, error) is
+    called after each job. Returns the number of jobs this worker finished.
+    """
+    name = name or default_worker_name()
+    stop = stop or threading.Event()
+    finished = 0
+    while not stop.is_set():
+        try:
+            job = with_retries(queue.claim, name, lease_seconds)
+        except sqlite3.Error:
+            # Try again after the usual pause rather than ending the worker
+            job = None
+        if job is None:
+            if exit_when_empty:
+                break
+            stop.wait(poll_seconds)
+            continue
+
+        running = set()
+        lost = threading.Event()
+        cancelled = threading.Event()
+        done = threading.Event()
+
+        def kill_download():
+            for process in list(running):
+                process.kill()
+
+        def keep_lease():
+            # Renew well before the lease runs out; stop the download if the
+            # job was taken away or the worker is stopping
+            renew_at = time.monotonic() + lease_seconds / 3
+            while not done.wait(STOP_POLL_SECONDS):
+                if stop.is_set():
+                    kill_download()
+                    return
+                if time.monotonic() < renew_at:
+                    continue
+                renew_at = time.monotonic() + lease_seconds / 3
+                try:
+                    holding = queue.heartbeat(job['id'], name, lease_seconds)
+                except sqlite3.Error:
+                    continue
+                if not holding:
+                    # A cancelled job is not lost; it must not be reported as such
+                    try:
+                        was_cancelled = queue.status(job['id']) == 'cancelled'
+                    except sqlite3.Error:
+                        was_cancelled = False
+                    (cancelled if was_cancelled else lost).set()
+                    kill_download()
+                    return
+
+        heartbeat = threading.Thread(target=keep_lease, daemon=True)
+        heartbeat.start()
+        timer = JobTimer(job['url'], job['id'])
+        started = time.monotonic()
+        try:
+            success, error = download_video(backend_path, job['url'], job['quality'], job['format'],
+                                            path or job['path'], extra_args=job['extra_args'],
+                                            running=running, timer=timer, job_id=job['id'])
+        except Exception as e:
+            success, error = False, str(e)
+        done.set()
+        heartbeat.join()
+
+        if cancelled.is_set():
+            # The row already says cancelled, so there is nothing to record
+            if on_job is not None:
+                on_job(job, False, "Cancelled")
+            continue
+
+        if stop.is_set() and not success and not lost.is_set():
+            # Stopped mid-download: hand the job straight to another worker
+            try:
+                with_retries(queue.release, job['id'], name)
+            except sqlite3.Error:
+                pass
+            break
+
+        error = None if success else (error.strip() or "Unknown error occurred")
+        if lost.is_set():
+            success, error = False, "Lease lost"
+        try:
+            with_retries(queue.complete, job['id'], name, success, error, timer.bytes,
+                         time.monotonic() - started)
+        except sqlite3.Error:
+            # The lease runs out and the job is claimed again, so the worker carries on
+            pass
+        finished += 1
+        if on_job is not None:
+            on_job(job, success, error)
+    return finished
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag monitor for Kartoshka Youtuber
+Measures how late Tk timer ticks fire and catches the callbacks that block the GUI
+Created by NaderB - https://www.naderb.org
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from metrics import percentile
+
+# How often the Tk tick is scheduled, in milliseconds
+DEFAULT_INTERVAL_MS = 100
+
+# Lag at which the main thread's stack is captured, in milliseconds
+DEFAULT_THRESHOLD_MS = 250
+
+# Lag samples kept for percentiles
+MAX_SAMPLES = 3000
+
+# Stalls kept for the report
+MAX_STALLS = 200
+
+
+def blocking_callback(stack):
+    """Name the Tk callback a captured main thread stack is running
+
+    The callback is the first frame after tkinter's dispatch code; the
+    innermost application frame is given with it as where the time went.
+    """
+    callback = None
+    for index, frame in enumerate(stack):
+        if os.path.basename(os.path.dirname(frame.filename)) == 'tkinter' and index + 1 < len(stack):
+            following = stack[index + 1]
+            if os.path.basename(os.path.dirname(following.filename)) != 'tkinter':
+                callback = following
+    if callback is None:
+        callback = stack[0] if stack else None
+    if callback is None:
+        return "unknown"
+    return f"{callback.name} ({os.path.basename(callback.filename)}:{callback.lineno})"
+
+
+class LagMonitor:
+    """Watch a Tk event loop for stalls
+
+    A timer tick is rescheduled every interval; how late it fires is the
+    loop's lag. A watcher thread notices ticks that are overdue by more than
+    the threshold and captures the main thread's stack while it is still
+    blocked, so the report can name the callback responsible.
+    """
+
+    def __init__(self, root, interval_ms=DEFAULT_INTERVAL_MS, threshold_ms=DEFAULT_THRESHOLD_MS):
+        self.root = root
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.lags = deque(maxlen=MAX_SAMPLES)
+        self.stalls = deque(maxlen=MAX_STALLS)
+        self._expected = None
+        self._current_stall = None
+        self._tick_id = None
+        self._running = False
+        self._main_thread_id = None
+        self._watcher = None
+        self._stop_watching = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start monitoring (call from the Tk thread)"""
+        if self._running:
+            return
+        self._running = True
+        self._main_thread_id = threading.get_ident()
+        self._expected = time.monotonic() + self.interval
+        self._tick_id = self.root.after(int(self.interval * 1000), self._tick)
+        # Each watcher gets its own stop event, so a quick stop and start
+        # cannot leave the old one running next to the new one
+        self._stop_watching = threading.Event()
+        self._watcher = threading.Thread(target=self._watch, args=(self._stop_watching,), daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        """Stop monitoring"""
+        self._running = False
+        if self._stop_watching is not None:
+            self._stop_watching.set()
+        if self._tick_id is not None:
+            try:
+                self.root.after_cancel(self._tick_id)
+            except Exception:
+                pass
+            self._tick_id = None
+
+    @property
+    def running(self):
+        return self._running
+
+    def _tick(self):
+        now = time.monotonic()
+        lag = max(0.0, now - self._expected)
+        with self._lock:
+            self.lags.append(lag)
+            if self._current_stall is not None:
+                self._current_stall['lag'] = lag
+                self.stalls.append(self._current_stall)
+                self._current_stall = None
+        if self._running:
+            self._expected = now + self.interval
+            self._tick_id = self.root.after(int(self.interval * 1000), self._tick)
+
+    def _watch(self, stop):
+        while not stop.wait(self.interval / 2):
+            expected = self._expected
+            if expected is None or time.monotonic() - expected < self.threshold:
+                continue
+            with self._lock:
+                if self._current_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self._main_thread_id)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame)
+                self._current_stall = {
+                    'time': time.strftime('%H:%M:%S'),
+                    'callback': blocking_callback(stack),
+                    'stack': ''.join(traceback.format_list(stack[-12:])),
+                    'lag': None
+                }
+
+    def lag_percentiles(self):
+        """Get lag percentiles and maximum in milliseconds"""
+        with self._lock:
+            lags = sorted(self.lags)
+        stats = {f"p{percent}": (percentile(lags, percent) or 0) * 1000 for percent in (50, 90, 99)}
+        stats['max'] = (lags[-1] if lags else 0) * 1000
+        stats['samples'] = len(lags)
+        return stats
+
+    def slowest_callbacks(self, limit=10):
+        """Get (callback, stalls, worst lag ms, total lag ms) sorted by total lag"""
+        with self._lock:
+            stalls = list(self.stalls)
+        totals = {}
+        for stall in stalls:
+            count, worst, total = totals.get(stall['callback'], (0, 0.0, 0.0))
+            totals[stall['callback']] = (count + 1, max(worst, stall['lag']), total + stall['lag'])
+        ranked = sorted(totals.items(), key=lambda item: item[1][2], reverse=True)
+        return [(name, count, worst * 1000, total * 1000) for name, (count, worst, total) in ranked[:limit]]
+
+    def report(self):
+        """Build a plain text diagnostics dump"""
+        stats = self.lag_percentiles()
+        lines = [
+            f"Event loop lag over {stats['samples']} ticks: p50 {stats['p50']:.0f} ms, "
+            f"p90 {stats['p90']:.0f} ms, p99 {stats['p99']:.0f} ms, max {stats['max']:.0f} ms",
+            f"Stalls over {self.threshold * 1000:.0f} ms: {len(self.stalls)}",
+            ""
+        ]
+        slowest = self.slowest_callbacks()
+        if slowest:
+            lines.append("Slowest callbacks:")
+            for name, count, worst, total in slowest:
+                lines.append(f"  {name}: {count} stalls, worst {worst:.0f} ms, total {total:.0f} ms")
+            with self._lock:
+                worst_stall = max(self.stalls, key=lambda stall: stall['lag'])
+            lines += ["", f"Worst stall ({worst_stall['lag'] * 1000:.0f} ms at {worst_stall['time']}):",
+                      worst_stall['stack']]
+        return "\n".join(lines)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Metadata cache for Kartoshka Youtuber
+Keeps backend info responses so videos are not resolved twice
+Created by NaderB - https://www.naderb.org
+"""
+
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+
+def cache_key(url):
+    """Get a cache key for a URL, using the video ID when there is one"""
+    url = url.strip()
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return url
+
+    host = parsed.netloc.lower()
+    if host.endswith('youtu.be'):
+        video_id = parsed.path.strip('/').split('/')[0]
+        if video_id:
+            return video_id
+    if 'youtube.com' in host:
+        query = parse_qs(parsed.query)
+        if parsed.path == '/watch' and query.get('v') and 'list' not in query:
+            return query['v'][0]
+        if parsed.path.startswith('/shorts/'):
+            return parsed.path.split('/')[2]
+    return url
+
+
+def is_complete_url(url):
+    """Check whether a URL looks complete enough to resolve speculatively
+
+    Accepts YouTube video, shorts, playlist and channel URLs, so half-typed
+    text does not start a backend call.
+    """
+    url = url.strip()
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return False
+    if parsed.scheme not in ('http', 'https'):
+        return False
+    host = parsed.netloc.lower()
+    if host.endswith('youtu.be') or 'youtube.com' in host:
+        video_id = cache_key(url)
+        if video_id != url:
+            # YouTube video IDs are always 11 characters
+            return len(video_id) == 11
+        query = parse_qs(parsed.query)
+        if query.get('list'):
+            return True
+        return parsed.path.startswith(('/@', '/channel/', '/c/', '/user/'))
+    return False
+
+
+def is_paged_url(url):
+    """Check whether a URL is a YouTube playlist or channel, which are fetched a page at a time"""
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return False
+    if 'youtube.com' not in parsed.netloc.lower():
+        return False
+    if parse_qs(parsed.query).get('list'):
+        return True
+    return parsed.path.startswith(('/@', '/channel/', '/c/', '/user/'))
+
+
+def first_page_items(url, page_size):
+    """Get the --items range for the first page of a URL, or None to fetch it whole
+
+    Only playlists and channels are paged, so looking up a single video
+    never needs --items.
+    """
+    if not page_size or not is_paged_url(url):
+        return None
+    return f"1-{page_size}"
+
+
+def info_cache_url(url, page_size=0):
+    """Get the URL an info response is cached under
+
+    Single videos are cached by ID. Playlists and channels are fetched a
+    page at a time, so the page is part of their cache entry.
+    """
+    url = url.strip()
+    items = first_page_items(url, page_size)
+    if items is None:
+        return url
+    return f"{url}#items={items}"
+
+
+class MetadataCache:
+    """Thread-safe LRU cache of backend info responses"""
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Get cached info for a URL, or None"""
+        key = cache_key(url)
+        with self._lock:
+            info = self._entries.get(key)
+            if info is not None:
+                self._entries.move_to_end(key)
+            return info
+
+    def put(self, url, info):
+        """Store info for a URL"""
+        key = cache_key(url)
+        with self._lock:
+            self._entries[key] = info
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, url):
+        with self._lock:
+            return cache_key(url) in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        """Remove all cached info"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Download metrics for Kartoshka Youtuber
+Times the phases of each download and exports them as JSON lines or Prometheus text
+Created by NaderB - https://www.naderb.org
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from events import decode_event
+
+# Phases of a download job, in the order they happen:
+#   spawn          backend process created
+#   ready          first output from the backend
+#   info           video information resolved
+#   first_byte     first media bytes received
+#   downloaded     all media downloaded
+#   postprocessed  merge, conversion and tagging finished
+PHASES = ('spawn', 'ready', 'info', 'first_byte', 'downloaded', 'postprocessed')
+
+# Finished jobs kept in memory for percentiles
+MAX_RECORDS = 1000
+
+PERCENTILES = (50, 90, 99)
+
+
+class JobTimer:
+    """Record when each phase of one download job was reached
+
+    The backend may announce phases with {"type": "phase", "phase": NAME}
+    and retries with {"type": "retry"}. Phases it does not announce are
+    inferred from its progress events where possible.
+    """
+
+    def __init__(self, url, job_id=None):
+        self.url = url
+        self.job_id = job_id
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self._start = time.monotonic()
+        self.phases = {}
+        self.bytes = 0
+        self.retries = 0
+
+    def mark(self, phase):
+        """Record the first time a phase is reached"""
+        if phase in PHASES and phase not in self.phases:
+            self.phases[phase] = round(time.monotonic() - self._start, 3)
+
+    def observe(self, line):
+        """Update the timer from one backend output line"""
+        self.observe_event(decode_event(line))
+
+    def observe_event(self, data):
+        """Update the timer from one decoded backend event"""
+        self.mark('ready')
+        kind = data['type']
+        if kind == 'phase':
+            self.mark(data.get('phase'))
+        elif kind == 'retry':
+            self.retries += 1
+        elif kind == 'progress':
+            # Progress means the video was resolved and bytes are flowing
+            self.mark('info')
+            downloaded = data.get('downloaded_bytes') or 0
+            percent = data.get('percent') or 0
+            if downloaded or percent > 0:
+                self.mark('first_byte')
+            self.bytes = max(self.bytes, downloaded)
+            if percent >= 100:
+                self.mark('downloaded')
+
+    def finish(self, success):
+        """Close the timer and get its metrics record"""
+        if success:
+            self.mark('downloaded')
+            self.mark('postprocessed')
+        return {
+            'job_id': self.job_id,
+            'url': self.url,
+            'started': self.started,
+            'success': success,
+            'total_seconds': round(time.monotonic() - self._start, 3),
+            'phases': self.phases,
+            'bytes': self.bytes,
+            'retries': self.retries
+        }
+
+
+def phase_durations(record):
+    """Seconds spent reaching each recorded phase from the one before it"""
+    durations = {}
+    previous = 0.0
+    for phase in PHASES:
+        if phase in record['phases']:
+            reached = record['phases'][phase]
+            durations[phase] = max(0.0, reached - previous)
+            previous = reached
+    return durations
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class MetricsRecorder:
+    """Keep finished job metrics in memory and append them to a JSON-lines file"""
+
+    def __init__(self, path=None, max_records=MAX_RECORDS):
+        self.path = str(path) if path else None
+        self.records = deque(maxlen=max_records)
+        self.jobs = {'success': 0, 'failed': 0}
+        self.total_bytes = 0
+        self.total_retries = 0
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        """Add a finished job's record"""
+        with self._lock:
+            self.records.append(record)
+            self.jobs['success' if record['success'] else 'failed'] += 1
+            self.total_bytes += record['bytes']
+            self.total_retries += record['retries']
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record) + "\n")
+                except OSError:
+                    # Metrics must never break a download
+                    pass
+
+    def phase_stats(self, percentiles=PERCENTILES):
+        """Get count, sum and percentiles of each phase's duration
+
+        Returns {phase: {'count': n, 'sum': seconds, 50: p50, ...}}.
+        """
+        with self._lock:
+            records = list(self.records)
+        samples = {phase: [] for phase in PHASES}
+        for record in records:
+            for phase, seconds in phase_durations(record).items():
+                samples[phase].append(seconds)
+
+        stats = {}
+        for phase, values in samples.items():
+            values.sort()
+            stats[phase] = {'count': len(values), 'sum': sum(values)}
+            for percent in percentiles:
+                stats[phase][percent] = percentile(values, percent)
+        return stats
+
+    def prometheus_text(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP kartoshka_job_phase_seconds Time taken to reach each download phase",
+            "# TYPE kartoshka_job_phase_seconds summary"
+        ]
+        for phase, stats in self.phase_stats().items():
+            for percent in PERCENTILES:
+                if stats[percent] is not None:
+                    lines.append(f'kartoshka_job_phase_seconds{{phase="{phase}",quantile="{percent / 100:g}"}} '
+                                 f'{stats[percent]}')
+            lines.append(f'kartoshka_job_phase_seconds_sum{{phase="{phase}"}} {stats["sum"]:.3f}')
+            lines.append(f'kartoshka_job_phase_seconds_count{{phase="{phase}"}} {stats["count"]}')
+
+        with self._lock:
+            jobs = dict(self.jobs)
+            total_bytes = self.total_bytes
+            total_retries = self.total_retries
+        lines += [
+            "# HELP kartoshka_jobs_total Finished download jobs",
+            "# TYPE kartoshka_jobs_total counter"
+        ]
+        for result, count in jobs.items():
+            lines.append(f'kartoshka_jobs_total{{result="{result}"}} {count}')
+        lines += [
+            "# HELP kartoshka_downloaded_bytes_total Bytes downloaded by finished jobs",
+            "# TYPE kartoshka_downloaded_bytes_total counter",
+            f"kartoshka_downloaded_bytes_total {total_bytes}",
+            "# HELP kartoshka_retries_total Retries reported by the backend",
+            "# TYPE kartoshka_retries_total counter",
+            f"kartoshka_retries_total {total_retries}"
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def serve_prometheus(recorder, port, host='127.0.0.1'):
+    """Serve /metrics for a recorder on a background thread and return the server"""
+    # Imported here so the GUI does not pay for http.server at startup
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = recorder.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
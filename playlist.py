@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Playlist helpers for Kartoshka Youtuber
+Lazy paging, compact storage and search for large playlists and channels
+Created by NaderB - https://www.naderb.org
+"""
+
+import os
+import sys
+import threading
+import unicodedata
+from array import array
+
+
+class Bitset:
+    """Growable set of flags packed eight to a byte"""
+
+    __slots__ = ('_bits', '_size')
+
+    def __init__(self, size=0, value=False):
+        self._bits = bytearray()
+        self._size = 0
+        self.resize(size, value)
+
+    def __len__(self):
+        return self._size
+
+    def resize(self, size, value=False):
+        """Grow to size flags, setting new flags to value"""
+        old_size = self._size
+        self._size = size
+        needed = (size + 7) // 8
+        if needed > len(self._bits):
+            self._bits.extend(bytes(needed - len(self._bits)))
+        for index in range(old_size, size):
+            self.set(index, value)
+
+    def get(self, index):
+        """Get one flag"""
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    def set(self, index, value=True):
+        """Set or clear one flag"""
+        if value:
+            self._bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def set_all(self, value=True):
+        """Set or clear every flag"""
+        full_bytes = self._size // 8
+        self._bits[:full_bytes] = (b'\xff' if value else b'\x00') * full_bytes
+        for index in range(full_bytes * 8, self._size):
+            self.set(index, value)
+
+    def count(self):
+        """Number of set flags"""
+        return sum(bin(byte).count('1') for byte in self._bits)
+
+    def indexes(self):
+        """Iterate over the indexes of set flags"""
+        for byte_index, byte in enumerate(self._bits):
+            if not byte:
+                continue
+            base = byte_index * 8
+            for bit in range(8):
+                if byte & (1 << bit) and base + bit < self._size:
+                    yield base + bit
+
+
+class PlaylistEntries:
+    """Column storage for playlist entries
+
+    Entries are kept as parallel columns instead of one dict per entry.
+    Uploader names are interned since most entries share a few of them.
+    """
+
+    __slots__ = ('ids', 'urls', 'titles', 'uploaders', 'durations', 'filesizes',
+                 'qualities', 'enriched', '_positions')
+
+    def __init__(self, videos=()):
+        self.ids = []
+        self.urls = []
+        self.titles = []
+        self.uploaders = []
+        self.durations = array('l')
+        self.filesizes = array('q')
+        # Qualities are only known for enriched entries, so they are sparse
+        self.qualities = {}
+        self.enriched = Bitset()
+        self._positions = {}
+        self.extend(videos)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, video):
+        """Add one entry from a backend video dict"""
+        self._positions[video.get('id')] = len(self.ids)
+        self.ids.append(video.get('id'))
+        self.urls.append(video.get('url'))
+        self.titles.append(video.get('title') or 'Unknown')
+        self.uploaders.append(sys.intern(video.get('uploader') or 'Unknown'))
+        self.durations.append(int(video.get('duration') or 0))
+        self.filesizes.append(int(video.get('filesize') or 0))
+        self.enriched.resize(len(self.ids))
+
+    def extend(self, videos):
+        """Add entries from backend video dicts"""
+        for video in videos:
+            self.append(video)
+
+    def index_of(self, video_id):
+        """Get the index of an entry by ID, or None"""
+        return self._positions.get(video_id)
+
+    def entry(self, index):
+        """Build a dict for one entry, for display"""
+        return {
+            'id': self.ids[index],
+            'url': self.urls[index],
+            'title': self.titles[index],
+            'uploader': self.uploaders[index],
+            'duration': self.durations[index],
+            'filesize': self.filesizes[index],
+            'qualities': self.qualities.get(index, ())
+        }
+
+    def update(self, index, info):
+        """Merge full backend info into an entry"""
+        if info.get('title'):
+            self.titles[index] = info['title']
+        if info.get('uploader'):
+            self.uploaders[index] = sys.intern(info['uploader'])
+        if info.get('duration'):
+            self.durations[index] = int(info['duration'])
+        if info.get('filesize'):
+            self.filesizes[index] = int(info['filesize'])
+        if info.get('qualities'):
+            self.qualities[index] = tuple(info['qualities'])
+        self.enriched.set(index)
+
+
+def normalize_text(text):
+    """Fold case and strip accents, so "Café" and "CAFE" compare equal"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def title_key(text):
+    """Reduce a title to its letters and digits, to compare it with file names"""
+    return ''.join(char for char in normalize_text(text) if char.isalnum())
+
+
+def downloaded_keys(folder):
+    """Get the title keys of the files in a download folder
+
+    Downloads are named after their titles, with characters that are not
+    allowed in file names replaced, so titles and file names are compared
+    on their letters and digits only.
+    """
+    keys = set()
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    keys.add(title_key(os.path.splitext(entry.name)[0]))
+    except OSError:
+        pass
+    keys.discard('')
+    return keys
+
+
+class PlaylistIndex:
+    """Search index over PlaylistEntries
+
+    Titles and uploaders are normalized once when entries are indexed, so a
+    search is only substring checks on precomputed strings. Call sync()
+    after entries are added and refresh(index) after one is updated.
+    """
+
+    def __init__(self, entries, downloaded=None):
+        self.entries = entries
+        self.titles = []
+        self.uploaders = []
+        self.title_keys = []
+        self.downloaded = Bitset()
+        self.downloaded_keys = set(downloaded or ())
+        # Bumped on every change, so cached results know when they are stale
+        self.version = 0
+        self._last = None
+        self.sync()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def sync(self):
+        """Index entries added since the last call and return their indexes"""
+        start = len(self.titles)
+        for index in range(start, len(self.entries)):
+            self.titles.append(None)
+            self.uploaders.append(None)
+            self.title_keys.append(None)
+            self.downloaded.resize(index + 1)
+            self.refresh(index)
+        return range(start, len(self.titles))
+
+    def refresh(self, index):
+        """Re-index one entry after its title or uploader changed"""
+        title = normalize_text(self.entries.titles[index])
+        self.titles[index] = title
+        self.uploaders[index] = sys.intern(normalize_text(self.entries.uploaders[index]))
+        self.title_keys[index] = ''.join(char for char in title if char.isalnum())
+        self.downloaded.set(index, self.title_keys[index] in self.downloaded_keys)
+        self.version += 1
+
+    def set_downloaded(self, keys):
+        """Mark the entries whose title matches a downloaded file's key"""
+        self.downloaded_keys = set(keys)
+        for index, key in enumerate(self.title_keys):
+            self.downloaded.set(index, key in self.downloaded_keys)
+        self.version += 1
+
+    def uploader_names(self):
+        """Get the distinct uploader names, for a filter list"""
+        return sorted(set(self.entries.uploaders[:len(self.titles)]), key=normalize_text)
+
+    def search(self, query='', uploader=None, min_duration=None, max_duration=None,
+               hide_downloaded=False, within=None):
+        """Get the indexes of entries matching every given filter, in order
+
+        Every word of query must appear in the title. Durations are in
+        seconds; entries of unknown duration never match a duration range.
+        within limits the search to some indexes. Typing more of a query
+        only narrows the last result, so it is searched instead of
+        everything.
+        """
+        words = normalize_text(query).split()
+        uploader = normalize_text(uploader) if uploader else None
+        filters = (uploader, min_duration, max_duration, hide_downloaded, self.version)
+        full_search = within is None
+        if full_search and self._last is not None:
+            last_words, last_filters, last_result = self._last
+            # Each earlier word inside a current one means every match now also matched then
+            if last_filters == filters and all(any(last in word for word in words) for last in last_words):
+                within = last_result
+
+        indexes = range(len(self.titles)) if within is None else within
+        titles, uploaders, durations = self.titles, self.uploaders, self.entries.durations
+        result = []
+        for index in indexes:
+            title = titles[index]
+            if words and not all(word in title for word in words):
+                continue
+            if uploader is not None and uploaders[index] != uploader:
+                continue
+            if min_duration is not None or max_duration is not None:
+                duration = durations[index]
+                if duration <= 0 or (min_duration is not None and duration < min_duration) \
+                        or (max_duration is not None and duration > max_duration):
+                    continue
+            if hide_downloaded and self.downloaded.get(index):
+                continue
+            result.append(index)
+        if full_search:
+            self._last = (words, filters, result)
+        return result
+
+
+def items_range(start, end):
+    """Format a 1-based inclusive item range for the backend --items option"""
+    return f"{start}-{end}"
+
+
+class PlaylistPager:
+    """Fetch playlist entries one page at a time and keep fetched pages
+
+    fetch_page(items) is called with an item range like "51-100" and must
+    return the backend info response for that range. When a PlaylistEntries
+    store is given, fetched entries are added to it and pages hold ranges of
+    indexes into it instead of the backend dicts.
+    """
+
+    def __init__(self, fetch_page, page_size=50, entries=None):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.entries = entries
+        self.pages = {}
+        self.total = None
+        self.exhausted = False
+        self._lock = threading.Lock()
+
+    def page_items(self, page):
+        """Get the item range covered by a page"""
+        start = page * self.page_size + 1
+        return items_range(start, start + self.page_size - 1)
+
+    def add_page(self, page, info):
+        """Store a fetched page and update the known total"""
+        videos = info.get('videos', [])
+        with self._lock:
+            if self.entries is not None:
+                start = len(self.entries)
+                self.entries.extend(videos)
+                self.pages[page] = range(start, len(self.entries))
+            else:
+                self.pages[page] = videos
+            if info.get('playlist_count'):
+                self.total = info['playlist_count']
+            if info.get('has_more') is False or len(videos) < self.page_size:
+                self.exhausted = True
+            elif self.total is not None and self.fetched_count() >= self.total:
+                self.exhausted = True
+        return self.pages[page]
+
+    def get_page(self, page):
+        """Get a page of entries, fetching it if it is not cached"""
+        with self._lock:
+            if page in self.pages:
+                return self.pages[page]
+        return self.add_page(page, self.fetch_page(self.page_items(page)))
+
+    @property
+    def next_page(self):
+        """Index of the first page that has not been fetched"""
+        with self._lock:
+            return len(self.pages)
+
+    def fetched_count(self):
+        """Number of entries fetched so far"""
+        return sum(len(page) for page in self.pages.values())
+
+    def has_more(self):
+        """Whether more pages may be available"""
+        return not self.exhausted
+
+    def iter_entries(self, start_page=0):
+        """Iterate over all entries from start_page on, fetching pages as they are needed"""
+        page = start_page
+        while True:
+            videos = self.get_page(page)
+            for video in videos:
+                yield video
+            if self.exhausted and page >= self.next_page - 1:
+                return
+            page += 1
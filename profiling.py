@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Profiling hooks for Kartoshka Youtuber
+Opt-in cProfile and tracemalloc capture for the GUI, the CLI and backend commands
+Created by NaderB - https://www.naderb.org
+"""
+
+import cProfile
+import os
+import re
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from backend_client import get_app_dir
+
+# Set to 1 to profile; inherited by backend processes the GUI and CLI start
+PROFILE_ENV = "KARTOSHKA_PROFILE"
+
+# Optional folder for profiles, default "profiles" next to the app
+PROFILE_DIR_ENV = "KARTOSHKA_PROFILE_DIR"
+
+# Allocation sites listed in each memory snapshot
+TOP_ALLOCATIONS = 30
+
+# Stack depth tracemalloc keeps per allocation
+TRACE_FRAMES = 10
+
+
+def profiling_enabled(flag=False):
+    """Profiling is on with a --profile flag or KARTOSHKA_PROFILE=1"""
+    return flag or os.environ.get(PROFILE_ENV) == '1'
+
+
+def profile_dir():
+    """Get the folder profiles are written to"""
+    return Path(os.environ.get(PROFILE_DIR_ENV) or get_app_dir() / "profiles")
+
+
+def profile_name(command, url=None):
+    """Build a file name stem tagged with the time, command and URL"""
+    stem = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{command}"
+    if url:
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', re.sub(r'^\w+://(www\.)?', '', url)).strip('_')
+        stem += f"-{slug[:60]}"
+    return stem
+
+
+def write_allocations(snapshot, path, peak, header):
+    """Write the top allocation sites of a tracemalloc snapshot as text"""
+    stats = snapshot.statistics('lineno')
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{header}\n")
+        f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MB\n\n")
+        for stat in stats[:TOP_ALLOCATIONS]:
+            f.write(f"{stat}\n")
+
+
+@contextmanager
+def profile_session(command, url=None, enabled=True):
+    """Profile the block with cProfile and tracemalloc
+
+    Writes <stem>.prof (open with pstats or snakeviz) and <stem>.alloc.txt
+    with the top allocation sites to the profiles folder. Does nothing when
+    enabled is false, so callers can wrap their work unconditionally.
+    """
+    if not enabled:
+        yield None
+        return
+
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = directory / profile_name(command, url)
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield stem
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        profiler.dump_stats(f"{stem}.prof")
+        write_allocations(snapshot, f"{stem}.alloc.txt", peak, f"{command} {url or ''}".strip())
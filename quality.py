@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Quality selection helpers for Kartoshka Youtuber
+Picks formats for size and bitrate budgets and audio-only outputs
+Created by NaderB - https://www.naderb.org
+"""
+
+
+def has_video(fmt):
+    """Check whether a format carries video"""
+    vcodec = fmt.get('vcodec')
+    if vcodec:
+        return vcodec != 'none'
+    return bool(fmt.get('height')) or fmt.get('resolution', 'audio only') != 'audio only'
+
+
+def has_audio(fmt):
+    """Check whether a format carries audio"""
+    acodec = fmt.get('acodec')
+    if acodec:
+        return acodec != 'none'
+    return not has_video(fmt)
+
+
+def format_height(fmt):
+    """Get the video height of a format, or 0"""
+    if fmt.get('height'):
+        return int(fmt['height'])
+    resolution = fmt.get('resolution') or ''
+    if 'x' in resolution and resolution.split('x')[1].isdigit():
+        return int(resolution.split('x')[1])
+    return 0
+
+
+def format_bitrate(fmt, duration=None):
+    """Get the estimated bitrate of a format in kbit/s, or 0"""
+    for key in ('tbr', 'vbr', 'abr'):
+        if fmt.get(key):
+            return float(fmt[key])
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size and duration:
+        return size * 8 / duration / 1000
+    return 0
+
+
+def format_size(fmt, duration=None):
+    """Get the estimated size of a format in bytes, or 0"""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return int(size)
+    bitrate = format_bitrate(fmt, duration)
+    if bitrate and duration:
+        return int(bitrate * 1000 / 8 * duration)
+    return 0
+
+
+def quality_height_cap(quality):
+    """Get the height limit implied by a quality setting like 720p or 1280x720"""
+    quality = (quality or '').lower()
+    if quality.endswith('p') and quality[:-1].isdigit():
+        return int(quality[:-1])
+    if 'x' in quality and quality.split('x')[1].isdigit():
+        return int(quality.split('x')[1])
+    return None
+
+
+def candidate_combinations(formats, duration=None, max_height=None):
+    """List (format_spec, height, bitrate, size) for every usable combination"""
+    muxed = []
+    video_only = []
+    audio_only = []
+    for fmt in formats:
+        if not fmt.get('format_id'):
+            continue
+        video, audio = has_video(fmt), has_audio(fmt)
+        if video and max_height and format_height(fmt) > max_height:
+            continue
+        if video and audio:
+            muxed.append(fmt)
+        elif video:
+            video_only.append(fmt)
+        elif audio:
+            audio_only.append(fmt)
+
+    combinations = []
+    for fmt in muxed:
+        combinations.append((fmt['format_id'], format_height(fmt),
+                             format_bitrate(fmt, duration), format_size(fmt, duration)))
+    for video in video_only:
+        for audio in audio_only:
+            combinations.append((f"{video['format_id']}+{audio['format_id']}", format_height(video),
+                                 format_bitrate(video, duration) + format_bitrate(audio, duration),
+                                 format_size(video, duration) + format_size(audio, duration)))
+    return combinations
+
+
+def pick_for_budget(formats, duration=None, max_size=None, max_bitrate=None, max_height=None):
+    """Pick the best video+audio combination that fits a budget
+
+    max_size is in bytes and max_bitrate in kbit/s. Combinations whose size
+    or bitrate cannot be estimated are skipped when that limit is set.
+    Returns a dict with format, height, bitrate and size, or None.
+    """
+    best = None
+    for spec, height, bitrate, size in candidate_combinations(formats, duration, max_height):
+        if max_size and (not size or size > max_size):
+            continue
+        if max_bitrate and (not bitrate or bitrate > max_bitrate):
+            continue
+        # Prefer higher resolution, then higher bitrate, then the smaller file
+        key = (height, bitrate, -size)
+        if best is None or key > best[0]:
+            best = (key, {'format': spec, 'height': height, 'bitrate': bitrate, 'size': size})
+    return best[1] if best else None
+
+
+def split_budget(durations, total_size):
+    """Split a total size budget between videos in proportion to their durations
+
+    Videos with an unknown duration count as the average known duration.
+    """
+    known = [d for d in durations if d]
+    average = sum(known) / len(known) if known else 1
+    weights = [d or average for d in durations]
+    total_weight = sum(weights)
+    if not total_weight:
+        return [0 for _ in durations]
+    return [int(total_size * w / total_weight) for w in weights]
+
+
+# Audio outputs that keep the downloaded stream as-is, mapped to the
+# extension and codec of the audio-only format they copy
+STREAM_COPY_AUDIO = {
+    'm4a': ('m4a', 'mp4a'),
+    'opus': ('webm', 'opus'),
+}
+
+# Lowest source bitrate worth converting to mp3, in kbit/s
+MIN_MP3_SOURCE_BITRATE = 96
+
+
+def audio_only_formats(formats):
+    """Get the formats that carry audio and no video"""
+    return [fmt for fmt in formats if fmt.get('format_id') and has_audio(fmt) and not has_video(fmt)]
+
+
+def pick_audio_format(formats, output_format, duration=None):
+    """Pick the audio-only format to download for an audio output
+
+    m4a and opus take the best stream that can be copied into that
+    container without re-encoding. mp3 takes the smallest audio-only
+    stream that is still good enough to convert, and never a muxed video.
+    Returns the format dict, or None when no audio-only format fits.
+    """
+    candidates = audio_only_formats(formats)
+    if not candidates:
+        return None
+
+    if output_format in STREAM_COPY_AUDIO:
+        ext, codec = STREAM_COPY_AUDIO[output_format]
+        copyable = [fmt for fmt in candidates
+                    if (fmt.get('acodec') or '').startswith(codec)
+                    or (not fmt.get('acodec') and fmt.get('ext') == ext)]
+        if not copyable:
+            return None
+        return max(copyable, key=lambda fmt: format_bitrate(fmt, duration))
+
+    suitable = [fmt for fmt in candidates
+                if format_bitrate(fmt, duration) >= MIN_MP3_SOURCE_BITRATE] or candidates
+    return min(suitable, key=lambda fmt: (format_size(fmt, duration) or float('inf'),
+                                          format_bitrate(fmt, duration)))
+
+
+def estimate_download_size(info, quality='best', output_format='mp4', max_size=None, max_bitrate=None):
+    """Estimate how many bytes a download of this video will take, or 0"""
+    formats = info.get('formats') or []
+    duration = info.get('duration')
+    if output_format in ('mp3',) + tuple(STREAM_COPY_AUDIO):
+        fmt = pick_audio_format(formats, output_format, duration)
+        return format_size(fmt, duration) if fmt else 0
+
+    pick = pick_for_budget(formats, duration, max_size, max_bitrate, quality_height_cap(quality))
+    if pick and pick['size']:
+        return pick['size']
+    sizes = [format_size(fmt, duration) for fmt in formats]
+    return max(sizes) if sizes else 0
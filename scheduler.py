@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Download scheduler for Kartoshka Youtuber
+Runs queued downloads on a worker pool with free-space admission control
+Created by NaderB - https://www.naderb.org
+"""
+
+import itertools
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from backend_client import download_video
+from metrics import JobTimer
+from tagging import tag_audio_file
+
+# Space always left free on the destination volume
+MIN_FREE_BYTES = 512 * 1024 * 1024
+
+# Reservation used when a job's size cannot be estimated
+UNKNOWN_SIZE = 512 * 1024 * 1024
+
+# How often held jobs re-check free space that was freed outside the app
+SPACE_RECHECK_SECONDS = 30
+
+AUDIO_OUTPUTS = ('mp3', 'm4a', 'opus')
+
+# Finished jobs kept for listing; older ones are dropped as new jobs arrive
+KEEP_FINISHED_JOBS = 1000
+
+
+def headroom_factor(file_format):
+    """Space needed per estimated byte, including temp files
+
+    Video+audio merges keep both parts next to the merged output until the
+    merge finishes, so they need about twice the final size.
+    """
+    return 1.1 if file_format in AUDIO_OUTPUTS else 2.0
+
+
+def format_bytes(size):
+    """Format a byte count for display"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+_job_ids = itertools.count(1)
+
+
+def next_job_id():
+    """Get a job ID unique within this process, for tagging backend events"""
+    return next(_job_ids)
+
+
+class Job:
+    """One queued download"""
+
+    def __init__(self, url, quality='best', file_format='mp4', path='.', extra_args=None,
+                 title=None, estimated_size=None, schedule=None, tags=None):
+        self.id = next_job_id()
+        self.url = url
+        self.quality = quality
+        self.file_format = file_format
+        self.path = path
+        self.extra_args = list(extra_args or [])
+        self.title = title or url
+        self.estimated_size = estimated_size
+        # A time_windows.DownloadSchedule overriding the scheduler's
+        self.schedule = schedule
+        # Audio tags (tagging.build_tags) written once an audio job finishes
+        self.tags = tags
+        self.rate_limit = None
+        self.resumable = False
+        self.status = 'queued'
+        self.reserved = 0
+        self.progress = {}
+        self.error = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+
+class JobProcesses(set):
+    """Backend processes of one running job
+
+    A process added after its job was cancelled or suspended is killed at
+    once, so a cancel that lands while the backend is starting cannot miss it.
+    """
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def add(self, process):
+        super().add(process)
+        if self.job.status in ('cancelled', 'suspended'):
+            process.kill()
+
+
+class SpaceReservations:
+    """Track space promised to running jobs on each volume"""
+
+    def __init__(self, min_free=MIN_FREE_BYTES):
+        self.min_free = min_free
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def volume(self, path):
+        """Get an identifier for the volume holding path"""
+        os.makedirs(path, exist_ok=True)
+        return os.stat(path).st_dev
+
+    def outstanding(self, volume):
+        """Reserved bytes on a volume that have not been written yet"""
+        return sum(max(0, reserved - written) for vol, reserved, written in self._jobs.values()
+                   if vol == volume)
+
+    def available(self, path):
+        """Bytes that can still be promised on the volume holding path"""
+        volume = self.volume(path)
+        with self._lock:
+            return shutil.disk_usage(path).free - self.outstanding(volume) - self.min_free
+
+    def try_reserve(self, job_id, path, size):
+        """Reserve size bytes for a job if they fit"""
+        volume = self.volume(path)
+        with self._lock:
+            free = shutil.disk_usage(path).free - self.outstanding(volume) - self.min_free
+            if size > free:
+                return False
+            self._jobs[job_id] = (volume, size, 0)
+            return True
+
+    def update_written(self, job_id, written):
+        """Record how much a job has written, shrinking what it still holds"""
+        with self._lock:
+            if job_id in self._jobs:
+                volume, reserved, _ = self._jobs[job_id]
+                self._jobs[job_id] = (volume, reserved, written)
+
+    def release(self, job_id):
+        """Free a job's reservation"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def summary(self, path):
+        """Get (outstanding reserved bytes, free bytes) for the volume holding path"""
+        volume = self.volume(path)
+        with self._lock:
+            return self.outstanding(volume), shutil.disk_usage(path).free
+
+
+class DownloadScheduler:
+    """Run jobs on a bounded worker pool, admitting them only when they fit on disk
+
+    resolve_size(job) is called on a helper thread for jobs submitted
+    without a size estimate and should return the expected bytes or 0.
+    Alternatively resolve_sizes(jobs, on_size) gets each submitted batch at
+    once and calls on_size(job, size) as each size becomes known.
+    Finished jobs are timed into metrics, a metrics.MetricsRecorder, if given.
+    schedule, a time_windows.DownloadSchedule, limits when jobs run and how
+    fast; a job's own schedule replaces it. Running jobs are suspended when
+    their window closes or their rate changes and continue from their
+    partial files when it opens again.
+    on_update(job) is called from worker threads whenever a job changes,
+    sometimes with the scheduler lock held, so it must only hand the job
+    off (for example with root.after) and not call back into the scheduler.
+    Listeners added with add_listener are called the same way.
+    Only the keep_finished most recently submitted finished jobs are kept.
+    """
+
+    def __init__(self, backend_path, max_workers=2, reservations=None, resolve_size=None, on_update=None,
+                 metrics=None, resolve_sizes=None, schedule=None, clock=datetime.now,
+                 keep_finished=KEEP_FINISHED_JOBS):
+        self.backend_path = backend_path
+        self.max_workers = max_workers
+        self.reservations = reservations or SpaceReservations()
+        self.resolve_size = resolve_size
+        self.resolve_sizes = resolve_sizes
+        self.on_update = on_update
+        self.listeners = []
+        self.metrics = metrics
+        self.schedule = schedule
+        self.clock = clock
+        self.keep_finished = keep_finished
+        self.jobs = {}
+        self._running = 0
+        self._processes = {}
+        self._closed = False
+        self._cond = threading.Condition()
+        self._resolver = ThreadPoolExecutor(max_workers=2)
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, job):
+        """Queue a job"""
+        return self.submit_many([job])[0]
+
+    def submit_many(self, jobs):
+        """Queue several jobs, estimating their sizes as one batch"""
+        with self._cond:
+            self._prune_finished()
+            pending = []
+            for job in jobs:
+                self.jobs[job.id] = job
+                if job.estimated_size is None and (self.resolve_sizes or self.resolve_size):
+                    job.status = 'estimating'
+                    pending.append(job)
+            if pending and self.resolve_sizes is not None:
+                self._resolver.submit(self._resolve_batch, pending)
+            else:
+                for job in pending:
+                    self._resolver.submit(self._resolve, job)
+            self._cond.notify_all()
+        for job in jobs:
+            self._notify(job)
+        return jobs
+
+    def _prune_finished(self):
+        """Drop the oldest finished jobs past keep_finished (called with the lock held)"""
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job.finished and job_id not in self._processes]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job_id]
+
+    def set_schedule(self, schedule):
+        """Replace the queue-wide schedule, applying it to running jobs at once"""
+        with self._cond:
+            self.schedule = schedule
+            self._cond.notify_all()
+
+    def wait(self, job, timeout=None):
+        """Block until a job finishes, returning False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: job.finished, timeout)
+
+    def add_listener(self, listener):
+        """Also call listener(job) whenever a job changes"""
+        self.listeners = self.listeners + [listener]
+
+    def remove_listener(self, listener):
+        self.listeners = [other for other in self.listeners if other is not listener]
+
+    def list_jobs(self):
+        """Get every job in submission order"""
+        with self._cond:
+            return list(self.jobs.values())
+
+    def queued_count(self):
+        """Jobs waiting for a worker"""
+        with self._cond:
+            return sum(1 for job in self.jobs.values()
+                       if job.status in ('queued', 'estimating', 'waiting_space', 'scheduled'))
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job"""
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.status = 'cancelled'
+            processes = list(self._processes.get(job_id, ()))
+            self._cond.notify_all()
+        for process in processes:
+            try:
+                process.kill()
+            except OSError:
+                pass
+        self._notify(job)
+        return True
+
+    def shutdown(self):
+        """Stop dispatching and cancel everything that is still pending"""
+        with self._cond:
+            self._closed = True
+            pending = [job.id for job in self.jobs.values() if not job.finished]
+            self._cond.notify_all()
+        for job_id in pending:
+            self.cancel(job_id)
+        self._resolver.shutdown(wait=False)
+
+    def _notify(self, job):
+        if self.on_update is not None:
+            self.on_update(job)
+        # Replaced rather than mutated, so iterating needs no lock
+        for listener in self.listeners:
+            listener(job)
+
+    def _resolve(self, job):
+        try:
+            size = self.resolve_size(job)
+        except Exception:
+            size = 0
+        self._set_size(job, size)
+
+    def _resolve_batch(self, jobs):
+        try:
+            self.resolve_sizes(jobs, self._set_size)
+        except Exception:
+            pass
+        # Anything left unresolved is admitted with the default reservation
+        for job in jobs:
+            if job.estimated_size is None:
+                self._set_size(job, 0)
+
+    def _set_size(self, job, size):
+        with self._cond:
+            job.estimated_size = size or 0
+            if job.status == 'estimating':
+                job.status = 'queued'
+            self._cond.notify_all()
+        self._notify(job)
+
+    def _dispatch_loop(self):
+        with self._cond:
+            while not self._closed:
+                now = self.clock()
+                wake_at = self._apply_schedules(now)
+                holding = self._admit(now)
+                # Jobs held for space are re-checked now and then in case space
+                # was freed outside the app, and schedules at their next
+                # boundary; otherwise sleep until woken
+                timeout = SPACE_RECHECK_SECONDS if holding else None
+                if wake_at is not None:
+                    # A second late, so the boundary has certainly passed
+                    until_boundary = (wake_at - now).total_seconds() + 1
+                    timeout = until_boundary if timeout is None else min(timeout, until_boundary)
+                self._cond.wait(timeout)
+
+    def _job_schedule(self, job):
+        return job.schedule or self.schedule
+
+    def _job_rate(self, schedule, now):
+        """Each running job's share of the schedule's rate limit"""
+        rate = schedule.rate_limit(now) if schedule else None
+        return max(1, rate // max(1, self.max_workers)) if rate else None
+
+    def _apply_schedules(self, now):
+        """Suspend running jobs outside their window or rate (called with the lock held)
+
+        Returns when the next schedule in use changes, or None.
+        """
+        wake_at = None
+        for job in self.jobs.values():
+            schedule = self._job_schedule(job)
+            if job.finished or not schedule:
+                continue
+            change = schedule.next_change(now)
+            if change is not None and (wake_at is None or change < wake_at):
+                wake_at = change
+            if job.status == 'running' and (not schedule.allows(now) or
+                                            job.rate_limit != self._job_rate(schedule, now)):
+                # Restarted with --resume from its partial files once admitted again
+                job.status = 'suspended'
+                for process in list(self._processes.get(job.id, ())):
+                    try:
+                        process.kill()
+                    except OSError:
+                        pass
+                self._notify(job)
+        return wake_at
+
+    def _admit(self, now):
+        """Start every queued job that fits and is inside its window (called with the lock held)"""
+        holding = False
+        for job in list(self.jobs.values()):
+            if self._running >= self.max_workers:
+                break
+            if job.status not in ('queued', 'waiting_space', 'scheduled'):
+                continue
+            schedule = self._job_schedule(job)
+            if schedule and not schedule.allows(now):
+                if job.status != 'scheduled':
+                    job.status = 'scheduled'
+                    self._notify(job)
+                continue
+            size = int((job.estimated_size or UNKNOWN_SIZE) * headroom_factor(job.file_format))
+            if self.reservations.try_reserve(job.id, job.path, size):
+                job.reserved = size
+                job.rate_limit = self._job_rate(schedule, now)
+                job.status = 'running'
+                self._running += 1
+                # Registered before the thread starts so cancel() always finds it
+                self._processes[job.id] = JobProcesses(job)
+                threading.Thread(target=self._run, args=(job,), daemon=True).start()
+            else:
+                # Smaller jobs further back may still fit, so keep looking
+                holding = True
+                if job.status != 'waiting_space':
+                    job.status = 'waiting_space'
+                    self._notify(job)
+        return holding
+
+    def _run(self, job):
+        self._notify(job)
+        with self._cond:
+            running = self._processes[job.id]
+
+        files = []
+
+        def on_output(data):
+            if job.status in ('cancelled', 'suspended'):
+                for process in list(running):
+                    process.kill()
+                return
+            if data['type'] == 'done' and data['job'] in (None, job.id):
+                files.extend(data.get('files') or [])
+            if data['type'] != 'progress' or data['job'] not in (None, job.id):
+                return
+            job.progress = data
+            written = data.get('downloaded_bytes')
+            if written is None and job.estimated_size:
+                written = int(job.estimated_size * (data.get('percent') or 0) / 100)
+            self.reservations.update_written(job.id, written or 0)
+            self._notify(job)
+
+        extra_args = list(job.extra_args)
+        # Scheduled jobs may be suspended, so they keep their partial files,
+        # and continue from them even if the schedule is removed meanwhile
+        job.resumable = job.resumable or bool(self._job_schedule(job))
+        if job.resumable:
+            extra_args.append("--resume")
+        if job.rate_limit:
+            extra_args += ["--limit-rate", str(job.rate_limit)]
+
+        timer = JobTimer(job.url, job.id)
+        try:
+            success, error_output = download_video(self.backend_path, job.url, job.quality, job.file_format,
+                                                   job.path, on_output=on_output, extra_args=extra_args,
+                                                   running=running, timer=timer, job_id=job.id)
+        except Exception as e:
+            success, error_output = False, str(e)
+        if success and job.tags and job.file_format in AUDIO_OUTPUTS:
+            # Tagged here rather than by ffmpeg in the backend, so audio jobs stay I/O bound
+            for name in files:
+                tag_audio_file(os.path.join(job.path, name), job.tags)
+        suspended = job.status == 'suspended' and not success
+        if self.metrics is not None and not suspended:
+            self.metrics.record(timer.finish(success))
+
+        self.reservations.release(job.id)
+        with self._cond:
+            self._processes.pop(job.id, None)
+            self._running -= 1
+            if suspended:
+                # Waits for its window again, or restarts at the new rate
+                job.status = 'queued'
+            elif job.status != 'cancelled':
+                job.status = 'done' if success else 'failed'
+                job.error = None if success else (error_output.strip() or "Unknown error occurred")
+            self._cond.notify_all()
+        self._notify(job)
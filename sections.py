@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Time-range helpers for Kartoshka Youtuber
+Parses section lists like "1:00-3:30, 1:02:00-1:05:00" for partial downloads
+Created by NaderB - https://www.naderb.org
+"""
+
+
+def parse_time(text):
+    """Parse SS, MM:SS or HH:MM:SS into seconds"""
+    parts = text.strip().split(':')
+    if not 1 <= len(parts) <= 3:
+        raise ValueError(f"Invalid time: {text}")
+    seconds = 0.0
+    for part in parts:
+        if not part.strip():
+            raise ValueError(f"Invalid time: {text}")
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_time(seconds):
+    """Format seconds as M:SS or H:MM:SS"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def parse_sections(text):
+    """Parse a comma separated list of START-END ranges
+
+    END may be left out to mean the end of the video. Overlapping ranges
+    are merged and the result is sorted as a list of (start, end) tuples,
+    with end None for open ranges.
+    """
+    sections = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' not in part:
+            raise ValueError(f"Section needs a start and end: {part}")
+        start_text, end_text = part.split('-', 1)
+        start = parse_time(start_text)
+        end = parse_time(end_text) if end_text.strip() else None
+        if end is not None and end <= start:
+            raise ValueError(f"Section ends before it starts: {part}")
+        sections.append((start, end))
+
+    sections.sort(key=lambda section: section[0])
+    merged = []
+    for start, end in sections:
+        if merged:
+            last_start, last_end = merged[-1]
+            if last_end is None or start <= last_end:
+                if last_end is not None and (end is None or end > last_end):
+                    merged[-1] = (last_start, end)
+                continue
+        merged.append((start, end))
+    return merged
+
+
+def sections_arg(sections):
+    """Format sections for the backend --sections option, in seconds"""
+    return ','.join(f"{start:g}-{'' if end is None else f'{end:g}'}" for start, end in sections)
+
+
+def sections_duration(sections, duration=None):
+    """Total seconds covered by the sections, or None if it cannot be known"""
+    total = 0.0
+    for start, end in sections:
+        if end is None:
+            if not duration:
+                return None
+            end = duration
+        if duration:
+            end = min(end, duration)
+        total += max(0.0, end - start)
+    return total
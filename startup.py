@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Startup timeline for Kartoshka Youtuber
+Records how long each stage of GUI startup takes
+Created by NaderB - https://www.naderb.org
+"""
+
+import time
+
+
+class StartupTimeline:
+    """Milliseconds from the start of startup to each named stage"""
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.marks = {}
+
+    def mark(self, stage):
+        """Record that a stage finished now (only the first time)"""
+        if stage not in self.marks:
+            self.marks[stage] = round((time.perf_counter() - self.started) * 1000, 1)
+
+    def report(self):
+        """Format the timeline as one line per stage with its own duration"""
+        lines = []
+        previous = 0.0
+        for stage, at in self.marks.items():
+            lines.append(f"{stage:<12} {at:8.1f} ms  (+{at - previous:.1f} ms)")
+            previous = at
+        return "\n".join(lines)
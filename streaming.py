@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Streaming output for Kartoshka Youtuber
+Relays media bytes from the backend to stdout, a named pipe, a socket or a file
+Created by NaderB - https://www.naderb.org
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+from backend_client import creation_flags, event_args
+from events import decode_event
+from writer import StagedFile
+
+# Bytes copied per read while relaying media
+CHUNK_SIZE = 64 * 1024
+
+
+class SocketSink:
+    """File-like wrapper that writes to a connected socket"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def write(self, data):
+        self.sock.sendall(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class StdoutSink:
+    """File-like wrapper for stdout that leaves it open when closed"""
+
+    def write(self, data):
+        return sys.stdout.buffer.write(data)
+
+    def flush(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        self.flush()
+
+
+def open_sink(spec, buffer_size=None, expected_size=None):
+    """Open a streaming target
+
+    "-" is stdout, "pipe:PATH" a named pipe (created on POSIX if missing),
+    "tcp:HOST:PORT" a TCP consumer and "unix:PATH" a Unix socket consumer.
+    "file:PATH" saves to a writer.StagedFile, which the caller publishes
+    once the stream completes; closing it unpublished removes it. Its
+    space is preallocated when expected_size is known.
+    """
+    if spec == '-':
+        return StdoutSink()
+    if spec.startswith('file:'):
+        return StagedFile(spec[len('file:'):], expected_size=expected_size, buffer_size=buffer_size).open()
+    if spec.startswith('pipe:'):
+        path = spec[len('pipe:'):]
+        if os.name != 'nt' and not os.path.exists(path):
+            os.mkfifo(path)
+        # Opening blocks until the consumer opens the other end
+        return open(path, 'wb', buffering=0)
+    if spec.startswith('tcp:'):
+        host, port = spec[len('tcp:'):].rsplit(':', 1)
+        return SocketSink(socket.create_connection((host, int(port))))
+    if spec.startswith('unix:'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(spec[len('unix:'):])
+        return SocketSink(sock)
+    raise ValueError(f"Unknown stream target: {spec}")
+
+
+def relay(source, sink, chunk_size=CHUNK_SIZE, on_bytes=None):
+    """Copy bytes from source to sink as they arrive and return the total"""
+    total = 0
+    while True:
+        chunk = source.read1(chunk_size) if hasattr(source, 'read1') else source.read(chunk_size)
+        if not chunk:
+            break
+        # Unbuffered sinks such as named pipes may take only part of a chunk
+        remaining = memoryview(chunk)
+        while remaining:
+            remaining = remaining[sink.write(remaining) or 0:]
+        total += len(chunk)
+        if on_bytes:
+            on_bytes(total)
+    sink.flush()
+    return total
+
+
+def stream_download(backend_path, url, quality, file_format, sink, on_event=None, extra_args=None):
+    """Run a backend download that writes media to stdout and relay it to sink
+
+    Media bytes and events travel on separate channels: the backend writes
+    the media to stdout and its JSON events to stderr, which are passed to
+    on_event. Returns (success, bytes_relayed). Wrap sink in an
+    integrity.HashingWriter to hash the stream as it passes through.
+    """
+    cmd = [
+        backend_path,
+        "--command", "download",
+        "--url", url,
+        "--quality", quality,
+        "--format", file_format,
+        "--output", "-"
+    ] + event_args(backend_path)
+    if extra_args:
+        cmd += list(extra_args)
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               bufsize=0, creationflags=creation_flags())
+
+    def read_events():
+        for line in process.stderr:
+            line = line.decode('utf-8', errors='replace').strip()
+            if line and on_event is not None:
+                on_event(decode_event(line))
+
+    events_thread = threading.Thread(target=read_events, daemon=True)
+    events_thread.start()
+
+    try:
+        total = relay(process.stdout, sink)
+    except (BrokenPipeError, ConnectionError):
+        # Consumer went away, so there is no point in downloading the rest
+        process.kill()
+        total = None
+    return_code = process.wait()
+    events_thread.join()
+    return return_code == 0 and total is not None, total or 0
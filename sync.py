@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Incremental channel and playlist sync for Kartoshka Youtuber
+Only fetches uploads that are newer than the last sync
+Created by NaderB - https://www.naderb.org
+"""
+
+import json
+import os
+from datetime import datetime
+
+from backend_client import get_info
+from playlist import PlaylistPager
+
+# Number of recent IDs remembered per newest-first source. Oldest-first
+# sources keep every ID, since a rescan after a reorder checks all of them
+MAX_SEEN_IDS = 500
+
+
+class SyncState:
+    """Per-source watermarks stored in a JSON file"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.sources = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.sources = json.load(f).get('sources', {})
+
+    def get(self, url):
+        """Get the watermark for a source, creating an empty one"""
+        return self.sources.setdefault(url, {
+            'seen_ids': [],
+            'last_upload_date': None,
+            'failed': [],
+            'last_sync': None,
+            'oldest_first': None,
+            'known_count': 0
+        })
+
+    def save(self):
+        """Write the state file, replacing the old one atomically"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({'sources': self.sources}, f, indent=2)
+        os.replace(temp_path, self.path)
+
+
+def is_known(entry, watermark, seen):
+    """Check whether an entry was already seen by a previous sync"""
+    if entry.get('id') in seen:
+        return True
+    upload_date = entry.get('upload_date')
+    last_date = watermark.get('last_upload_date')
+    # Upload dates are YYYYMMDD strings, so they compare in date order
+    return bool(upload_date and last_date and upload_date < last_date)
+
+
+def is_oldest_first(url, entries):
+    """Guess whether a source lists its oldest entries first
+
+    Upload dates decide when the entries carry them. Otherwise playlists
+    are taken to list oldest first, as YouTube playlists do, and channel
+    tabs newest first.
+    """
+    dates = [entry.get('upload_date') for entry in entries if entry.get('upload_date')]
+    if len(dates) >= 2 and dates[0] != dates[-1]:
+        return dates[0] < dates[-1]
+    return 'list=' in url
+
+
+def find_new_entries(entries, watermark):
+    """Walk entries newest-first and stop at the first known one
+
+    Returns (new_entries, scanned_count) with new entries oldest-first.
+    """
+    seen = set(watermark.get('seen_ids', []))
+    new_entries = []
+    scanned = 0
+    for entry in entries:
+        scanned += 1
+        if is_known(entry, watermark, seen):
+            break
+        new_entries.append(entry)
+    new_entries.reverse()
+    return new_entries, scanned
+
+
+def find_appended_entries(pager, watermark):
+    """Scan the end of an oldest-first source for entries not seen before
+
+    New uploads are added at the end, so the scan starts a page before
+    where the previous sync ended. If none of those entries are known the
+    source was reordered or shrank, and all of it is scanned.
+    Returns (new_entries, scanned_count, entry_count).
+    """
+    seen = set(watermark.get('seen_ids', []))
+    start_page = max(0, (watermark.get('known_count') or 0) // pager.page_size - 1)
+    entries = list(pager.iter_entries(start_page))
+    if start_page and not any(entry.get('id') in seen for entry in entries):
+        start_page = 0
+        entries = list(pager.iter_entries())
+    new_entries = [entry for entry in entries if entry.get('id') not in seen]
+    return new_entries, len(entries), start_page * pager.page_size + len(entries)
+
+
+def record_entry(watermark, entry):
+    """Move the watermark past a downloaded entry"""
+    seen_ids = watermark['seen_ids']
+    if entry.get('id') in seen_ids:
+        seen_ids.remove(entry.get('id'))
+    seen_ids.append(entry.get('id'))
+    if not watermark.get('oldest_first'):
+        # Newest-first scans stop at the first known entry, so recent IDs are enough
+        del seen_ids[:-MAX_SEEN_IDS]
+    upload_date = entry.get('upload_date')
+    if upload_date and (not watermark.get('last_upload_date') or upload_date > watermark['last_upload_date']):
+        watermark['last_upload_date'] = upload_date
+
+
+def sync_source(backend_path, url, state, download, page_size=50, mark_only=False, log=print):
+    """Sync one channel or playlist and download only new entries
+
+    download(entry) must return True when the entry was downloaded.
+    Returns a report dict with scanned, new, downloaded and failed counts.
+    """
+    watermark = state.get(url)
+    pager = PlaylistPager(lambda items: get_info(backend_path, url, items=items), page_size)
+    if watermark.get('oldest_first') is None:
+        watermark['oldest_first'] = is_oldest_first(url, pager.get_page(0))
+    if watermark['oldest_first']:
+        new_entries, scanned, entry_count = find_appended_entries(pager, watermark)
+    else:
+        new_entries, scanned = find_new_entries(pager.iter_entries(), watermark)
+        entry_count = None
+
+    # Entries that failed last time are retried before the new ones
+    new_ids = {entry.get('id') for entry in new_entries}
+    retry = [entry for entry in watermark.get('failed', []) if entry.get('id') not in new_ids]
+    queue = retry + new_entries
+    log(f"{url}: scanned {scanned} entries, {len(new_entries)} new, {len(retry)} to retry")
+
+    downloaded = 0
+    failed = []
+    for position, entry in enumerate(queue):
+        if mark_only:
+            record_entry(watermark, entry)
+        elif download(entry):
+            record_entry(watermark, entry)
+            downloaded += 1
+        else:
+            failed.append({'id': entry.get('id'), 'url': entry.get('url'),
+                           'title': entry.get('title'), 'upload_date': entry.get('upload_date')})
+        # Save after every download so an interrupted run keeps its progress
+        watermark['failed'] = failed + retry[position + 1:]
+        if not mark_only:
+            state.save()
+
+    watermark['failed'] = failed
+    watermark['last_sync'] = datetime.now().isoformat(timespec='seconds')
+    if entry_count is not None:
+        # Only moved once every entry was handled, so an interrupted run rescans them
+        watermark['known_count'] = entry_count
+    state.save()
+
+    return {
+        'url': url,
+        'scanned': scanned,
+        'new': len(new_entries),
+        'downloaded': downloaded,
+        'failed': len(failed)
+    }
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Audio tagging for Kartoshka Youtuber
+Writes title/artist/album tags in-process with mutagen instead of ffmpeg
+Created by NaderB - https://www.naderb.org
+"""
+
+import os
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+# Extensions of the audio files the backend writes for the audio formats
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.opus', '.webm', '.ogg')
+
+
+def build_tags(info, playlist_title=None, track_number=None):
+    """Build the tag values for a downloaded video"""
+    tags = {}
+    if info.get('title'):
+        tags['title'] = info['title']
+    if info.get('uploader') and info['uploader'] != 'Unknown':
+        tags['artist'] = info['uploader']
+    if playlist_title:
+        tags['album'] = playlist_title
+    upload_date = info.get('upload_date')
+    if upload_date and len(upload_date) >= 4:
+        tags['date'] = upload_date[:4]
+    if track_number:
+        tags['tracknumber'] = str(track_number)
+    return tags
+
+
+def tag_audio_file(path, tags):
+    """Write tags built by build_tags to an mp3, m4a or opus file
+
+    Returns True when the tags were written. Files mutagen cannot open and
+    a missing mutagen install are reported as False rather than raised.
+    """
+    if mutagen is None or not tags:
+        return False
+    if not path.lower().endswith(AUDIO_EXTENSIONS) or not os.path.isfile(path):
+        return False
+
+    try:
+        audio = mutagen.File(path, easy=True)
+        if audio is None:
+            return False
+        if audio.tags is None:
+            audio.add_tags()
+        for key, value in tags.items():
+            audio[key] = value
+        audio.save()
+    except Exception:
+        return False
+    return True
@@ -93,6 +93,1162 @@ def test_gui_import():
         print(f"   [ERROR] Error importing GUI: {e}")
         return False
 
+def test_metadata_cache():
+    """Test the metadata cache"""
+    print("Testing metadata cache...")
+    
+    from metadata_cache import MetadataCache, cache_key, first_page_items, info_cache_url, is_complete_url
+    
+    if cache_key("https://youtu.be/dQw4w9WgXcQ") != cache_key("https://www.youtube.com/watch?v=dQw4w9WgXcQ"):
+        print("   [ERROR] Short and long URLs should share a cache key")
+        return False
+    
+    cache = MetadataCache(max_entries=2)
+    cache.put("https://youtu.be/a", {'title': 'A'})
+    cache.put("https://youtu.be/b", {'title': 'B'})
+    cache.get("https://youtu.be/a")
+    cache.put("https://youtu.be/c", {'title': 'C'})
+    
+    if "https://youtu.be/b" in cache or cache.get("https://youtu.be/a") is None:
+        print("   [ERROR] Least recently used entry should be evicted")
+        return False
+    
+    # Only complete URLs are fetched speculatively while typing
+    if not is_complete_url("https://youtu.be/dQw4w9WgXcQ") or is_complete_url("https://youtu.be/dQw4w9"):
+        print("   [ERROR] Partly typed video URLs should not be prefetched")
+        return False
+    if not is_complete_url("https://www.youtube.com/playlist?list=PL123"):
+        print("   [ERROR] Playlist URLs should be prefetched")
+        return False
+    
+    if info_cache_url("https://www.youtube.com/playlist?list=PL123", 50) == info_cache_url("https://www.youtube.com/playlist?list=PL123", 100):
+        print("   [ERROR] Playlist pages of different sizes should be cached apart")
+        return False
+    
+    # Backends without --items can still look up single videos
+    if first_page_items("https://youtu.be/dQw4w9WgXcQ", 100) is not None or first_page_items("https://vimeo.com/1", 100) is not None:
+        print("   [ERROR] Single videos should not be fetched with --items")
+        return False
+    if first_page_items("https://www.youtube.com/@channel/videos", 100) != "1-100":
+        print("   [ERROR] Channels should be fetched a page at a time")
+        return False
+    
+    print("   [SUCCESS] Metadata cache works")
+    return True
+
+def test_playlist_pager():
+    """Test lazy playlist paging"""
+    print("Testing playlist pager...")
+    
+    from playlist import PlaylistPager
+    
+    entries = [{'id': str(i)} for i in range(120)]
+    requested = []
+    
+    def fetch_page(items):
+        requested.append(items)
+        start, end = (int(n) for n in items.split('-'))
+        return {'videos': entries[start - 1:end]}
+    
+    pager = PlaylistPager(fetch_page, page_size=50)
+    if len(pager.get_page(0)) != 50 or not pager.has_more():
+        print("   [ERROR] First page should hold 50 entries with more to come")
+        return False
+    
+    if len(list(pager.iter_entries())) != 120 or requested != ["1-50", "51-100", "101-150"]:
+        print(f"   [ERROR] Unexpected page requests: {requested}")
+        return False
+    
+    if pager.has_more():
+        print("   [ERROR] Pager should be exhausted after a short page")
+        return False
+    
+    print("   [SUCCESS] Playlist pager works")
+    return True
+
+def test_playlist_entries():
+    """Test compact playlist storage and selection"""
+    print("Testing playlist entries...")
+    
+    from playlist import Bitset, PlaylistEntries
+    
+    entries = PlaylistEntries({'id': str(i), 'url': f"https://youtu.be/{i}", 'uploader': "Channel"}
+                              for i in range(10))
+    selection = Bitset(len(entries), True)
+    selection.set(2, False)
+    
+    if selection.count() != 9 or 2 in list(selection.indexes()):
+        print("   [ERROR] Selection bitset is wrong")
+        return False
+    
+    if entries.uploaders[0] is not entries.uploaders[9] or entries.index_of('7') != 7:
+        print("   [ERROR] Entries should share uploader strings and index by ID")
+        return False
+    
+    print("   [SUCCESS] Playlist entries work")
+    return True
+
+def test_quality_budget():
+    """Test budget-based quality selection"""
+    print("Testing quality budget...")
+    
+    from quality import pick_audio_format, pick_for_budget, split_budget
+    
+    formats = [
+        {'format_id': '18', 'vcodec': 'avc1', 'acodec': 'mp4a', 'height': 360, 'tbr': 600},
+        {'format_id': '137', 'vcodec': 'avc1', 'acodec': 'none', 'height': 1080, 'filesize': 400000000},
+        {'format_id': '136', 'vcodec': 'avc1', 'acodec': 'none', 'height': 720, 'filesize': 200000000},
+        {'format_id': '140', 'vcodec': 'none', 'acodec': 'mp4a', 'abr': 128, 'filesize': 10000000},
+    ]
+    
+    pick = pick_for_budget(formats, duration=600, max_size=300000000)
+    if not pick or pick['format'] != '136+140':
+        print(f"   [ERROR] Expected 720p within 300 MB, got {pick}")
+        return False
+    
+    pick = pick_for_budget(formats, duration=600, max_bitrate=1000)
+    if not pick or pick['format'] != '18':
+        print(f"   [ERROR] Expected the 360p muxed format under 1 Mbps, got {pick}")
+        return False
+    
+    if split_budget([100, 300], 1000) != [250, 750]:
+        print("   [ERROR] Total budget should follow durations")
+        return False
+    
+    formats.append({'format_id': '251', 'vcodec': 'none', 'acodec': 'opus', 'abr': 160, 'filesize': 9000000})
+    formats.append({'format_id': '249', 'vcodec': 'none', 'acodec': 'opus', 'abr': 50, 'filesize': 3000000})
+    picks = [pick_audio_format(formats, f, 600)['format_id'] for f in ('mp3', 'm4a', 'opus')]
+    if picks != ['251', '140', '251']:
+        print(f"   [ERROR] Unexpected audio-only picks: {picks}")
+        return False
+    
+    # Audio files are tagged in-process once their download finishes
+    from tagging import build_tags, tag_audio_file
+    tags = build_tags({'title': 'Song', 'uploader': 'Band', 'upload_date': '20240102'}, "Album", 3)
+    if tags != {'title': 'Song', 'artist': 'Band', 'album': 'Album', 'date': '2024', 'tracknumber': '3'}:
+        print(f"   [ERROR] Unexpected audio tags: {tags}")
+        return False
+    if 'artist' in build_tags({'title': 'Song', 'uploader': 'Unknown'}) or tag_audio_file("missing.mp3", tags):
+        print("   [ERROR] Placeholder uploaders and missing files should not be tagged")
+        return False
+    
+    print("   [SUCCESS] Quality budget works")
+    return True
+
+def test_sections():
+    """Test time-range section parsing"""
+    print("Testing sections...")
+    
+    from sections import parse_sections, sections_arg, sections_duration
+    
+    sections = parse_sections("1:02:00-1:05:00, 1:00-3:30, 2:00-4:00")
+    if sections != [(60, 240), (3720, 3900)] or sections_arg(sections) != "60-240,3720-3900":
+        print(f"   [ERROR] Unexpected sections: {sections}")
+        return False
+    
+    if sections_duration(parse_sections("10:00-"), 900) != 300:
+        print("   [ERROR] Open section should run to the end of the video")
+        return False
+    
+    try:
+        parse_sections("3:00-1:00")
+        print("   [ERROR] Reversed section should be rejected")
+        return False
+    except ValueError:
+        pass
+    
+    print("   [SUCCESS] Sections work")
+    return True
+
+def test_integrity():
+    """Test inline hashing and manifest verification"""
+    print("Testing integrity manifest...")
+    
+    import hashlib
+    import io
+    import tempfile
+    from integrity import HashingWriter, append_manifest, manifest_record, verify_manifest
+    
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "video.mp4")
+        writer = HashingWriter(io.FileIO(path, "wb"), fast=True)
+        writer.write(b"data" * 1000)
+        writer.close()
+        
+        if writer.digests()['sha256'] != hashlib.sha256(b"data" * 1000).hexdigest():
+            print("   [ERROR] Inline digest does not match the written bytes")
+            return False
+        
+        # A raw target may accept only part of each write
+        class ShortWrites(io.RawIOBase):
+            def __init__(self):
+                self.data = b""
+            def writable(self):
+                return True
+            def write(self, data):
+                self.data += bytes(data[:3])
+                return min(3, len(data))
+        target = ShortWrites()
+        short = HashingWriter(target)
+        remaining = memoryview(b"partial writes")
+        while remaining:
+            remaining = remaining[short.write(remaining):]
+        if short.digests()['sha256'] != hashlib.sha256(target.data).hexdigest() or short.size != 14:
+            print("   [ERROR] Only the bytes the target accepted should be hashed")
+            return False
+        
+        append_manifest(folder, manifest_record(path, writer.size, writer.digests(), folder))
+        manifest = os.path.join(folder, "manifest.jsonl")
+        if verify_manifest(manifest) != [("video.mp4", "ok")]:
+            print("   [ERROR] Unchanged file should verify")
+            return False
+        
+        with open(path, "r+b") as f:
+            f.write(b"X")
+        if verify_manifest(manifest, full=True) != [("video.mp4", "hash mismatch")]:
+            print("   [ERROR] Changed file should fail verification")
+            return False
+    
+    print("   [SUCCESS] Integrity manifest works")
+    return True
+
+def test_staged_writer():
+    """Test staged output files are published atomically"""
+    print("Testing staged writer...")
+    
+    import tempfile
+    from writer import StagedFile
+    
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "video.mp4")
+        with StagedFile(path, expected_size=8192) as staged:
+            staged.write(b"x" * 1000)
+            if os.path.exists(path) or len(os.listdir(folder)) != 1:
+                print("   [ERROR] File should only be staged while it is written")
+                return False
+        
+        if os.listdir(folder) != ["video.mp4"] or os.path.getsize(path) != 1000:
+            print("   [ERROR] Published file should be trimmed to what was written")
+            return False
+        
+        try:
+            with StagedFile(os.path.join(folder, "broken.mp4")) as staged:
+                staged.write(b"x")
+                raise IOError("network error")
+        except IOError:
+            pass
+        
+        if os.listdir(folder) != ["video.mp4"]:
+            print("   [ERROR] Failed file should leave no partial behind")
+            return False
+        
+    print("   [SUCCESS] Staged writer works")
+    return True
+
+def test_sync_watermark():
+    """Test incremental sync stops at known entries"""
+    print("Testing sync watermark...")
+    
+    from playlist import PlaylistPager
+    from sync import find_appended_entries, find_new_entries, is_oldest_first, record_entry
+    
+    watermark = {'seen_ids': [], 'last_upload_date': None}
+    for entry in [{'id': 'a', 'upload_date': '20240101'}, {'id': 'b', 'upload_date': '20240102'}]:
+        record_entry(watermark, entry)
+    
+    entries = [{'id': 'd'}, {'id': 'c'}, {'id': 'b'}, {'id': 'a'}]
+    new_entries, scanned = find_new_entries(iter(entries), watermark)
+    
+    if [e['id'] for e in new_entries] != ['c', 'd'] or scanned != 3:
+        print(f"   [ERROR] Unexpected new entries: {new_entries} after {scanned} scanned")
+        return False
+    
+    if watermark['last_upload_date'] != '20240102':
+        print("   [ERROR] Watermark date should follow the newest entry")
+        return False
+    
+    # Playlists list their oldest entries first and grow at the end
+    playlist = [{'id': str(i), 'upload_date': f"2024{i + 1:04d}"} for i in range(7)]
+    if not is_oldest_first("https://www.youtube.com/playlist?list=PL1", playlist) or \
+            is_oldest_first("https://www.youtube.com/@channel/videos", list(reversed(playlist))):
+        print("   [ERROR] Source order should follow the upload dates")
+        return False
+    
+    def pager_for(videos):
+        requested = []
+        def fetch_page(items):
+            requested.append(items)
+            start, end = (int(n) for n in items.split('-'))
+            return {'videos': videos[start - 1:end]}
+        return PlaylistPager(fetch_page, page_size=2), requested
+    
+    watermark = {'seen_ids': [], 'known_count': 0}
+    pager, _ = pager_for(playlist)
+    new_entries, scanned, count = find_appended_entries(pager, watermark)
+    for entry in new_entries:
+        record_entry(watermark, entry)
+    watermark['known_count'] = count
+    
+    pager, requested = pager_for(playlist + [{'id': 'appended'}])
+    new_entries, scanned, count = find_appended_entries(pager, watermark)
+    if [e['id'] for e in new_entries] != ['appended'] or count != 8 or requested[0] != "5-6":
+        print(f"   [ERROR] Appended entry should be found from the end: {new_entries} {requested}")
+        return False
+    
+    # A source that shrank is rescanned; IDs past the first 500 must still count as known
+    large = [{'id': f"v{i}"} for i in range(600)]
+    watermark = {'seen_ids': [], 'known_count': 0, 'oldest_first': True}
+    for entry in large:
+        record_entry(watermark, entry)
+    watermark['known_count'] = len(large)
+    pager, _ = pager_for(large[:300] + [{'id': 'appended'}])
+    pager.page_size = 50
+    new_entries, scanned, count = find_appended_entries(pager, watermark)
+    if [e['id'] for e in new_entries] != ['appended'] or scanned != 301:
+        print(f"   [ERROR] A rescan should only find entries never seen: {len(new_entries)} new")
+        return False
+    
+    print("   [SUCCESS] Sync watermark works")
+    return True
+
+def test_space_reservations():
+    """Test jobs are only admitted while they fit on the disk"""
+    print("Testing space reservations...")
+    
+    import shutil
+    import tempfile
+    from scheduler import SpaceReservations, headroom_factor
+    
+    with tempfile.TemporaryDirectory() as folder:
+        free = shutil.disk_usage(folder).free
+        reservations = SpaceReservations(min_free=0)
+        
+        if not reservations.try_reserve(1, folder, free // 2):
+            print("   [ERROR] Job that fits should be admitted")
+            return False
+        
+        if reservations.try_reserve(2, folder, free // 2 + 4096):
+            print("   [ERROR] Job should wait while another job holds the space")
+            return False
+        
+        # Written bytes are on disk already, so they stop counting as reserved
+        reservations.update_written(1, free // 2)
+        if reservations.summary(folder)[0] != 0:
+            print("   [ERROR] Written bytes should shrink the reservation")
+            return False
+        
+        reservations.release(1)
+        if reservations.summary(folder)[0] != 0:
+            print("   [ERROR] Released job should hold no space")
+            return False
+    
+    if headroom_factor('mp4') <= headroom_factor('mp3'):
+        print("   [ERROR] Video merges should need more headroom than audio")
+        return False
+    
+    print("   [SUCCESS] Space reservations work")
+    return True
+
+def test_thumbnail_cache():
+    """Test thumbnails are fetched once and then served from disk"""
+    print("Testing thumbnail cache...")
+    
+    import tempfile
+    import threading
+    import thumbnails
+    from thumbnails import ImageLRU, ThumbnailCache
+    
+    images = ImageLRU(max_bytes=100)
+    for key in ("a", "b", "c"):
+        images.put(key, key.upper(), 40)
+    if images.get("a") is not None or images.get("c") != "C" or images.used_bytes != 80:
+        print("   [ERROR] Image LRU should evict the oldest images past its memory bound")
+        return False
+    
+    fetched = []
+    with tempfile.TemporaryDirectory() as folder:
+        cache = ThumbnailCache(folder, fetch=lambda url: fetched.append(url) or b"jpeg")
+        original_to_png = thumbnails.to_png
+        thumbnails.to_png = lambda data: b"png:" + data
+        try:
+            results = []
+            for _ in range(2):
+                done = threading.Event()
+                cache.load("vid", "http://example.invalid/vid.jpg",
+                           lambda key, data, from_disk: (results.append((data, from_disk)), done.set()))
+                done.wait(5)
+        finally:
+            thumbnails.to_png = original_to_png
+            cache.shutdown()
+    
+    if results != [(b"png:jpeg", False), (b"png:jpeg", True)] or len(fetched) != 1:
+        print(f"   [ERROR] Unexpected thumbnail loads: {results}, {len(fetched)} fetches")
+        return False
+    
+    print("   [SUCCESS] Thumbnail cache works")
+    return True
+
+def test_metrics():
+    """Test download phases are timed and summarised"""
+    print("Testing download metrics...")
+    
+    from metrics import JobTimer, MetricsRecorder, percentile, phase_durations
+    
+    timer = JobTimer("https://youtu.be/abc")
+    timer.mark('spawn')
+    timer.observe('{"type": "retry"}')
+    timer.observe('{"type": "progress", "percent": 10, "downloaded_bytes": 2048}')
+    record = timer.finish(True)
+    
+    if set(record['phases']) != {'spawn', 'ready', 'info', 'first_byte', 'downloaded', 'postprocessed'}:
+        print(f"   [ERROR] Unexpected phases: {record['phases']}")
+        return False
+    if record['bytes'] != 2048 or record['retries'] != 1:
+        print("   [ERROR] Bytes and retries should be counted")
+        return False
+    
+    durations = phase_durations({'phases': {'spawn': 0.5, 'first_byte': 2.0}})
+    if durations != {'spawn': 0.5, 'first_byte': 1.5}:
+        print(f"   [ERROR] Unexpected phase durations: {durations}")
+        return False
+    
+    if percentile([1, 2, 3, 4], 50) != 2 or percentile([1, 2, 3, 4], 99) != 4:
+        print("   [ERROR] Percentiles should use the nearest rank")
+        return False
+    
+    recorder = MetricsRecorder()
+    recorder.record(record)
+    text = recorder.prometheus_text()
+    if 'kartoshka_jobs_total{result="success"} 1' not in text or 'kartoshka_downloaded_bytes_total 2048' not in text:
+        print("   [ERROR] Prometheus text is missing job counters")
+        return False
+    
+    print("   [SUCCESS] Download metrics work")
+    return True
+
+def test_lag_monitor():
+    """Test stalls are blamed on the Tk callback that was running"""
+    print("Testing lag monitor...")
+    
+    import tkinter
+    import traceback
+    from lag_monitor import LagMonitor, blocking_callback
+    
+    tk_file = os.path.join(os.path.dirname(tkinter.__file__), "__init__.py")
+    stack = [
+        traceback.FrameSummary("gui.py", 10, "main"),
+        traceback.FrameSummary(tk_file, 1948, "__call__"),
+        traceback.FrameSummary("gui.py", 500, "create_playlist_selection"),
+        traceback.FrameSummary("gui.py", 900, "create_video_checkbox"),
+    ]
+    if blocking_callback(stack) != "create_playlist_selection (gui.py:500)":
+        print(f"   [ERROR] Wrong callback blamed: {blocking_callback(stack)}")
+        return False
+    
+    # Restarting must not leave the old watcher thread running
+    class FakeRoot:
+        def after(self, ms, callback):
+            return "tick"
+        def after_cancel(self, tick_id):
+            pass
+    monitor = LagMonitor(FakeRoot(), interval_ms=20)
+    monitor.start()
+    first = monitor._watcher
+    monitor.stop()
+    monitor.start()
+    first.join(1)
+    monitor.stop()
+    if first.is_alive() or first is monitor._watcher:
+        print("   [ERROR] A stopped watcher should exit even when monitoring restarts")
+        return False
+    
+    print("   [SUCCESS] Lag monitor works")
+    return True
+
+def test_profiling():
+    """Test profiles are written tagged with the command and URL"""
+    print("Testing profiling hooks...")
+    
+    import tempfile
+    import profiling
+    
+    with tempfile.TemporaryDirectory() as folder:
+        os.environ[profiling.PROFILE_DIR_ENV] = folder
+        try:
+            with profiling.profile_session("info", "https://www.youtube.com/watch?v=abc"):
+                sorted(range(1000))
+        finally:
+            del os.environ[profiling.PROFILE_DIR_ENV]
+        
+        names = sorted(os.listdir(folder))
+        if len(names) != 2 or not all("-info-youtube_com_watch_v_abc" in name for name in names):
+            print(f"   [ERROR] Unexpected profile files: {names}")
+            return False
+        if not names[0].endswith(".alloc.txt") or not names[1].endswith(".prof"):
+            print(f"   [ERROR] Expected a .prof and an allocation snapshot: {names}")
+            return False
+    
+    print("   [SUCCESS] Profiling hooks work")
+    return True
+
+def test_bulk_info():
+    """Test bulk info results are matched back to their URLs"""
+    print("Testing bulk info...")
+    
+    import tempfile
+    from backend_client import get_info_bulk, get_info_each
+    
+    # Stand-in backend answering in reverse order, with one failure
+    script = (
+        "import json, sys\n"
+        "urls = [line.strip() for line in sys.stdin]\n"
+        "for i in reversed(range(len(urls))):\n"
+        "    if i == 1:\n"
+        "        print(json.dumps({'index': i, 'error': 'Video unavailable'}))\n"
+        "    else:\n"
+        "        print(json.dumps({'index': i, 'info': {'title': urls[i]}}))\n"
+    )
+    if os.name == 'nt':
+        print("   [SKIP] Needs a script that can run as an executable")
+        return True
+    
+    with tempfile.TemporaryDirectory() as folder:
+        backend = os.path.join(folder, "backend.py")
+        with open(backend, "w") as f:
+            f.write(f"#!{sys.executable}\n" + script)
+        os.chmod(backend, 0o755)
+        results = list(get_info_bulk(backend, ["a", "b", "c"]))
+        
+        # Stand-in for an older backend that has no bulk info
+        old_backend = os.path.join(folder, "old_backend.py")
+        with open(old_backend, "w") as f:
+            f.write(f"#!{sys.executable}\n"
+                    "import json, sys\n"
+                    "if '--bulk' in sys.argv:\n"
+                    "    sys.exit('unrecognized arguments: --bulk')\n"
+                    "print(json.dumps({'title': sys.argv[sys.argv.index('--url') + 1]}))\n")
+        os.chmod(old_backend, 0o755)
+        fallback = list(get_info_each(old_backend, ["a", "b"]))
+        cli_info = subprocess.run([sys.executable, "cli.py", "--backend", old_backend, "info", "a", "b"],
+                                  capture_output=True, text=True, timeout=60)
+        cli_results = sorted(json.loads(line)['info']['title'] for line in cli_info.stdout.splitlines())
+    
+    if [index for index, _, _ in results] != [2, 1, 0]:
+        print(f"   [ERROR] Results should stream in completion order: {results}")
+        return False
+    if results[1] != (1, None, 'Video unavailable') or results[0][1] != {'title': 'c'}:
+        print(f"   [ERROR] Results should keep their input index: {results}")
+        return False
+    if fallback != [(0, {'title': 'a'}, None), (1, {'title': 'b'}, None)]:
+        print(f"   [ERROR] Backends without bulk info should be asked per URL: {fallback}")
+        return False
+    if cli_info.returncode != 0 or cli_results != ["a", "b"]:
+        print(f"   [ERROR] The info command should fall back to one call per URL: {cli_info.stdout}")
+        return False
+    
+    print("   [SUCCESS] Bulk info works")
+    return True
+
+def test_streaming():
+    """Test media is relayed to sinks while events are read separately"""
+    print("Testing streaming...")
+    
+    import io
+    import socket
+    import tempfile
+    import threading
+    from streaming import SocketSink, open_sink, relay, stream_download
+    
+    # Relay from a pipe into a socket pair, as for a tcp: or unix: consumer
+    data = os.urandom(300 * 1024)
+    read_fd, write_fd = os.pipe()
+    def write_source():
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(data)
+    threading.Thread(target=write_source, daemon=True).start()
+    
+    near, far = socket.socketpair()
+    received = []
+    def read_sink():
+        while True:
+            chunk = far.recv(65536)
+            if not chunk:
+                break
+            received.append(chunk)
+    reader = threading.Thread(target=read_sink, daemon=True)
+    reader.start()
+    
+    progress = []
+    sink = SocketSink(near)
+    with os.fdopen(read_fd, 'rb') as source:
+        total = relay(source, sink, on_bytes=progress.append)
+    sink.close()
+    reader.join(5)
+    far.close()
+    if total != len(data) or b''.join(received) != data or progress[-1] != len(data):
+        print(f"   [ERROR] Relay should copy every byte: {total} of {len(data)}")
+        return False
+    
+    try:
+        open_sink("ftp://example.com")
+        print("   [ERROR] Unknown stream targets should be refused")
+        return False
+    except ValueError:
+        pass
+    
+    if os.name == 'nt':
+        print("   [SKIP] Needs a script that can run as an executable")
+        print("   [SUCCESS] Streaming works")
+        return True
+    
+    # Stand-in backend writing media to stdout and events to stderr
+    script = (
+        "import json, sys\n"
+        "sys.stderr.write(json.dumps({'v': 1, 'type': 'progress', 'job': None, 'percent': 50.0}) + '\\n')\n"
+        "sys.stdout.buffer.write(b'media' * 1000)\n"
+        "sys.stdout.buffer.flush()\n"
+        "sys.stderr.write(json.dumps({'v': 1, 'type': 'done', 'job': None, 'success': True}) + '\\n')\n"
+    )
+    with tempfile.TemporaryDirectory() as folder:
+        backend = os.path.join(folder, "backend.py")
+        with open(backend, "w") as f:
+            f.write(f"#!{sys.executable}\n" + script)
+        os.chmod(backend, 0o755)
+        events = []
+        output = io.BytesIO()
+        success, relayed = stream_download(backend, "https://youtu.be/abc", "best", "mp4", output,
+                                           on_event=events.append)
+        
+        # A file: target only appears once the stream has completed
+        saved = os.path.join(folder, "saved.mp4")
+        staged = open_sink(f"file:{saved}", expected_size=10000)
+        preallocated = os.path.getsize(staged.temp_path)
+        saved_ok, _ = stream_download(backend, "https://youtu.be/abc", "best", "mp4", staged)
+        staged_early = os.path.exists(saved)
+        staged.publish()
+        staged.close()
+        with open(saved, "rb") as f:
+            saved_data = f.read()
+        
+        # A hashed file: stream is recorded in the folder's manifest
+        from integrity import verify_manifest
+        hashed = os.path.join(folder, "hashed.mp4")
+        subprocess.run([sys.executable, "cli.py", "--backend", backend, "stream", "https://youtu.be/abc",
+                        "--to", f"file:{hashed}", "--hash"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       timeout=60)
+        manifest = os.path.join(folder, "manifest.jsonl")
+        hashed_results = verify_manifest(manifest, full=True) if os.path.exists(manifest) else []
+        with open(hashed + ".sha256") as f:
+            sidecar = f.read().split()[1:]
+        for name in ("hashed.mp4", "hashed.mp4.sha256", "manifest.jsonl"):
+            os.remove(os.path.join(folder, name))
+        
+        abandoned = open_sink(f"file:{os.path.join(folder, 'abandoned.mp4')}")
+        abandoned.write(b"partial")
+        abandoned.close()
+        leftovers = sorted(os.listdir(folder))
+    
+    if not success or relayed != 5000 or output.getvalue() != b'media' * 1000:
+        print(f"   [ERROR] Streamed media should reach the sink intact: {success} {relayed}")
+        return False
+    if [event['type'] for event in events] != ['progress', 'done']:
+        print(f"   [ERROR] Events should be decoded from stderr: {events}")
+        return False
+    if not saved_ok or staged_early or saved_data != b'media' * 1000 or leftovers != ["backend.py", "saved.mp4"] \
+            or preallocated != 10000:
+        print(f"   [ERROR] File targets should be published only when complete: {leftovers}")
+        return False
+    if hashed_results != [("hashed.mp4", "ok")] or sidecar != ["hashed.mp4"]:
+        print(f"   [ERROR] Hashed file targets should get a manifest record and a sidecar: {hashed_results}")
+        return False
+    
+    print("   [SUCCESS] Streaming works")
+    return True
+
+def test_job_api():
+    """Test the job API queues, lists, cancels and streams jobs"""
+    print("Testing job API...")
+    
+    import tempfile
+    import urllib.error
+    import urllib.request
+    from job_api import serve_jobs
+    from scheduler import DownloadScheduler
+    
+    def request(method, path, data=None):
+        body = json.dumps(data).encode() if data is not None else None
+        req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=body, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=5) as response:
+                return response.status, response.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode()
+    
+    with tempfile.TemporaryDirectory() as folder:
+        # No workers, so submitted jobs stay queued
+        scheduler = DownloadScheduler("missing-backend", max_workers=0)
+        server = serve_jobs(scheduler, 0, max_queue=2, default_path=folder)
+        port = server.server_address[1]
+        try:
+            codes = [request("POST", "/jobs", {'url': f"https://example.com/{i}", 'format': 'mp3'})[0]
+                     for i in range(3)]
+            if codes != [201, 201, 429]:
+                print(f"   [ERROR] Submissions past the queue depth should get 429: {codes}")
+                return False
+            if request("POST", "/jobs", {'url': "file:///etc/passwd"})[0] != 400:
+                print("   [ERROR] Invalid jobs should be rejected")
+                return False
+            import http.client
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.putrequest("POST", "/jobs")
+            connection.putheader("Content-Type", "application/json")
+            connection.putheader("Content-Length", "many")
+            connection.endheaders()
+            response = connection.getresponse()
+            malformed = response.status, json.loads(response.read()).get('error')
+            connection.close()
+            if malformed[0] != 400 or not malformed[1]:
+                print(f"   [ERROR] A malformed Content-Length should get a JSON 400: {malformed}")
+                return False
+            
+            jobs = json.loads(request("GET", "/jobs")[1])
+            if [job['status'] for job in jobs] != ['queued', 'queued'] or jobs[0]['path'] != folder:
+                print(f"   [ERROR] Jobs should be listed: {jobs}")
+                return False
+            
+            job_id = jobs[0]['id']
+            if request("DELETE", f"/jobs/{job_id}")[0] != 200 or request("DELETE", f"/jobs/{job_id}")[0] != 409:
+                print("   [ERROR] Jobs should be cancelled once")
+                return False
+            
+            code, events = request("GET", f"/jobs/{job_id}/events?format=jsonl")
+            if code != 200 or json.loads(events.splitlines()[-1])['status'] != 'cancelled':
+                print(f"   [ERROR] Event stream should end with the final state: {events}")
+                return False
+            
+            # A long-running server forgets the oldest finished jobs
+            scheduler.keep_finished = 0
+            request("POST", "/jobs", {'url': "https://example.com/next"})
+            if request("GET", f"/jobs/{job_id}")[0] != 404 or len(json.loads(request("GET", "/jobs")[1])) != 2:
+                print("   [ERROR] Finished jobs past the retention count should be pruned")
+                return False
+        finally:
+            server.shutdown()
+            scheduler.shutdown()
+    
+    print("   [SUCCESS] Job API works")
+    return True
+
+def test_job_queue():
+    """Test worker processes share a queue and lost leases are reclaimed"""
+    print("Testing shared job queue...")
+    
+    import tempfile
+    import time
+    from job_queue import JobQueue
+    
+    with tempfile.TemporaryDirectory() as folder:
+        queue = JobQueue(os.path.join(folder, "queue.db"))
+        job_id = queue.enqueue("https://example.com/lost")
+        queue.claim("crashed", lease_seconds=0.1)
+        time.sleep(0.2)
+        job = queue.claim("healthy")
+        if job is None or job['id'] != job_id or job['attempts'] != 2:
+            print(f"   [ERROR] An expired lease should hand the job to another worker: {job}")
+            return False
+        if queue.heartbeat(job_id, "crashed") or queue.complete(job_id, "crashed", True):
+            print("   [ERROR] A worker should not keep a job it lost")
+            return False
+        queue.complete(job_id, "healthy", True)
+        
+        if os.name == 'nt':
+            print("   [SKIP] Worker processes need a script that can run as an executable")
+            print("   [SUCCESS] Shared job queue works")
+            return True
+        
+        # A stopped worker kills its download and hands the job back at once
+        import threading
+        from job_queue import run_worker
+        slow_backend = os.path.join(folder, "slow_backend.py")
+        with open(slow_backend, "w") as f:
+            f.write(f"#!{sys.executable}\n"
+                    "import sys, time\n"
+                    "if '--help' not in sys.argv:\n"
+                    "    time.sleep(60)\n")
+        os.chmod(slow_backend, 0o755)
+        stopping_id = queue.enqueue("https://example.com/stopped", path=folder)
+        stop = threading.Event()
+        worker = threading.Thread(target=run_worker, args=(queue, slow_backend, "stopping"), kwargs={'stop': stop})
+        worker.start()
+        time.sleep(1)
+        stop.set()
+        worker.join(timeout=10)
+        job = queue.claim("healthy")
+        if worker.is_alive() or job is None or job['id'] != stopping_id or job['attempts'] != 1:
+            print(f"   [ERROR] A stopped worker should release its job without using up an attempt: {job}")
+            return False
+        queue.complete(stopping_id, "healthy", True)
+        
+        # A job cancelled mid-download is reported as cancelled, not as a lost lease
+        reported = []
+        cancelled_id = queue.enqueue("https://example.com/cancelled", path=folder)
+        stop = threading.Event()
+        worker = threading.Thread(target=run_worker, args=(queue, slow_backend, "cancelling"),
+                                  kwargs={'stop': stop, 'lease_seconds': 1.5,
+                                          'on_job': lambda job, success, error: reported.append(error)})
+        worker.start()
+        time.sleep(0.5)
+        queue.cancel(cancelled_id)
+        deadline = time.monotonic() + 10
+        while not reported and time.monotonic() < deadline:
+            time.sleep(0.1)
+        stop.set()
+        worker.join(timeout=10)
+        if reported != ["Cancelled"] or queue.status(cancelled_id) != 'cancelled':
+            print(f"   [ERROR] A cancelled job should be reported as cancelled: {reported}")
+            return False
+        
+        # A locked database is retried instead of ending the worker
+        import sqlite3
+        from job_queue import with_retries
+        calls = []
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise sqlite3.OperationalError("database is locked")
+            return "recorded"
+        if with_retries(flaky) != "recorded" or len(calls) != 3:
+            print("   [ERROR] Queue updates should be retried while the database is locked")
+            return False
+        
+        # Stand-in backend that "downloads" 1000 bytes
+        backend = os.path.join(folder, "backend.py")
+        with open(backend, "w") as f:
+            f.write(f"#!{sys.executable}\n"
+                    "import json\n"
+                    "print(json.dumps({'type': 'progress', 'percent': 100, 'downloaded_bytes': 1000}))\n")
+        os.chmod(backend, 0o755)
+        
+        for index in range(6):
+            queue.enqueue(f"https://example.com/{index}", path=folder)
+        workers = [subprocess.Popen([sys.executable, "cli.py", "--backend", backend, "worker",
+                                     "--queue", queue.path, "--name", f"worker{index}", "--exit-when-empty"],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                   for index in range(3)]
+        for worker in workers:
+            worker.wait(timeout=60)
+        
+        counts = queue.counts()
+        stats = [worker for worker in queue.worker_stats() if worker['name'].startswith("worker")]
+        if counts != {'done': 8, 'cancelled': 1} or sum(worker['done'] for worker in stats) != 6:
+            print(f"   [ERROR] Every queued job should run exactly once: {counts} {stats}")
+            return False
+        if sum(worker['bytes'] for worker in stats) != 6000:
+            print(f"   [ERROR] Worker throughput should count downloaded bytes: {stats}")
+            return False
+    
+    print("   [SUCCESS] Shared job queue works")
+    return True
+
+def test_event_protocol():
+    """Test backend event lines decode to typed events with job IDs"""
+    print("Testing event protocol...")
+    
+    import time
+    from events import ProgressThrottle, decode_event, encode_event, encode_progress
+    
+    compact = encode_progress(7, 42.5, 1048576, None, 2000000.0, 12, compact=True)
+    full = encode_progress(7, 42.5, 1048576, None, 2000000.0, 12)
+    for line in (compact, full):
+        event = decode_event(line)
+        if (event['type'], event['job'], event['percent'], event['downloaded_bytes'], event['total_bytes']) != \
+                ('progress', 7, 42.5, 1048576, None):
+            print(f"   [ERROR] Progress should round-trip: {line} -> {event}")
+            return False
+    
+    if decode_event(encode_event('phase', 7, phase='info'))['phase'] != 'info':
+        print("   [ERROR] JSON events should keep their fields")
+        return False
+    legacy = decode_event('{"type": "progress", "percent": 5}')
+    if legacy['v'] != 0 or legacy['job'] is not None:
+        print(f"   [ERROR] Unversioned lines should decode as version 0: {legacy}")
+        return False
+    for line in ("[download] Destination: a.mp4", "@p 7 not numbers", "{broken"):
+        if decode_event(line) != {'v': decode_event(line)['v'], 'type': 'log', 'job': None, 'message': line}:
+            print(f"   [ERROR] Other lines should become log events: {decode_event(line)}")
+            return False
+    
+    now = [0.0]
+    throttle = ProgressThrottle(250, clock=lambda: now[0])
+    passed = []
+    for step in range(10):
+        now[0] = step * 0.1
+        passed.append(throttle.ready(step * 10))
+    if passed != [True, False, False, True, False, False, True, False, False, True]:
+        print(f"   [ERROR] Progress should pass once per interval: {passed}")
+        return False
+    if not throttle.ready(100):
+        print("   [ERROR] The final progress event should always pass")
+        return False
+    
+    # Dozens of jobs at four events a second each must cost next to nothing
+    started = time.perf_counter()
+    for _ in range(10000):
+        decode_event(compact)
+    per_line_us = (time.perf_counter() - started) / 10000 * 1e6
+    if per_line_us > 50:
+        print(f"   [ERROR] Compact progress takes {per_line_us:.1f} us per line to decode")
+        return False
+    
+    if os.name != 'nt':
+        # Protocol flags go only to backends whose --help lists them
+        import tempfile
+        from backend_client import download_video
+        script = ("import json, sys\n"
+                  "if '--help' in sys.argv:\n"
+                  "    print('usage: backend --command CMD' + HELP)\n"
+                  "    sys.exit()\n"
+                  "if '--events' in sys.argv and not HELP:\n"
+                  "    sys.exit('unrecognized arguments: --events')\n"
+                  "print(json.dumps({'type': 'progress', 'percent': 100, 'job': sys.argv.count('--job-id')}))\n")
+        with tempfile.TemporaryDirectory() as folder:
+            seen = {}
+            for name, help_text in (("old", ""), ("new", " [--events N] [--job-id N]")):
+                backend = os.path.join(folder, f"{name}_backend.py")
+                with open(backend, "w") as f:
+                    f.write(f"#!{sys.executable}\nHELP = {help_text!r}\n" + script)
+                os.chmod(backend, 0o755)
+                events = []
+                success, _ = download_video(backend, "https://example.com/v", "best", "mp4", folder,
+                                            on_output=events.append, job_id=1)
+                seen[name] = (success, [event['job'] for event in events])
+        if seen != {'old': (True, [0]), 'new': (True, [1])}:
+            print(f"   [ERROR] Older backends should get version 0 arguments: {seen}")
+            return False
+    
+    print(f"   [SUCCESS] Event protocol works ({per_line_us:.1f} us per compact line)")
+    return True
+
+def test_download_schedule():
+    """Test schedule windows hold jobs and set rate limits"""
+    print("Testing download schedule...")
+    
+    import time
+    from datetime import datetime, timedelta
+    from scheduler import DownloadScheduler, Job
+    from time_windows import DownloadSchedule
+    
+    schedule = DownloadSchedule.parse("22:00-06:00; mon-fri 09:00-17:00@2M")
+    monday_night = datetime(2026, 10, 19, 23, 30)
+    tuesday_morning = datetime(2026, 10, 20, 7, 0)
+    tuesday_work = datetime(2026, 10, 20, 10, 0)
+    if not schedule.allows(monday_night) or not schedule.allows(tuesday_morning - timedelta(hours=2)) or \
+            schedule.allows(tuesday_morning):
+        print("   [ERROR] Run windows should wrap past midnight")
+        return False
+    if schedule.rate_limit(tuesday_work) != 2 * 1024 * 1024 or schedule.rate_limit(datetime(2026, 10, 25, 10, 0)):
+        print("   [ERROR] Throttles should apply on their days only")
+        return False
+    if schedule.next_change(tuesday_morning) != datetime(2026, 10, 20, 9, 0):
+        print(f"   [ERROR] Unexpected next change: {schedule.next_change(tuesday_morning)}")
+        return False
+    try:
+        DownloadSchedule.parse("someday 25:00-06:00")
+        print("   [ERROR] Invalid rules should be rejected")
+        return False
+    except ValueError:
+        pass
+    
+    # A job outside its window waits and starts once the window allows it
+    now = datetime.now()
+    closed = DownloadSchedule.parse(f"{now + timedelta(hours=2):%H:%M}-{now + timedelta(hours=3):%H:%M}")
+    scheduler = DownloadScheduler("missing-backend", max_workers=1, schedule=closed)
+    try:
+        job = scheduler.submit(Job("https://example.com/video", estimated_size=1))
+        time.sleep(0.2)
+        if job.status != 'scheduled':
+            print(f"   [ERROR] Job outside its window should wait: {job.status}")
+            return False
+        scheduler.set_schedule(None)
+        if not scheduler.wait(job, timeout=10):
+            print("   [ERROR] Job should start once its window opens")
+            return False
+    finally:
+        scheduler.shutdown()
+    
+    # A backend started just after its job was cancelled is killed as it registers
+    from scheduler import JobProcesses
+    class FakeProcess:
+        killed = False
+        def kill(self):
+            self.killed = True
+    job = Job("https://example.com/cancelled")
+    processes = JobProcesses(job)
+    early, late = FakeProcess(), FakeProcess()
+    processes.add(early)
+    job.status = 'cancelled'
+    processes.add(late)
+    if early.killed or not late.killed:
+        print("   [ERROR] Only processes added after a cancel should be killed on registration")
+        return False
+    
+    print("   [SUCCESS] Download schedule works")
+    return True
+
+def test_throughput_graph():
+    """Test speed history is kept in ring buffers and drawn incrementally"""
+    print("Testing throughput graph...")
+    
+    from throughput import RingBuffer, Sparkline, ThroughputHistory
+    
+    ring = RingBuffer(3)
+    for value in (1, 2, 3, 4):
+        ring.append(value)
+    if ring.values() != [2, 3, 4] or ring.latest() != 4 or ring.peak() != 4:
+        print(f"   [ERROR] Ring buffer should keep the newest values in order: {ring.values()}")
+        return False
+    
+    history = ThroughputHistory(samples=4)
+    history.record({1: 100})
+    history.record({1: 100, 2: 50})
+    if history.total.values() != [100, 150] or history.jobs[2].values() != [0.0, 50]:
+        print("   [ERROR] Series should stay aligned with the total")
+        return False
+    for _ in range(4):
+        history.record({2: 10})
+    if 1 in history.jobs or 2 not in history.jobs:
+        print("   [ERROR] Idle jobs should be dropped after a whole history")
+        return False
+    
+    class FakeCanvas:
+        def __init__(self):
+            self.created = 0
+            self.moved = 0
+        def cget(self, option):
+            return {'width': 300, 'height': 60}[option]
+        def create_line(self, *args, **kwargs):
+            self.created += 1
+            return self.created
+        create_text = create_line
+        def coords(self, item, *points):
+            self.moved += 1
+        def itemconfigure(self, item, **options):
+            pass
+        def bind(self, sequence, callback):
+            pass
+    
+    canvas = FakeCanvas()
+    sparkline = Sparkline(canvas, history)
+    created = canvas.created
+    history.record({2: 10, 3: 20})
+    sparkline.redraw()
+    moved = canvas.moved
+    sparkline.redraw()
+    if canvas.created != created or moved == 0 or canvas.moved != moved:
+        print("   [ERROR] Redraws should only move existing items, and only after new samples")
+        return False
+    
+    print("   [SUCCESS] Throughput graph works")
+    return True
+
+# Longest a playlist search may take, one frame at 60 Hz
+FILTER_BUDGET_MS = 16
+
+def test_playlist_search():
+    """Test the playlist search index and its filters"""
+    print("Testing playlist search...")
+    
+    import tempfile
+    import time
+    from playlist import PlaylistEntries, PlaylistIndex, downloaded_keys
+    
+    entries = PlaylistEntries([
+        {'id': 'a', 'title': "Café Tour: Part 1", 'uploader': "Ana", 'duration': 300},
+        {'id': 'b', 'title': "CAFE tour part 2", 'uploader': "Bo", 'duration': 1200},
+        {'id': 'c', 'title': "Mountain hike", 'uploader': "Ana", 'duration': 0}
+    ])
+    index = PlaylistIndex(entries)
+    if index.search("cafe") != [0, 1] or index.search("tour caf") != [0, 1] or index.search("part 2") != [1]:
+        print("   [ERROR] Search should ignore case and accents and match every word")
+        return False
+    if index.search(uploader="ana") != [0, 2] or index.search(min_duration=60, max_duration=600) != [0]:
+        print("   [ERROR] Uploader and duration filters are wrong")
+        return False
+    
+    entries.update(2, {'title': "Cafe at the summit"})
+    index.refresh(2)
+    if index.search("cafe") != [0, 1, 2]:
+        print("   [ERROR] Updated entries should be re-indexed")
+        return False
+    
+    with tempfile.TemporaryDirectory() as folder:
+        # File names lose characters that are not allowed on Windows
+        open(os.path.join(folder, "Café Tour： Part 1.mp4"), "w").close()
+        index.set_downloaded(downloaded_keys(folder))
+    if index.search("cafe", hide_downloaded=True) != [1, 2]:
+        print("   [ERROR] Entries in the download folder should be hidden")
+        return False
+    
+    entries.append({'id': 'd', 'title': "Another cafe", 'uploader': "Bo"})
+    if list(index.sync()) != [3] or index.search("cafe", within=[3]) != [3]:
+        print("   [ERROR] New entries should be indexed and searchable on their own")
+        return False
+    
+    # A large channel must filter within a frame as the user types
+    entries = PlaylistEntries({'id': str(i), 'title': f"Episode {i} of the long running show",
+                               'uploader': f"Channel {i % 7}", 'duration': i % 3600}
+                              for i in range(10000))
+    index = PlaylistIndex(entries)
+    slowest = 0
+    for query in ("s", "sh", "sho", "show 9", "show 99"):
+        started = time.perf_counter()
+        index.search(query, uploader="Channel 3", min_duration=60)
+        slowest = max(slowest, (time.perf_counter() - started) * 1000)
+    expected = sum(1 for i in range(10000) if "99" in str(i))
+    if len(index.search("episode 99")) != expected or slowest > FILTER_BUDGET_MS:
+        print(f"   [ERROR] Filtering 10,000 entries took {slowest:.1f} ms, over {FILTER_BUDGET_MS} ms")
+        return False
+    
+    print(f"   [SUCCESS] Playlist search works ({slowest:.1f} ms for 10,000 entries)")
+    return True
+
+# Slowest acceptable time from launch to the first painted window
+STARTUP_BUDGET_MS = 2000
+
+def test_startup_time():
+    """Test the GUI paints its first window within the startup budget"""
+    print("Testing startup time...")
+    
+    from startup import StartupTimeline
+    
+    timeline = StartupTimeline()
+    for stage in ("imports", "tk_init", "imports"):
+        timeline.mark(stage)
+    if list(timeline.marks) != ["imports", "tk_init"]:
+        print("   [ERROR] Each startup stage should be recorded once")
+        return False
+    
+    if os.name != 'nt' and not os.environ.get('DISPLAY'):
+        print("   [SKIP] No display to start the GUI on")
+        return True
+    
+    result = subprocess.run([sys.executable, "gui.py", "--startup-benchmark"],
+                            capture_output=True, text=True, timeout=60)
+    try:
+        marks = json.loads(result.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        print(f"   [ERROR] No startup timeline printed: {result.stderr}")
+        return False
+    
+    print(f"   Startup timeline (ms): {marks}")
+    if marks['first_paint'] > STARTUP_BUDGET_MS:
+        print(f"   [ERROR] First paint took longer than {STARTUP_BUDGET_MS} ms")
+        return False
+    
+    print("   [SUCCESS] Startup is within budget")
+    return True
+
 def main():
     """Main test function"""
     print("=" * 50)
@@ -124,6 +1280,118 @@ def main():
         print("[ERROR] GUI import tests failed!")
         return False
     
+    print()
+    
+    # Test metadata cache
+    if not test_metadata_cache():
+        print("[ERROR] Metadata cache tests failed!")
+        return False
+    
+    # Test playlist paging
+    if not test_playlist_pager():
+        print("[ERROR] Playlist pager tests failed!")
+        return False
+    
+    # Test playlist entries
+    if not test_playlist_entries():
+        print("[ERROR] Playlist entries tests failed!")
+        return False
+    
+    # Test quality budgets
+    if not test_quality_budget():
+        print("[ERROR] Quality budget tests failed!")
+        return False
+    
+    # Test time-range sections
+    if not test_sections():
+        print("[ERROR] Section tests failed!")
+        return False
+    
+    # Test integrity manifest
+    if not test_integrity():
+        print("[ERROR] Integrity tests failed!")
+        return False
+    
+    # Test staged writer
+    if not test_staged_writer():
+        print("[ERROR] Staged writer tests failed!")
+        return False
+    
+    # Test sync watermarks
+    if not test_sync_watermark():
+        print("[ERROR] Sync tests failed!")
+        return False
+    
+    # Test free-space admission
+    if not test_space_reservations():
+        print("[ERROR] Space reservation tests failed!")
+        return False
+    
+    # Test thumbnail caching
+    if not test_thumbnail_cache():
+        print("[ERROR] Thumbnail cache tests failed!")
+        return False
+    
+    # Test download metrics
+    if not test_metrics():
+        print("[ERROR] Metrics tests failed!")
+        return False
+    
+    # Test event loop lag monitor
+    if not test_lag_monitor():
+        print("[ERROR] Lag monitor tests failed!")
+        return False
+    
+    # Test profiling hooks
+    if not test_profiling():
+        print("[ERROR] Profiling tests failed!")
+        return False
+    
+    # Test bulk info
+    if not test_bulk_info():
+        print("[ERROR] Bulk info tests failed!")
+        return False
+    
+    # Test streaming
+    if not test_streaming():
+        print("[ERROR] Streaming tests failed!")
+        return False
+    
+    # Test job API
+    if not test_job_api():
+        print("[ERROR] Job API tests failed!")
+        return False
+    
+    # Test shared job queue
+    if not test_job_queue():
+        print("[ERROR] Shared job queue tests failed!")
+        return False
+    
+    # Test event protocol
+    if not test_event_protocol():
+        print("[ERROR] Event protocol tests failed!")
+        return False
+    
+    # Test download schedule
+    if not test_download_schedule():
+        print("[ERROR] Download schedule tests failed!")
+        return False
+    
+    # Test throughput graph
+    if not test_throughput_graph():
+        print("[ERROR] Throughput graph tests failed!")
+        return False
+    
+    # Test playlist search
+    if not test_playlist_search():
+        print("[ERROR] Playlist search tests failed!")
+        return False
+    
+    # Test startup time
+    if not test_startup_time():
+        print("[ERROR] Startup time tests failed!")
+        return False
+    
     print()
     print("[SUCCESS] All tests passed!")
     print("   The application is ready to build and use.")
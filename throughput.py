@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Throughput graph for Kartoshka Youtuber
+Keeps recent download speeds in ring buffers and draws them as a sparkline on a Tk canvas
+Created by NaderB - https://www.naderb.org
+"""
+
+# Samples kept per series; at one sample every GRAPH_INTERVAL_MS this is a minute
+HISTORY_SAMPLES = 240
+
+# Time between samples, which also caps redraws at 4 per second
+GRAPH_INTERVAL_MS = 250
+
+# Per-job lines drawn under the total, fastest jobs first
+MAX_JOB_LINES = 6
+
+JOB_COLORS = ('#6c757d', '#17a2b8', '#28a745', '#ffc107', '#dc3545', '#6f42c1')
+TOTAL_COLOR = '#007bff'
+
+
+class RingBuffer:
+    """Fixed-size buffer of numbers that overwrites its oldest value"""
+
+    def __init__(self, size):
+        self.size = size
+        self._values = [0.0] * size
+        self._next = 0
+        self.count = 0
+
+    def append(self, value):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def values(self):
+        """Get the buffered values, oldest first"""
+        if self.count < self.size:
+            return self._values[:self.count]
+        return self._values[self._next:] + self._values[:self._next]
+
+    def latest(self):
+        return self._values[self._next - 1] if self.count else 0.0
+
+    def peak(self):
+        return max(self._values) if self.count else 0.0
+
+    def __len__(self):
+        return self.count
+
+
+class ThroughputHistory:
+    """Aggregate and per-job speed series sampled at a fixed interval
+
+    Every series gets a value each sample, so they stay aligned; a job that
+    reports nothing counts as 0. A job's series is dropped once it has been
+    idle for a whole history.
+    """
+
+    def __init__(self, samples=HISTORY_SAMPLES):
+        self.samples = samples
+        self.total = RingBuffer(samples)
+        self.jobs = {}
+        self.recorded = 0
+        self._idle = {}
+
+    def record(self, speeds):
+        """Add one sample from {job_id: bytes per second}"""
+        self.recorded += 1
+        self.total.append(sum(speeds.values()))
+        for job_id in speeds:
+            if job_id not in self.jobs:
+                self.jobs[job_id] = RingBuffer(self.samples)
+                # Pad so the new series lines up with the total
+                for _ in range(len(self.total) - 1):
+                    self.jobs[job_id].append(0.0)
+        for job_id, series in list(self.jobs.items()):
+            speed = speeds.get(job_id, 0.0)
+            series.append(speed)
+            self._idle[job_id] = 0 if speed else self._idle.get(job_id, 0) + 1
+            if self._idle[job_id] >= self.samples:
+                del self.jobs[job_id], self._idle[job_id]
+
+    def busiest_jobs(self, limit=MAX_JOB_LINES):
+        """Get (job_id, series) of the jobs with the highest current speed"""
+        ranked = sorted(self.jobs.items(), key=lambda item: item[1].latest(), reverse=True)
+        return ranked[:limit]
+
+    def clear(self):
+        self.total = RingBuffer(self.samples)
+        self.jobs.clear()
+        self._idle.clear()
+
+
+class Sparkline:
+    """Draw a ThroughputHistory on a Tk canvas
+
+    The canvas items are created once and only their coordinates change on
+    each redraw, so a frame costs a few coords calls however long it runs.
+    """
+
+    def __init__(self, canvas, history):
+        self.canvas = canvas
+        self.history = history
+        self.width = int(canvas.cget('width'))
+        self.height = int(canvas.cget('height'))
+        self._job_lines = [canvas.create_line(0, 0, 0, 0, fill=color, width=1, state='hidden')
+                           for color in JOB_COLORS[:MAX_JOB_LINES]]
+        self._total_line = canvas.create_line(0, 0, 0, 0, fill=TOTAL_COLOR, width=2, state='hidden')
+        self._label = canvas.create_text(4, 2, anchor='nw', text="", fill='#495057', font=('Segoe UI', 8))
+        self._drawn = None
+        canvas.bind('<Configure>', self._on_resize)
+
+    def _on_resize(self, event):
+        self.width, self.height = event.width, event.height
+        self._drawn = None
+        self.redraw()
+
+    def _points(self, values, scale):
+        step = self.width / max(1, self.history.samples - 1)
+        # Right-aligned, so the newest sample is always at the right edge
+        offset = self.history.samples - len(values)
+        bottom = self.height - 1
+        points = []
+        for index, value in enumerate(values):
+            points += [(offset + index) * step, bottom - value * scale]
+        return points
+
+    def redraw(self):
+        """Update the lines to the current history"""
+        total = self.history.total
+        state = (self.history.recorded, self.width, self.height)
+        if state == self._drawn:
+            return
+        self._drawn = state
+
+        values = total.values()
+        if len(values) < 2:
+            return
+        peak = max(total.peak(), 1.0)
+        # Headroom above the peak keeps the top line clear of the label
+        scale = (self.height - 16) / (peak * 1.1)
+        self.canvas.coords(self._total_line, *self._points(values, scale))
+        self.canvas.itemconfigure(self._total_line, state='normal')
+
+        jobs = self.history.busiest_jobs(len(self._job_lines))
+        for index, line in enumerate(self._job_lines):
+            if index < len(jobs) and len(jobs) > 1:
+                self.canvas.coords(line, *self._points(jobs[index][1].values(), scale))
+                self.canvas.itemconfigure(line, state='normal')
+            else:
+                self.canvas.itemconfigure(line, state='hidden')
+
+        self.canvas.itemconfigure(self._label, text=f"{total.latest() / 1024 / 1024:.1f} MB/s "
+                                                    f"(peak {peak / 1024 / 1024:.1f} MB/s)")
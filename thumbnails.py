@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Thumbnail cache for Kartoshka Youtuber
+Fetches video thumbnails in the background and keeps them on disk and in memory
+Created by NaderB - https://www.naderb.org
+"""
+
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+# Size thumbnails are stored and shown at
+THUMBNAIL_SIZE = (96, 54)
+
+# Memory allowed for decoded images (width x height x 4 bytes each)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+FETCH_TIMEOUT = 15
+
+
+def thumbnails_available():
+    """Thumbnails need Pillow to decode the JPEG/WebP images sites serve"""
+    # Checked without importing Pillow, which is only loaded on first fetch
+    return importlib.util.find_spec('PIL') is not None
+
+
+def thumbnail_url(video_id=None, info=None):
+    """Get a thumbnail URL from info or a YouTube video ID"""
+    if info and info.get('thumbnail'):
+        return info['thumbnail']
+    if video_id:
+        return f"https://i.ytimg.com/vi/{video_id}/mqdefault.jpg"
+    return None
+
+
+def to_png(data, size=THUMBNAIL_SIZE):
+    """Shrink a downloaded image and encode it as PNG, which Tk reads natively"""
+    from PIL import Image
+    image = Image.open(BytesIO(data))
+    image.thumbnail(size)
+    output = BytesIO()
+    image.convert('RGB').save(output, format='PNG')
+    return output.getvalue()
+
+
+class ImageLRU:
+    """LRU of decoded images bounded by their approximate memory use
+
+    Only used from the Tk thread, so it needs no locking.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._images = OrderedDict()
+
+    def get(self, key):
+        """Get an image, or None"""
+        entry = self._images.get(key)
+        if entry is None:
+            return None
+        self._images.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, image, size):
+        """Store an image that takes size bytes, evicting the oldest ones"""
+        if key in self._images:
+            self.used_bytes -= self._images.pop(key)[1]
+        self._images[key] = (image, size)
+        self.used_bytes += size
+        while self.used_bytes > self.max_bytes and len(self._images) > 1:
+            _, (_, evicted_size) = self._images.popitem(last=False)
+            self.used_bytes -= evicted_size
+
+    def __len__(self):
+        return len(self._images)
+
+    def clear(self):
+        self._images.clear()
+        self.used_bytes = 0
+
+
+class ThumbnailCache:
+    """Thumbnails kept as small PNGs on disk, fetched on a worker pool
+
+    load(key, url, callback) calls callback(key, png_bytes, from_disk) on a
+    worker thread once the thumbnail is available, with png_bytes None if it
+    failed. Requests for a key that is already being loaded are merged.
+    """
+
+    def __init__(self, cache_dir, workers=4, fetch=None):
+        self.cache_dir = str(cache_dir)
+        self.fetch = fetch or self._fetch
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.fetches = 0
+
+    def path_for(self, key):
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + ".png")
+
+    def load(self, key, url, callback):
+        """Load a thumbnail in the background"""
+        with self._lock:
+            if key in self._pending:
+                self._pending[key].append(callback)
+                return
+            self._pending[key] = [callback]
+        self.executor.submit(self._load, key, url)
+
+    def _fetch(self, url):
+        import urllib.request
+        with urllib.request.urlopen(url, timeout=FETCH_TIMEOUT) as response:
+            return response.read()
+
+    def _load(self, key, url):
+        try:
+            data = self._read_cached(key)
+            from_disk = data is not None
+            if data is None:
+                data = to_png(self.fetch(url))
+                self._write_cached(key, data)
+                with self._lock:
+                    self.fetches += 1
+        except Exception:
+            data, from_disk = None, False
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+        for callback in callbacks:
+            callback(key, data, from_disk)
+
+    def _read_cached(self, key):
+        try:
+            with open(self.path_for(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        return data
+
+    def _write_cached(self, key, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
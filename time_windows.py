@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Download time windows for Kartoshka Youtuber
+Rules like "01:00-06:00; mon-fri 09:00-17:00@2M" saying when downloads run and how fast
+Created by NaderB - https://www.naderb.org
+"""
+
+import re
+from datetime import datetime, timedelta
+
+DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+RATE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+RULE_PATTERN = re.compile(r'^(?:(?P<days>[a-z,-]+)\s+)?(?P<start>\d{1,2}:\d{2})-(?P<end>\d{1,2}:\d{2})'
+                          r'(?:@(?P<rate>\d+(?:\.\d+)?)(?P<unit>[KMG]?)B?)?$', re.IGNORECASE)
+
+
+def parse_minutes(text):
+    """Convert HH:MM to minutes after midnight"""
+    hours, minutes = (int(part) for part in text.split(':'))
+    if hours > 24 or minutes > 59 or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time: {text}")
+    return hours * 60 + minutes
+
+
+def parse_days(text):
+    """Convert "mon-fri" or "sat,sun" to a set of weekday numbers (Monday is 0)"""
+    days = set()
+    for part in text.lower().split(','):
+        first, _, last = part.partition('-')
+        if first not in DAYS or (last and last not in DAYS):
+            raise ValueError(f"Invalid days: {text}")
+        start = DAYS.index(first)
+        end = DAYS.index(last) if last else start
+        days.update(day % 7 for day in range(start, end + 1 if end >= start else end + 8))
+    return days
+
+
+def parse_rate(number, unit):
+    """Convert a rate like 2 and M to bytes per second"""
+    return int(float(number) * RATE_UNITS[unit.upper()])
+
+
+class TimeWindow:
+    """A daily time range, optionally only on some weekdays
+
+    The range may wrap past midnight ("22:00-06:00"); it then belongs to
+    the day it starts on. Equal start and end means all day.
+    """
+
+    def __init__(self, start, end, days=None):
+        self.start = start
+        self.end = end
+        self.days = set(days) if days else set(range(7))
+
+    def contains(self, now):
+        minute = now.hour * 60 + now.minute
+        if self.start == self.end:
+            return now.weekday() in self.days
+        if self.start < self.end:
+            return now.weekday() in self.days and self.start <= minute < self.end
+        # Wraps past midnight: the early part belongs to the previous day
+        if minute >= self.start:
+            return now.weekday() in self.days
+        return minute < self.end and (now.weekday() - 1) % 7 in self.days
+
+    def boundaries(self, now, days_ahead=8):
+        """Get the times the window opens or closes after now, within days_ahead days"""
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        times = []
+        for offset in range(-1, days_ahead):
+            day = midnight + timedelta(days=offset)
+            if day.weekday() not in self.days:
+                continue
+            start = day + timedelta(minutes=self.start)
+            end = day + timedelta(minutes=self.end if self.end > self.start else self.end + 24 * 60)
+            times += [time for time in (start, end) if time > now]
+        return times
+
+
+class DownloadSchedule:
+    """When downloads may run, and how fast, by time of day
+
+    Built from rules separated by semicolons:
+      01:00-06:00               downloads only run inside this window
+      mon-fri 09:00-17:00@2M    inside this window the queue is capped at 2 MB/s
+    With no run windows downloads may run at any time. Where several
+    throttles overlap the lowest rate applies.
+    """
+
+    def __init__(self, run_windows=None, throttles=None, text=""):
+        self.run_windows = list(run_windows or [])
+        self.throttles = list(throttles or [])
+        self.text = text
+
+    @classmethod
+    def parse(cls, text):
+        """Build a schedule from its text form, raising ValueError if it is invalid"""
+        run_windows, throttles = [], []
+        for rule in filter(None, (part.strip() for part in (text or "").split(';'))):
+            match = RULE_PATTERN.match(rule)
+            if not match:
+                raise ValueError(f"Invalid schedule rule: {rule}")
+            days = parse_days(match['days']) if match['days'] else None
+            window = TimeWindow(parse_minutes(match['start']), parse_minutes(match['end']), days)
+            if match['rate']:
+                throttles.append((window, parse_rate(match['rate'], match['unit'])))
+            else:
+                run_windows.append(window)
+        return cls(run_windows, throttles, text.strip() if text else "")
+
+    def __bool__(self):
+        return bool(self.run_windows or self.throttles)
+
+    def __str__(self):
+        return self.text
+
+    def allows(self, now=None):
+        """Check whether downloads may run at now"""
+        now = now or datetime.now()
+        return not self.run_windows or any(window.contains(now) for window in self.run_windows)
+
+    def rate_limit(self, now=None):
+        """Get the bytes per second allowed at now, or None for no limit"""
+        now = now or datetime.now()
+        rates = [rate for window, rate in self.throttles if window.contains(now)]
+        return min(rates) if rates else None
+
+    def next_change(self, now=None):
+        """Get when the schedule next opens, closes or changes rate, or None if it never does"""
+        now = now or datetime.now()
+        times = []
+        for window in self.run_windows + [window for window, _ in self.throttles]:
+            times += window.boundaries(now)
+        return min(times) if times else None
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Output writer for Kartoshka Youtuber
+Stages downloads next to their destination and publishes them atomically
+Created by NaderB - https://www.naderb.org
+"""
+
+import os
+import tempfile
+
+# Default write buffer size in bytes
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+def preallocate(fd, size):
+    """Reserve disk space for a file so it does not fragment as it grows
+
+    Uses posix_fallocate where available; elsewhere extending the file sets
+    its end and lets the filesystem allocate it in one go.
+    """
+    if not size:
+        return
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            # Not supported by this filesystem
+            pass
+    os.ftruncate(fd, size)
+
+
+class StagedFile:
+    """Write a file under a temporary name in its destination folder
+
+    Staging on the destination volume means publishing is a rename rather
+    than a copy, so each finished file is written exactly once. Use as a
+    context manager: the file is published when the block succeeds and the
+    partial file is removed when it fails. As a stream sink, open() it,
+    publish() once the stream completes and close() it either way; closing
+    an unpublished file removes it.
+    """
+
+    def __init__(self, dest_path, expected_size=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.dest_path = os.path.abspath(dest_path)
+        self.expected_size = expected_size
+        self.buffer_size = buffer_size or DEFAULT_BUFFER_SIZE
+        self.temp_path = None
+        self.file = None
+        self.written = 0
+        self.published = False
+
+    def open(self):
+        """Create the partial file and return self"""
+        dest_dir = os.path.dirname(self.dest_path)
+        os.makedirs(dest_dir, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=dest_dir, prefix='.' + os.path.basename(self.dest_path) + '.',
+                                              suffix='.part')
+        try:
+            preallocate(fd, self.expected_size)
+        except OSError:
+            # Preallocation is an optimisation only
+            pass
+        self.file = os.fdopen(fd, 'wb', buffering=self.buffer_size)
+        return self
+
+    def write(self, data):
+        self.written += len(data)
+        return self.file.write(data)
+
+    def publish(self):
+        """Trim unused preallocated space and rename into place"""
+        self.file.flush()
+        if self.expected_size and self.written != self.expected_size:
+            self.file.truncate(self.written)
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.temp_path, self.dest_path)
+        self.published = True
+
+    def discard(self):
+        """Remove the partial file"""
+        try:
+            self.file.close()
+        except (OSError, ValueError):
+            pass
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        """Remove the partial file unless it was published"""
+        if not self.published:
+            self.discard()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.publish()
+        else:
+            self.discard()
+        return False